@@ -3,14 +3,12 @@ Aplicación Principal - SmartMind
 Sistema de gestión de documentación para convocatorias
 """
 import streamlit as st
-import platform
 import os
 import sys
-import pytesseract
 
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
-from config.settings import PAGE_CONFIG, TESSERACT_PATHS, SECCIONES
+from config.settings import PAGE_CONFIG, SECCIONES
 
 st.set_page_config(**PAGE_CONFIG)
 
@@ -32,12 +30,6 @@ except ImportError as e:
     st.error(f"Error al importar secciones: {e}")
     st.stop()
 
-if platform.system() == 'Windows':
-    for ruta in TESSERACT_PATHS:
-        if os.path.exists(ruta):
-            pytesseract.pytesseract.tesseract_cmd = ruta
-            break
-
 st.markdown(get_custom_styles(), unsafe_allow_html=True)
 
 st.markdown(get_robot_assistant('assets/robot_asistente.png'), unsafe_allow_html=True)
@@ -1,3 +1,59 @@
-from .settings import PAGE_CONFIG, SECCIONES, TESSERACT_PATHS, ALLOWED_FILE_TYPES
+from .settings import (
+    PAGE_CONFIG,
+    SECCIONES,
+    TESSERACT_PATHS,
+    ALLOWED_FILE_TYPES,
+    DATA_DIR,
+    OCR_CACHE_ENABLED,
+    OCR_CACHE_DIR,
+    OCR_CACHE_MAX_MB,
+    OCR_MAX_WORKERS,
+    OCR_ADAPTATIVO,
+    OCR_DPI_BAJO,
+    OCR_CONFIANZA_MINIMA,
+    OCR_TASA_ACIERTOS_MINIMA,
+    OCR_DPI_FIRMAS,
+    OCR_PAGINAS_POR_LOTE,
+    OCR_PREPROCESADO,
+    OCR_DPI_HUELLA,
+    OCR_TESSDATA_FAST,
+    OCR_TESSDATA_BEST,
+    OCR_DPI_CLASIFICACION,
+    OCR_MOTOR,
+    TESSERACT_CMD,
+    POPPLER_PATH,
+    EXCEL_CACHE_LIBROS,
+    EXCEL_DISPOSICIONES_ENABLED,
+    EXCEL_DISPOSICIONES_DIR,
+    OCR_PDF_SUBIDOS
+)
 
-__all__ = ['PAGE_CONFIG', 'SECCIONES', 'TESSERACT_PATHS', 'ALLOWED_FILE_TYPES']
\ No newline at end of file
+__all__ = [
+    'PAGE_CONFIG',
+    'SECCIONES',
+    'TESSERACT_PATHS',
+    'ALLOWED_FILE_TYPES',
+    'DATA_DIR',
+    'OCR_CACHE_ENABLED',
+    'OCR_CACHE_DIR',
+    'OCR_CACHE_MAX_MB',
+    'OCR_MAX_WORKERS',
+    'OCR_ADAPTATIVO',
+    'OCR_DPI_BAJO',
+    'OCR_CONFIANZA_MINIMA',
+    'OCR_TASA_ACIERTOS_MINIMA',
+    'OCR_DPI_FIRMAS',
+    'OCR_PAGINAS_POR_LOTE',
+    'OCR_PREPROCESADO',
+    'OCR_DPI_HUELLA',
+    'OCR_TESSDATA_FAST',
+    'OCR_TESSDATA_BEST',
+    'OCR_DPI_CLASIFICACION',
+    'OCR_MOTOR',
+    'TESSERACT_CMD',
+    'POPPLER_PATH',
+    'EXCEL_CACHE_LIBROS',
+    'EXCEL_DISPOSICIONES_ENABLED',
+    'EXCEL_DISPOSICIONES_DIR',
+    'OCR_PDF_SUBIDOS'
+]
\ No newline at end of file
@@ -1,6 +1,9 @@
 """
 Configuración general de la aplicación
 """
+import os
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 
 PAGE_CONFIG = {
     "page_title": "Interpros SmartMind",
@@ -37,4 +40,76 @@ ALLOWED_FILE_TYPES = {
     "images": ["png", "jpg", "jpeg", "bmp", "tiff", "gif"],
     "documents": ["pdf", "docx", "doc"],
     "spreadsheets": ["xlsx", "xls", "csv"]
-}
\ No newline at end of file
+}
+
+# Datos persistentes (volumen smartmind_data montado en /app/data)
+DATA_DIR = os.environ.get('SMARTMIND_DATA_DIR', os.path.join(BASE_DIR, 'data'))
+
+# Caché OCR en disco; SMARTMIND_OCR_CACHE=0 la desactiva
+OCR_CACHE_ENABLED = os.environ.get('SMARTMIND_OCR_CACHE', '1') != '0'
+OCR_CACHE_DIR = os.environ.get('SMARTMIND_OCR_CACHE_DIR', os.path.join(DATA_DIR, 'ocr_cache'))
+OCR_CACHE_MAX_MB = int(os.environ.get('SMARTMIND_OCR_CACHE_MAX_MB', '512'))
+
+# Procesos para OCR en paralelo; 0 = según el límite de CPU del contenedor
+OCR_MAX_WORKERS = int(os.environ.get('SMARTMIND_OCR_WORKERS', '0'))
+
+# DPI adaptativo: primera pasada a OCR_DPI_BAJO y relectura a la resolución
+# completa solo de los bloques/páginas con poca confianza o datos clave incompletos
+OCR_ADAPTATIVO = os.environ.get('SMARTMIND_OCR_ADAPTATIVO', '1') != '0'
+OCR_DPI_BAJO = int(os.environ.get('SMARTMIND_OCR_DPI_BAJO', '150'))
+OCR_CONFIANZA_MINIMA = int(os.environ.get('SMARTMIND_OCR_CONFIANZA_MINIMA', '70'))
+OCR_TASA_ACIERTOS_MINIMA = float(os.environ.get('SMARTMIND_OCR_TASA_ACIERTOS_MINIMA', '0.8'))
+
+# Páginas que se pasan juntas a una misma ejecución de Tesseract
+OCR_PAGINAS_POR_LOTE = int(os.environ.get('SMARTMIND_OCR_PAGINAS_POR_LOTE', '4'))
+
+# Preprocesado de imágenes antes del OCR; cada paso se desactiva con su variable a 0
+OCR_PREPROCESADO = {
+    'escala_grises': os.environ.get('SMARTMIND_OCR_ESCALA_GRISES', '1') != '0',
+    'binarizar': os.environ.get('SMARTMIND_OCR_BINARIZAR', '1') != '0',
+    'enderezar': os.environ.get('SMARTMIND_OCR_ENDEREZAR', '1') != '0',
+    'recortar_margenes': os.environ.get('SMARTMIND_OCR_RECORTAR_MARGENES', '1') != '0',
+}
+
+# Documentos PDF sueltos de la subida general (utils/document_extractors.py):
+# por defecto solo se lee su capa de texto; SMARTMIND_OCR_PDF_SUBIDOS=1 pasa
+# también por OCR (pool de procesos incluido) las páginas escaneadas
+OCR_PDF_SUBIDOS = os.environ.get('SMARTMIND_OCR_PDF_SUBIDOS', '0') != '0'
+
+# Resolución para detectar firmas por densidad de tinta (no pasa por Tesseract)
+OCR_DPI_FIRMAS = int(os.environ.get('SMARTMIND_OCR_DPI_FIRMAS', '100'))
+
+# Resolución para las huellas perceptuales que detectan páginas duplicadas
+OCR_DPI_HUELLA = int(os.environ.get('SMARTMIND_OCR_DPI_HUELLA', '50'))
+
+# Carpetas con los modelos de Tesseract que eligen los perfiles OCR (ver
+# ocr/perfiles.py); vacío = tessdata de la instalación (tesseract-ocr-spa de
+# Debian ya es tessdata_fast)
+OCR_TESSDATA_FAST = os.environ.get('SMARTMIND_OCR_TESSDATA_FAST', '')
+OCR_TESSDATA_BEST = os.environ.get('SMARTMIND_OCR_TESSDATA_BEST', '')
+
+# Resolución del rasterizado en gris con el que se clasifican las páginas
+# escaneadas antes del OCR (tinta y cabecera, ver ocr/clasificacion.py)
+OCR_DPI_CLASIFICACION = int(os.environ.get('SMARTMIND_OCR_DPI_CLASIFICACION', '100'))
+
+# Motor OCR (ver ocr/motores.py): 'tesseract' (binario, por lotes),
+# 'tesserocr' (en el propio proceso, si está instalado) o 'precalculado' (pruebas)
+OCR_MOTOR = os.environ.get('SMARTMIND_OCR_MOTOR', 'tesseract')
+
+# Ejecutable de Tesseract; vacío = el del PATH (en Windows, el primero de
+# TESSERACT_PATHS que exista). Los modelos se buscan en TESSDATA_PREFIX.
+TESSERACT_CMD = os.environ.get('SMARTMIND_TESSERACT_CMD', '')
+
+# Carpeta de binarios de Poppler; None = los del PATH
+POPPLER_PATH = os.environ.get('SMARTMIND_POPPLER_PATH') or None
+
+# Libros Excel que se guardan ya leídos en memoria (ver utils/workbook_cache.py);
+# al superarse se descarta el usado hace más tiempo. 0 desactiva la caché
+EXCEL_CACHE_LIBROS = int(os.environ.get('SMARTMIND_EXCEL_CACHE_LIBROS', '8'))
+
+# Disposiciones detectadas en los Excel de control (ver utils/layout_cache.py);
+# SMARTMIND_EXCEL_DISPOSICIONES=0 las detecta siempre de nuevo
+EXCEL_DISPOSICIONES_ENABLED = os.environ.get('SMARTMIND_EXCEL_DISPOSICIONES', '1') != '0'
+EXCEL_DISPOSICIONES_DIR = os.environ.get(
+    'SMARTMIND_EXCEL_DISPOSICIONES_DIR', os.path.join(DATA_DIR, 'excel_disposiciones')
+)
@@ -0,0 +1,10 @@
+"""
+Motor OCR compartido
+Rasteriza PDFs y extrae texto una sola vez por documento con el motor OCR
+configurado (ver ocr.motores)
+"""
+from .documento import OCRDocument
+from .paralelo import ocr_documentos_en_paralelo, limite_cpus
+from .capa_texto import extraer_texto_hibrido
+
+__all__ = ['OCRDocument', 'ocr_documentos_en_paralelo', 'limite_cpus', 'extraer_texto_hibrido']
@@ -0,0 +1,124 @@
+"""
+OCR con resolución adaptativa
+Primera pasada a baja resolución con confianzas por palabra (image_to_data);
+solo los bloques o páginas dudosas se vuelven a leer a la resolución completa.
+La ejecución (por lotes) está en ocr.pagina; aquí solo se decide qué releer.
+"""
+import re
+from collections import OrderedDict
+
+from .espacial import texto_de_palabras
+
+# Patrones que los extractores necesitan leer bien
+PATRON_FECHA = re.compile(r'\b\d{1,2}/\d{1,2}/\d{4}\b')
+PATRON_SEMANA = re.compile(r'SEMANA\s+DEL\s+\d{1,2}/\d{1,2}\s+AL\s+\d{1,2}/\d{1,2}/\d{4}', re.IGNORECASE)
+PATRON_DNI = re.compile(r'\b[XYZ0-9]\d{7}[A-Z]\b')
+
+# Fragmentos que parecen uno de esos datos (aunque estén mal leídos)
+CANDIDATO_FECHA = re.compile(r'\d{1,2}\s*[/|l1I]\s*\d{1,2}\s*[/|l1I]\s*\d{2,4}')
+CANDIDATO_SEMANA = re.compile(r'SEMANA', re.IGNORECASE)
+CANDIDATO_DNI = re.compile(r'\b[XYZ0-9OoIl]{1}[0-9OoIlSB]{6,8}[A-Z0-9]?\b')
+
+
+def tasa_aciertos(texto):
+    """
+    Proporción de datos clave (fechas, DNIs, cabeceras de semana) que se leen
+    completos frente a los fragmentos que lo parecen
+
+    Args:
+        texto: Texto OCR
+
+    Returns:
+        float entre 0 y 1 (1 si no hay candidatos)
+    """
+    candidatos = (
+        len(CANDIDATO_FECHA.findall(texto))
+        + len(CANDIDATO_SEMANA.findall(texto))
+        + len(CANDIDATO_DNI.findall(texto))
+    )
+    if candidatos == 0:
+        return 1.0
+    aciertos = (
+        len(PATRON_FECHA.findall(texto))
+        + len(PATRON_SEMANA.findall(texto))
+        + len(PATRON_DNI.findall(texto))
+    )
+    return min(1.0, aciertos / candidatos)
+
+
+def bloques_de_palabras(palabras):
+    """
+    Agrupa por bloque de Tesseract las palabras de una lectura
+
+    Args:
+        palabras: Lista de palabras (ver ocr.espacial.palabras_de_datos)
+
+    Returns:
+        OrderedDict {bloque: {'texto', 'confianzas', 'caja': [x0, y0, x1, y1]}}
+        con la caja normalizada a la página
+    """
+    agrupadas = OrderedDict()
+    for palabra in palabras:
+        agrupadas.setdefault(palabra['bloque'], []).append(palabra)
+
+    bloques = OrderedDict()
+    for num, palabras_bloque in agrupadas.items():
+        cajas = [p['caja'] for p in palabras_bloque]
+        bloques[num] = {
+            'texto': texto_de_palabras(palabras_bloque),
+            'confianzas': [p['conf'] for p in palabras_bloque],
+            'caja': [min(c[0] for c in cajas), min(c[1] for c in cajas),
+                     max(c[2] for c in cajas), max(c[3] for c in cajas)],
+        }
+    return bloques
+
+
+def unir_bloques(bloques):
+    """Texto de la página a partir de sus bloques"""
+    return '\n\n'.join(bloque['texto'] for bloque in bloques.values() if bloque['texto'])
+
+
+def confianza_media(bloque):
+    confianzas = bloque['confianzas']
+    return sum(confianzas) / len(confianzas) if confianzas else 0.0
+
+
+def bloques_dudosos(bloques, confianza_minima=70, tasa_minima=0.8):
+    """
+    Decide qué hay que releer a alta resolución
+
+    Args:
+        bloques: Resultado de bloques_de_palabras()
+        confianza_minima: Confianza media (0-100) exigida a cada bloque
+        tasa_minima: Tasa de aciertos de datos clave exigida (ver tasa_aciertos)
+
+    Returns:
+        None si la lectura es fiable, la lista de block_num a releer recortados
+        o [] si hay que releer la imagen completa (casi todo es dudoso o los
+        datos clave están incompletos sin que haya bloques con poca confianza)
+    """
+    dudosos = [num for num, bloque in bloques.items() if confianza_media(bloque) < confianza_minima]
+    if not dudosos:
+        return None if tasa_aciertos(unir_bloques(bloques)) >= tasa_minima else []
+    if len(dudosos) * 2 <= len(bloques):
+        return dudosos
+    return []
+
+
+def caja_alta_resolucion(caja, escala, ancho, alto, margen=10):
+    """
+    Caja de un bloque (píxeles a baja resolución) en la imagen de alta resolución
+
+    Args:
+        caja: [x0, y0, x1, y1] en píxeles a baja resolución
+        escala: Relación entre resoluciones
+        ancho, alto: Tamaño de la imagen de alta resolución
+        margen: Píxeles (a baja resolución) añadidos alrededor del bloque
+    """
+    x0, y0, x1, y1 = caja
+    return (
+        max(0, int((x0 - margen) * escala)),
+        max(0, int((y0 - margen) * escala)),
+        min(ancho, int((x1 + margen) * escala)),
+        min(alto, int((y1 + margen) * escala)),
+    )
@@ -0,0 +1,483 @@
+"""
+Benchmark del OCR con documentos escaneados sintéticos
+Genera con PIL partes de firmas y justificantes con datos conocidos (nombres,
+DNI, cabeceras SEMANA DEL dd/mm AL dd/mm/yyyy, horarios HH:MM), les añade
+ruido y giro como un escáner, los pasa por los extractores de cierre de mes y
+mide páginas por segundo, memoria máxima y acierto de la extracción en cada
+configuración (dpi, motor, preprocesado, adaptativo, workers).
+
+Cada configuración se ejecuta en un proceso nuevo para que la configuración
+se lea del entorno y la memoria medida sea solo la suya. Uso:
+
+    python -m ocr.benchmark --dpi 200,300 --workers 1,2 --preprocesado si,no --adaptativo no,si
+"""
+import argparse
+import contextlib
+import io
+import itertools
+import json
+import multiprocessing
+import os
+import sys
+import tempfile
+import time
+from datetime import date, timedelta
+
+import numpy as np
+from PIL import Image, ImageDraw, ImageFont
+
+from .espacial import normalizar_token
+from .perfiles import LETRAS_DNI
+
+# Resolución a la que se "escanean" los documentos sintéticos (A4)
+DPI_SINTETICO = 200
+TAMANO_A4 = (int(8.27 * DPI_SINTETICO), int(11.69 * DPI_SINTETICO))
+
+NOMBRES = [
+    ('Lucía', 'Doña'), ('María', 'Doña'), ('Carmen', 'Doña'), ('Laura', 'Doña'), ('Elena', 'Doña'),
+    ('Marta', 'Doña'), ('Pablo', 'Don'), ('Javier', 'Don'), ('Daniel', 'Don'), ('Hugo', 'Don'),
+    ('Sergio', 'Don'), ('Andrés', 'Don'),
+]
+APELLIDOS = [
+    'García', 'Fernández', 'González', 'Rodríguez', 'López', 'Martínez', 'Sánchez', 'Pérez',
+    'Gómez', 'Martín', 'Jiménez', 'Ruiz', 'Hernández', 'Díaz', 'Moreno', 'Álvarez',
+]
+
+# Tramos de la rejilla de firmas (ver LAYOUTS['parte_firma']['rejilla'])
+HORAS_TRAMOS = ('09:00', '15:00')
+
+# Sin OCR adaptativo por defecto: la primera pasada se haría a OCR_DPI_BAJO y no al dpi medido
+CONFIGURACION_POR_DEFECTO = {'dpi': 300, 'motor': 'tesseract', 'preprocesado': True, 'adaptativo': False,
+                             'workers': 1}
+
+
+def fuente(tamano):
+    """Fuente TrueType de `tamano` píxeles (DejaVu si está instalada, si no la de Pillow)"""
+    try:
+        return ImageFont.truetype('DejaVuSans.ttf', tamano)
+    except OSError:
+        try:
+            return ImageFont.load_default(size=tamano)
+        except TypeError:
+            return ImageFont.load_default()
+
+
+def _pagina_en_blanco():
+    image = Image.new('L', TAMANO_A4, 255)
+    return image, ImageDraw.Draw(image)
+
+
+def _escribir(dibujo, x, y, texto, tamano):
+    """Escribe un texto con la posición en fracción de página"""
+    dibujo.text((int(x * TAMANO_A4[0]), int(y * TAMANO_A4[1])), texto, fill=0, font=fuente(tamano))
+
+
+def _garabato(dibujo, caja, rng):
+    """Firma a mano alzada dentro de una caja en píxeles"""
+    x0, y0, x1, y1 = caja
+    puntos = [
+        (int(rng.uniform(x0, x1)), int(rng.uniform(y0, y1)))
+        for _ in range(int(rng.integers(4, 8)))
+    ]
+    dibujo.line(puntos, fill=0, width=3)
+
+
+def ensuciar(image, rng, ruido=0.1, rotacion_max=0.5):
+    """
+    Simula el escaneo de una página
+
+    Args:
+        image: Imagen PIL en gris
+        rng: numpy.random.Generator
+        ruido: Intensidad del ruido (0 = página limpia)
+        rotacion_max: Giro máximo en grados (en cualquier sentido)
+
+    Returns:
+        Imagen PIL
+    """
+    if ruido:
+        pixeles = np.asarray(image, dtype=np.float32)
+        pixeles = pixeles + rng.normal(0, 80 * ruido, pixeles.shape)
+        # Motas de polvo
+        motas = rng.random(pixeles.shape) < 0.002 * ruido
+        pixeles[motas] = 0
+        image = Image.fromarray(np.clip(pixeles, 0, 255).astype(np.uint8))
+    if rotacion_max:
+        image = image.rotate(float(rng.uniform(-rotacion_max, rotacion_max)), resample=Image.BICUBIC,
+                             fillcolor=255)
+    return image
+
+
+def generar_alumnos(numero, rng):
+    """
+    Alumnos con nombre y DNI válidos
+
+    Returns:
+        Lista de dicts con 'nombre' (p.ej. 'Lucía García López'), 'tratamiento' y 'dni'
+    """
+    alumnos = []
+    usados = set()
+    while len(alumnos) < numero:
+        nombre, tratamiento = NOMBRES[int(rng.integers(len(NOMBRES)))]
+        apellidos = rng.choice(len(APELLIDOS), 2, replace=False)
+        completo = ' '.join([nombre] + [APELLIDOS[int(i)] for i in apellidos])
+        if completo in usados:
+            continue
+        usados.add(completo)
+        numero_dni = int(rng.integers(10 ** 7, 10 ** 8))
+        alumnos.append({
+            'nombre': completo,
+            'tratamiento': tratamiento,
+            'dni': f'{numero_dni}{LETRAS_DNI[numero_dni % 23]}',
+        })
+    return alumnos
+
+
+def pagina_parte_firma(alumno, lunes, rng):
+    """
+    Parte de firmas de un alumno con la maquetación de LAYOUTS['parte_firma']
+
+    Args:
+        alumno: dict de generar_alumnos()
+        lunes: Lista de fechas (lunes) de cada semana
+        rng: numpy.random.Generator
+
+    Returns:
+        Tupla (imagen PIL, días firmados)
+    """
+    image, dibujo = _pagina_en_blanco()
+    ancho, alto = TAMANO_A4
+    viernes_final = lunes[-1] + timedelta(days=4)
+
+    # Sin las cabeceras que busca ocr.clasificacion: el tipo sale de las semanas de la rejilla
+    _escribir(dibujo, 0.05, 0.035, 'REGISTRO DIARIO DEL ALUMNADO', 40)
+    _escribir(dibujo, 0.05, 0.075, 'Curso: FORMACIÓN PROFESIONAL PARA EL EMPLEO 2024/0001', 28)
+    _escribir(dibujo, 0.05, 0.11, f"Fecha de inicio: {lunes[0]:%d/%m/%Y}", 28)
+    _escribir(dibujo, 0.50, 0.11, f"Fecha de finalización: {viernes_final:%d/%m/%Y}", 28)
+    _escribir(dibujo, 0.05, 0.17, 'DATOS DEL ALUMNO', 30)
+    _escribir(dibujo, 0.05, 0.21, f"Nombre: {alumno['nombre'].upper()}", 28)
+    _escribir(dibujo, 0.65, 0.21, f"NIF: {alumno['dni']}", 28)
+
+    # Rejilla: cabecera de días y una fila por semana; primera columna con la semana
+    x_columnas = [0.05, 0.35] + [0.35 + 0.06 * (i + 1) for i in range(10)]
+    y_filas = [0.29, 0.33] + [0.33 + 0.1 * (i + 1) for i in range(len(lunes))]
+    for x in x_columnas:
+        x = int(x * ancho)
+        dibujo.line([(x, int(y_filas[0] * alto)), (x, int(y_filas[-1] * alto))], fill=0, width=3)
+    for y in y_filas:
+        y = int(y * alto)
+        dibujo.line([(int(x_columnas[0] * ancho), y), (int(x_columnas[-1] * ancho), y)], fill=0, width=3)
+    for dia, letra in enumerate('LMXJV'):
+        _escribir(dibujo, x_columnas[1 + 2 * dia] + 0.05, y_filas[0] + 0.01, letra, 26)
+
+    dias_firmados = 0
+    for semana, inicio in enumerate(lunes):
+        y0, y1 = y_filas[1 + semana], y_filas[2 + semana]
+        viernes = inicio + timedelta(days=4)
+        _escribir(dibujo, 0.06, y0 + 0.035, f"SEMANA DEL {inicio:%d/%m} AL {viernes:%d/%m/%Y}", 22)
+        for dia in range(5):
+            # Mañana, tarde, ambas o ninguna
+            tramos = [[True, True], [True, False], [False, True], [False, False]][
+                int(rng.choice(4, p=[0.6, 0.15, 0.1, 0.15]))
+            ]
+            dias_firmados += any(tramos)
+            for tramo, firmado in enumerate(tramos):
+                if not firmado:
+                    continue
+                columna = 2 + 2 * dia + tramo
+                cx0, cx1 = x_columnas[columna - 1] * ancho, x_columnas[columna] * ancho
+                cy0, cy1 = y0 * alto, y1 * alto
+                _escribir(dibujo, x_columnas[columna - 1] + 0.006, y0 + 0.008, HORAS_TRAMOS[tramo], 18)
+                _garabato(dibujo, (cx0 + 8, cy0 + 0.04 * alto, cx1 - 8, cy1 - 8), rng)
+    return image, dias_firmados
+
+
+def pagina_justificante(alumno, dia, rng):
+    """Justificante de asistencia a consulta de un alumno"""
+    image, dibujo = _pagina_en_blanco()
+    hora = int(rng.integers(8, 13))
+    _escribir(dibujo, 0.08, 0.08, 'JUSTIFICANTE DE ASISTENCIA', 44)
+    _escribir(dibujo, 0.08, 0.14, 'Centro de Salud - Consulta externa', 28)
+    _escribir(dibujo, 0.08, 0.25,
+              f"Por la presente se hace constar que {alumno['tratamiento']} {alumno['nombre']},", 28)
+    _escribir(dibujo, 0.08, 0.29,
+              f"con DNI {alumno['dni']}, ha asistido a consulta el día {dia:%d/%m/%Y}", 28)
+    _escribir(dibujo, 0.08, 0.33, f"de {hora:02d}:00 a {hora:02d}:45.", 28)
+    _escribir(dibujo, 0.08, 0.45, 'Y para que conste a los efectos oportunos, se firma el presente.', 28)
+    _garabato(dibujo, (int(0.55 * TAMANO_A4[0]), int(0.52 * TAMANO_A4[1]),
+                       int(0.85 * TAMANO_A4[0]), int(0.6 * TAMANO_A4[1])), rng)
+    return image
+
+
+def _guardar_pdf(imagenes, ruta):
+    imagenes[0].save(ruta, save_all=True, append_images=imagenes[1:], resolution=DPI_SINTETICO)
+
+
+def generar_documentos(carpeta, alumnos=8, semanas=4, ruido=0.1, rotacion_max=0.5, semilla=0):
+    """
+    Genera los PDFs escaneados sintéticos y los datos esperados
+
+    Args:
+        carpeta: Carpeta de salida
+        alumnos: Número de alumnos (una página de firmas por alumno)
+        semanas: Semanas de cada parte de firmas
+        ruido: Intensidad del ruido de escaneo
+        rotacion_max: Giro máximo de cada página en grados
+        semilla: Semilla del generador aleatorio
+
+    Returns:
+        dict con las rutas 'firmas' y 'justificantes', el número de 'paginas',
+        la lista de 'alumnos' y 'esperado' (fechas, días y justificantes por alumno)
+    """
+    rng = np.random.default_rng(semilla)
+    lista = generar_alumnos(alumnos, rng)
+    lunes = [date(2024, 2, 5) + timedelta(weeks=i) for i in range(semanas)]
+
+    firmas = []
+    dias = {}
+    for alumno in lista:
+        image, dias[alumno['nombre']] = pagina_parte_firma(alumno, lunes, rng)
+        firmas.append(ensuciar(image, rng, ruido, rotacion_max))
+
+    justificantes = []
+    cantidades = {}
+    for alumno in lista:
+        cantidades[alumno['nombre']] = int(rng.integers(0, 3))
+        for _ in range(cantidades[alumno['nombre']]):
+            dia = lunes[0] + timedelta(days=int(rng.integers(0, 5 * semanas)))
+            justificantes.append(ensuciar(pagina_justificante(alumno, dia, rng), rng, ruido, rotacion_max))
+            # Reverso en blanco, como en los escaneos a doble cara
+            if rng.random() < 0.3:
+                justificantes.append(ensuciar(_pagina_en_blanco()[0], rng, ruido, 0))
+    if not justificantes:
+        justificantes.append(ensuciar(_pagina_en_blanco()[0], rng, ruido, 0))
+
+    documentos = {
+        'firmas': os.path.join(carpeta, 'ParteFirma_sintetico.pdf'),
+        'justificantes': os.path.join(carpeta, 'Justificantes_sintetico.pdf'),
+        'paginas': len(firmas) + len(justificantes),
+        # Lista del curso con el formato de extraer_alumnos_excel
+        'alumnos': [{'nombre_completo': alumno['nombre'], 'dni': alumno['dni']} for alumno in lista],
+        'esperado': {
+            'fecha_inicio': lunes[0].isoformat(),
+            'fecha_fin': (lunes[-1] + timedelta(days=4)).isoformat(),
+            'dias': dias,
+            'justificantes': cantidades,
+        },
+    }
+    _guardar_pdf(firmas, documentos['firmas'])
+    _guardar_pdf(justificantes, documentos['justificantes'])
+    with open(os.path.join(carpeta, 'esperado.json'), 'w', encoding='utf-8') as f:
+        json.dump(documentos['esperado'], f, ensure_ascii=False, indent=2)
+    return documentos
+
+
+def _clave_nombre(nombre):
+    return ' '.join(t for t in (normalizar_token(p) for p in nombre.split()) if t)
+
+
+def evaluar(esperado, fechas, dias, justificantes):
+    """
+    Acierto de la extracción frente a los datos esperados
+
+    Args:
+        esperado: dict 'esperado' de generar_documentos()
+        fechas: Resultado de extraer_fechas_de_pdf
+        dias: Resultado de contar_dias_con_firmas_por_alumno
+        justificantes: Resultado de extraer_justificantes
+
+    Returns:
+        dict con la fracción de aciertos de nombres, días, fechas y justificantes
+    """
+    dias = {_clave_nombre(nombre): valor for nombre, valor in dias.items()}
+    justificantes = {_clave_nombre(nombre): valor for nombre, valor in justificantes.items()}
+    alumnos = list(esperado['dias'])
+
+    nombres_ok = sum(_clave_nombre(nombre) in dias for nombre in alumnos)
+    dias_ok = sum(dias.get(_clave_nombre(nombre)) == valor for nombre, valor in esperado['dias'].items())
+    justificantes_ok = sum(
+        justificantes.get(_clave_nombre(nombre), 0) == valor
+        for nombre, valor in esperado['justificantes'].items()
+    )
+    rango = (min(fechas).date().isoformat(), max(fechas).date().isoformat()) if fechas else None
+    return {
+        'acierto_nombres': nombres_ok / len(alumnos),
+        'acierto_dias': dias_ok / len(alumnos),
+        'acierto_fechas': float(rango == (esperado['fecha_inicio'], esperado['fecha_fin'])),
+        'acierto_justificantes': justificantes_ok / len(alumnos),
+    }
+
+
+def entorno_configuracion(configuracion):
+    """Variables de entorno (ver config.settings) que fijan una configuración"""
+    preprocesado = '1' if configuracion['preprocesado'] else '0'
+    return {
+        'SMARTMIND_OCR_MOTOR': configuracion['motor'],
+        'SMARTMIND_OCR_WORKERS': str(configuracion['workers']),
+        'SMARTMIND_OCR_ADAPTATIVO': '1' if configuracion['adaptativo'] else '0',
+        # Todo el preprocesado, escala de grises incluida, va junto
+        'SMARTMIND_OCR_ESCALA_GRISES': preprocesado,
+        'SMARTMIND_OCR_BINARIZAR': preprocesado,
+        'SMARTMIND_OCR_ENDEREZAR': preprocesado,
+        'SMARTMIND_OCR_RECORTAR_MARGENES': preprocesado,
+        # Sin caché: cada configuración hace todo el OCR
+        'SMARTMIND_OCR_CACHE': '0',
+    }
+
+
+def _memoria_maxima():
+    """(MB del proceso, MB del mayor proceso hijo) o (None, None) sin el módulo resource"""
+    try:
+        import resource
+    except ImportError:
+        return None, None
+    # ru_maxrss viene en KB en Linux y en bytes en macOS
+    escala = 1024 * 1024 if sys.platform == 'darwin' else 1024
+    return (
+        round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / escala, 1),
+        round(resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss / escala, 1),
+    )
+
+
+def _medir(configuracion, documentos, cola, detalle=False):
+    """Ejecuta los extractores con una configuración (en un proceso nuevo)"""
+    try:
+        os.environ.update(entorno_configuracion(configuracion))
+
+        from ocr import OCRDocument, ocr_documentos_en_paralelo
+        from ocr.duplicados import indexar_duplicados
+        from sections.cierre_mes.utils.extractor_ocr import (
+            contar_dias_con_firmas_por_alumno,
+            extraer_fechas_de_pdf,
+        )
+        from sections.cierre_mes.utils.procesador_datos import extraer_justificantes
+
+        salida = contextlib.nullcontext() if detalle else contextlib.redirect_stdout(io.StringIO())
+        inicio = time.perf_counter()
+        with salida:
+            firmas = OCRDocument(documentos['firmas'], dpi=configuracion['dpi'], layout='parte_firma',
+                                 perfil='documento', tipos=('parte_firma',))
+            indexar_duplicados([firmas])
+            ocr_documentos_en_paralelo([firmas])
+            fechas = extraer_fechas_de_pdf(firmas)
+            dias = contar_dias_con_firmas_por_alumno(firmas)
+            justificantes = extraer_justificantes(
+                OCRDocument(documentos['justificantes'], dpi=configuracion['dpi'], perfil='justificante_body',
+                            tipos=('justificante',)),
+                documentos['alumnos'],
+            )
+        segundos = time.perf_counter() - inicio
+
+        rss, rss_hijos = _memoria_maxima()
+        resultado = dict(configuracion, segundos=round(segundos, 2),
+                         paginas_por_segundo=round(documentos['paginas'] / segundos, 3),
+                         rss_pico_mb=rss, rss_hijos_mb=rss_hijos)
+        resultado.update(evaluar(documentos['esperado'], fechas, dias, justificantes))
+        cola.put(resultado)
+    except Exception as e:
+        cola.put(dict(configuracion, error=str(e)))
+
+
+def ejecutar_configuracion(configuracion, documentos, detalle=False):
+    """
+    Mide una configuración en un proceso nuevo
+
+    Args:
+        configuracion: dict con dpi, motor, preprocesado, adaptativo y workers
+        documentos: Resultado de generar_documentos()
+        detalle: Mostrar la salida de los extractores
+
+    Returns:
+        dict con la configuración, segundos, paginas_por_segundo, memoria
+        máxima (MB) y aciertos, o con 'error'
+    """
+    contexto = multiprocessing.get_context('spawn')
+    cola = contexto.Queue()
+    proceso = contexto.Process(target=_medir, args=(configuracion, documentos, cola, detalle))
+    proceso.start()
+    try:
+        resultado = cola.get()
+    finally:
+        proceso.join()
+    return resultado
+
+
+def configuraciones(dpis=(300,), motores=('tesseract',), preprocesados=(True,), adaptativos=(False,),
+                    workers=(1,)):
+    """Producto cartesiano de los valores de cada parámetro"""
+    return [
+        dict(CONFIGURACION_POR_DEFECTO, dpi=dpi, motor=motor, preprocesado=preprocesado,
+             adaptativo=adaptativo, workers=numero)
+        for dpi, motor, preprocesado, adaptativo, numero
+        in itertools.product(dpis, motores, preprocesados, adaptativos, workers)
+    ]
+
+
+def imprimir_resultados(resultados):
+    """Tabla de resultados por configuración"""
+    columnas = ['dpi', 'motor', 'preprocesado', 'adaptativo', 'workers', 'paginas_por_segundo', 'rss_pico_mb',
+                'rss_hijos_mb', 'acierto_nombres', 'acierto_dias', 'acierto_fechas', 'acierto_justificantes']
+    print(' | '.join(columnas))
+    print('-' * 120)
+    for resultado in resultados:
+        if 'error' in resultado:
+            print(f"{resultado['dpi']} | {resultado['motor']} | error: {resultado['error']}")
+            continue
+        valores = []
+        for columna in columnas:
+            valor = resultado[columna]
+            valores.append(f'{valor:.2f}' if isinstance(valor, float) else str(valor))
+        print(' | '.join(valores))
+
+
+def _lista(valor, tipo=str):
+    return [tipo(parte) for parte in valor.split(',') if parte]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Benchmark del OCR con documentos sintéticos')
+    parser.add_argument('--dpi', default='300', help='Resoluciones separadas por comas')
+    parser.add_argument('--motor', default='tesseract', help='Motores OCR (ver ocr.motores)')
+    parser.add_argument('--preprocesado', default='si', help="'si', 'no' o 'si,no'")
+    parser.add_argument('--adaptativo', default='no',
+                        help="OCR adaptativo (primera pasada a OCR_DPI_BAJO): 'si', 'no' o 'no,si'")
+    parser.add_argument('--workers', default='1', help='Procesos de OCR separados por comas')
+    parser.add_argument('--alumnos', type=int, default=8)
+    parser.add_argument('--semanas', type=int, default=4)
+    parser.add_argument('--ruido', type=float, default=0.1)
+    parser.add_argument('--rotacion', type=float, default=0.5, help="Giro máximo en grados")
+    parser.add_argument('--semilla', type=int, default=0)
+    parser.add_argument('--carpeta', help='Carpeta donde dejar los PDFs generados')
+    parser.add_argument('--json', help='Guardar los resultados en este archivo')
+    parser.add_argument('--detalle', action='store_true', help='Mostrar la salida de los extractores')
+    args = parser.parse_args(argv)
+
+    lista = configuraciones(
+        dpis=_lista(args.dpi, int),
+        motores=_lista(args.motor),
+        preprocesados=[valor == 'si' for valor in _lista(args.preprocesado)],
+        adaptativos=[valor == 'si' for valor in _lista(args.adaptativo)],
+        workers=_lista(args.workers, int),
+    )
+
+    with tempfile.TemporaryDirectory(prefix='ocr_benchmark_') as temporal:
+        carpeta = args.carpeta or temporal
+        os.makedirs(carpeta, exist_ok=True)
+        documentos = generar_documentos(carpeta, alumnos=args.alumnos, semanas=args.semanas,
+                                        ruido=args.ruido, rotacion_max=args.rotacion, semilla=args.semilla)
+        print(f"{documentos['paginas']} páginas sintéticas en {carpeta}")
+
+        resultados = []
+        for configuracion in lista:
+            print(f"Midiendo {configuracion}...")
+            resultados.append(ejecutar_configuracion(configuracion, documentos, detalle=args.detalle))
+
+    imprimir_resultados(resultados)
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(resultados, f, ensure_ascii=False, indent=2)
+    return resultados
+
+
+if __name__ == '__main__':
+    main()
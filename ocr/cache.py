@@ -0,0 +1,179 @@
+"""
+Caché OCR persistente en disco
+Guarda resultados de OCR indexados por el SHA-256 del PDF (o de la imagen)
+más los parámetros de Tesseract, con expulsión LRU limitada por tamaño
+"""
+import hashlib
+import json
+import os
+from functools import lru_cache
+
+# Incrementar cuando cambie el formato de los resultados guardados
+VERSION_CACHE = 2
+
+_cache_global = None
+
+
+@lru_cache(maxsize=1)
+def version_tesseract():
+    """Motor OCR y versión de Tesseract instalada (forma parte de la clave)"""
+    from .motores import obtener_motor
+
+    return obtener_motor().version()
+
+
+def huella_bytes(datos):
+    """SHA-256 de un bloque de bytes"""
+    return hashlib.sha256(datos).hexdigest()
+
+
+def huella_archivo(ruta, tamano_bloque=1024 * 1024):
+    """SHA-256 del contenido de un archivo, leído por bloques"""
+    sha = hashlib.sha256()
+    with open(ruta, 'rb') as f:
+        for bloque in iter(lambda: f.read(tamano_bloque), b''):
+            sha.update(bloque)
+    return sha.hexdigest()
+
+
+class OCRCache:
+    """Caché clave-valor en disco (JSON) con expulsión LRU por tamaño total"""
+
+    def __init__(self, directorio, tamano_maximo_mb=512):
+        """
+        Args:
+            directorio: Carpeta donde se guardan las entradas
+            tamano_maximo_mb: Tamaño máximo de la caché en MB
+        """
+        self.directorio = directorio
+        self.tamano_maximo = int(tamano_maximo_mb * 1024 * 1024)
+        self._tamano_actual = None
+
+    def clave(self, huella, **parametros):
+        """
+        Construye la clave de una entrada
+
+        Args:
+            huella: SHA-256 del PDF o de la imagen
+            **parametros: dpi, lang, psm, función... (todo lo que afecte al resultado)
+
+        Returns:
+            str: Clave hexadecimal
+        """
+        partes = [huella, f"v{VERSION_CACHE}", f"motor={version_tesseract()}"]
+        partes += [f"{nombre}={parametros[nombre]}" for nombre in sorted(parametros)]
+        return hashlib.sha256('|'.join(partes).encode('utf-8')).hexdigest()
+
+    def clave_archivo(self, ruta, **parametros):
+        """Clave para un archivo en disco (hash de su contenido)"""
+        return self.clave(huella_archivo(ruta), **parametros)
+
+    def obtener(self, clave):
+        """
+        Devuelve el valor guardado o None si no existe
+
+        Args:
+            clave: Clave generada con clave()/clave_archivo()
+        """
+        ruta = self._ruta(clave)
+        try:
+            with open(ruta, 'r', encoding='utf-8') as f:
+                valor = json.load(f)
+        except (OSError, ValueError):
+            return None
+
+        # Marcar como usada recientemente para la expulsión LRU
+        try:
+            os.utime(ruta, None)
+        except OSError:
+            pass
+        return valor
+
+    def guardar(self, clave, valor):
+        """
+        Guarda un valor serializable en JSON y expulsa entradas antiguas si hace falta
+
+        Args:
+            clave: Clave generada con clave()/clave_archivo()
+            valor: Listas, diccionarios, cadenas o números
+        """
+        ruta = self._ruta(clave)
+        temporal = f"{ruta}.{os.getpid()}.tmp"
+        try:
+            os.makedirs(os.path.dirname(ruta), exist_ok=True)
+            anterior = os.path.getsize(ruta) if os.path.exists(ruta) else 0
+            with open(temporal, 'w', encoding='utf-8') as f:
+                json.dump(valor, f, ensure_ascii=False)
+            os.replace(temporal, ruta)
+            self._tamano_actual = self._tamano() + os.path.getsize(ruta) - anterior
+            self._expulsar()
+        except OSError as e:
+            print(f"Advertencia: no se pudo guardar en caché OCR: {e}")
+            if os.path.exists(temporal):
+                os.unlink(temporal)
+
+    def limpiar(self):
+        """Elimina todas las entradas"""
+        for ruta, _, _ in self._entradas():
+            try:
+                os.unlink(ruta)
+            except OSError:
+                pass
+        self._tamano_actual = 0
+
+    def _ruta(self, clave):
+        return os.path.join(self.directorio, clave[:2], f"{clave}.json")
+
+    def _entradas(self):
+        """Lista de (ruta, último_uso, tamaño) de todas las entradas"""
+        entradas = []
+        if not os.path.isdir(self.directorio):
+            return entradas
+        for carpeta in os.scandir(self.directorio):
+            if not carpeta.is_dir():
+                continue
+            for entrada in os.scandir(carpeta.path):
+                if entrada.name.endswith('.json'):
+                    stat = entrada.stat()
+                    entradas.append((entrada.path, stat.st_mtime, stat.st_size))
+        return entradas
+
+    def _tamano(self):
+        if self._tamano_actual is None:
+            self._tamano_actual = sum(tamano for _, _, tamano in self._entradas())
+        return self._tamano_actual
+
+    def _expulsar(self):
+        """Borra las entradas menos usadas hasta bajar del 90% del límite"""
+        if self._tamano() <= self.tamano_maximo:
+            return
+
+        objetivo = self.tamano_maximo * 0.9
+        entradas = sorted(self._entradas(), key=lambda entrada: entrada[1])
+        self._tamano_actual = sum(tamano for _, _, tamano in entradas)
+
+        for ruta, _, tamano in entradas:
+            if self._tamano_actual <= objetivo:
+                break
+            try:
+                os.unlink(ruta)
+                self._tamano_actual -= tamano
+            except OSError:
+                pass
+
+
+def obtener_cache():
+    """
+    Caché compartida configurada en config.settings
+
+    Returns:
+        OCRCache o None si la caché está desactivada
+    """
+    global _cache_global
+    from config.settings import OCR_CACHE_ENABLED, OCR_CACHE_DIR, OCR_CACHE_MAX_MB
+
+    if not OCR_CACHE_ENABLED:
+        return None
+    if _cache_global is None:
+        _cache_global = OCRCache(OCR_CACHE_DIR, OCR_CACHE_MAX_MB)
+    return _cache_global
@@ -0,0 +1,141 @@
+"""
+Capa de texto de los PDFs
+Muchos PDFs (otorgamiento de becas, justificantes digitales) traen texto real;
+solo las páginas sin capa de texto utilizable necesitan rasterizado y OCR
+"""
+import os
+import tempfile
+from contextlib import contextmanager
+
+import pdfplumber
+
+from .espacial import PaginaOCR
+
+# Caracteres alfanuméricos mínimos para dar por buena la capa de texto de una página
+MINIMO_CARACTERES = 25
+
+
+def texto_util(texto, minimo_caracteres=MINIMO_CARACTERES):
+    """
+    Indica si el texto de una página es aprovechable sin OCR
+
+    Descarta páginas vacías, con solo un sello o pie de página, y capas de
+    texto basura (fuentes sin mapa de caracteres)
+
+    Args:
+        texto: Texto extraído con pdfplumber
+        minimo_caracteres: Caracteres alfanuméricos mínimos
+
+    Returns:
+        bool
+    """
+    if not texto:
+        return False
+    alfanumericos = sum(1 for c in texto if c.isalnum())
+    if alfanumericos < minimo_caracteres:
+        return False
+    visibles = sum(1 for c in texto if not c.isspace())
+    return alfanumericos / visibles >= 0.5
+
+
+def palabras_pagina(page, tolerancia=3):
+    """
+    Palabras de la capa de texto de una página de pdfplumber con su caja
+    normalizada (mismo formato que el OCR, con confianza 100)
+
+    Args:
+        page: Página de pdfplumber
+        tolerancia: Diferencia máxima de 'top' (puntos) dentro de una línea
+
+    Returns:
+        Lista de palabras
+    """
+    palabras = []
+    linea = -1
+    top_linea = None
+    for palabra in page.extract_words():
+        if top_linea is None or abs(palabra['top'] - top_linea) > tolerancia:
+            linea += 1
+            top_linea = palabra['top']
+        palabras.append({
+            'texto': palabra['text'],
+            'conf': 100.0,
+            'caja': (
+                round(palabra['x0'] / page.width, 5), round(palabra['top'] / page.height, 5),
+                round(palabra['x1'] / page.width, 5), round(palabra['bottom'] / page.height, 5),
+            ),
+            'linea': linea,
+            'bloque': 0,
+        })
+    return palabras
+
+
+def paginas_capa(pdf_path):
+    """
+    Capa de texto de cada página, con sus palabras y posiciones
+
+    Args:
+        pdf_path: Ruta al PDF
+
+    Returns:
+        Lista de PaginaOCR (texto '' si la página no tiene capa)
+    """
+    with pdfplumber.open(pdf_path) as pdf:
+        paginas = []
+        for page in pdf.pages:
+            texto = page.extract_text() or ''
+            palabras = palabras_pagina(page) if texto_util(texto) else []
+            paginas.append(PaginaOCR(palabras, texto=texto))
+            page.flush_cache()
+        return paginas
+
+
+@contextmanager
+def ruta_pdf(origen):
+    """
+    Ruta en disco para un PDF recibido como ruta, bytes o archivo subido
+
+    Los bytes y los archivos (p.ej. UploadedFile de Streamlit) se vuelcan a
+    un temporal que se borra al salir del bloque
+
+    Args:
+        origen: Ruta, bytes u objeto con read()
+    """
+    if isinstance(origen, (str, os.PathLike)):
+        yield str(origen)
+        return
+
+    if isinstance(origen, (bytes, bytearray)):
+        datos = bytes(origen)
+    else:
+        if hasattr(origen, 'seek'):
+            origen.seek(0)
+        datos = origen.read()
+
+    with tempfile.NamedTemporaryFile(suffix='.pdf', delete=False) as tmp:
+        tmp.write(datos)
+        temporal = tmp.name
+    try:
+        yield temporal
+    finally:
+        try:
+            os.unlink(temporal)
+        except OSError:
+            pass
+
+
+def extraer_texto_hibrido(origen, **kwargs):
+    """
+    Texto por página usando la capa de texto y OCR solo donde falta
+
+    Args:
+        origen: Ruta, bytes o archivo subido con el PDF
+        **kwargs: Parámetros de OCRDocument (dpi, lang, config, poppler_path...)
+
+    Returns:
+        Lista de textos por página
+    """
+    from .documento import OCRDocument
+
+    with ruta_pdf(origen) as pdf_path:
+        return list(OCRDocument(pdf_path, **kwargs).paginas)
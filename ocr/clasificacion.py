@@ -0,0 +1,107 @@
+"""
+Clasificación barata de páginas antes del OCR
+Con la capa de texto (si la hay), la proporción de tinta, la orientación de
+la página y un OCR rápido de su cabecera a baja resolución se decide qué es
+cada página (parte de firmas, justificante, otorgamiento, en blanco...). Solo
+se salta el OCR completo de las páginas en blanco y de las que son sin duda de
+un tipo que no interesa al extractor; ante la duda la página se lee.
+"""
+import re
+
+from .firmas import binarizar
+from .lote import textos_lote
+from .orientacion import miniatura, orientacion_rapida
+from .perfiles import config_perfil
+
+VACIA = 'vacia'
+DESCONOCIDA = 'desconocida'
+
+# Frases que solo aparecen en la cabecera (o la capa de texto) de cada tipo de
+# página. Los datos del curso, las becas o 'certificado de profesionalidad'
+# salen en páginas de varios tipos y no sirven para descartar ninguna
+TIPOS_PAGINA = {
+    'parte_firma': [r'SEMANA\s+DEL', r'PARTE\s+DE\s+FIRMAS?', r'CONTROL\s+DE\s+ASISTENCIA'],
+    'otorgamiento': [r'OTORGAMIENTO', r'BECAS\s+Y\s+AYUDAS'],
+    'justificante': [r'JUSTIFICANTE', r'prestaci[oó]n\s+(?:de\s+)?servicios', r'\bCERTIFICA\b',
+                     r'CITA\s+(?:M[EÉ]DICA|PREVIA)'],
+}
+
+# Proporción de tinta por debajo de la cual la página está en blanco
+TINTA_VACIA = 0.002
+
+# Parte superior de la página (en su orientación de lectura) que se lee para clasificarla
+ALTO_CABECERA = 0.2
+
+
+def tipo_por_texto(texto):
+    """
+    Tipo de página según su texto
+
+    Args:
+        texto: Texto de la capa de texto o de la cabecera
+
+    Returns:
+        Clave de TIPOS_PAGINA si el texto es solo de ese tipo; None si no
+        coincide ninguno o coinciden varios
+    """
+    tipos = [
+        tipo for tipo, patrones in TIPOS_PAGINA.items()
+        if any(re.search(patron, texto, re.IGNORECASE) for patron in patrones)
+    ]
+    return tipos[0] if len(tipos) == 1 else None
+
+
+def rasgos_pagina(image):
+    """
+    Rasgos de una página rasterizada que no necesitan OCR
+
+    Args:
+        image: Imagen PIL (en gris y a baja resolución)
+
+    Returns:
+        dict con 'tinta' (proporción) y 'rotacion' (grados en sentido horario
+        según ocr.orientacion, 0 si no está clara): una página apaisada o del
+        revés tiene la cabecera en otro lado
+    """
+    mini = miniatura(image)
+    tinta = float(binarizar(mini).mean())
+    rotacion = orientacion_rapida(mini) if tinta >= TINTA_VACIA else 0
+    return {
+        'tinta': tinta,
+        'rotacion': rotacion or 0,
+    }
+
+
+def recorte_cabecera(image, rotacion=0):
+    """Franja superior de la página una vez enderezada"""
+    if rotacion:
+        image = image.rotate(-rotacion, expand=True)
+    return image.crop((0, 0, image.width, max(1, int(image.height * ALTO_CABECERA))))
+
+
+def clasificar_imagenes(imagenes, lang='spa'):
+    """
+    Clasifica páginas escaneadas con una sola ejecución de Tesseract
+
+    Las páginas en blanco no se leen; del resto solo se lee la cabecera con
+    el perfil 'clasificacion' (modelo rápido). Las que tienen poca tinta (una
+    firma suelta, un justificante corto) no se dan por reversos: sin cabecera
+    reconocible son 'desconocida' y se leen
+
+    Args:
+        imagenes: Lista de imágenes PIL en gris a baja resolución
+        lang: Idioma de Tesseract
+
+    Returns:
+        Lista con el tipo de cada página
+    """
+    rasgos = [rasgos_pagina(image) for image in imagenes]
+    tipos = [VACIA if r['tinta'] < TINTA_VACIA else None for r in rasgos]
+
+    con_tinta = [indice for indice, tipo in enumerate(tipos) if tipo is None]
+    if con_tinta:
+        cabeceras = [recorte_cabecera(imagenes[i], rasgos[i]['rotacion']) for i in con_tinta]
+        textos = textos_lote(cabeceras, lang=lang, config=config_perfil('clasificacion'))
+        for indice, texto in zip(con_tinta, textos):
+            tipos[indice] = tipo_por_texto(texto) or DESCONOCIDA
+    return tipos
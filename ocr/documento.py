@@ -0,0 +1,519 @@
+"""
+Sesión OCR por documento
+Cada PDF se rasteriza y pasa por Tesseract una única vez; todos los
+extractores (fechas, nombres, firmas) trabajan sobre el mismo texto por página
+y sus palabras con posición (ver ocr.espacial). Las páginas con capa de texto
+utilizable no se rasterizan.
+"""
+from .cache import obtener_cache, huella_archivo
+from .capa_texto import paginas_capa
+from .clasificacion import DESCONOCIDA, TIPOS_PAGINA, VACIA, clasificar_imagenes, tipo_por_texto
+from .duplicados import codificar_pagina, decodificar_pagina, huella_perceptual, miniatura_comparacion
+from .espacial import PaginaOCR
+from .firmas import detectar_celdas_firmadas
+from .layouts import obtener_layout, recortar
+from .lote import textos_lote
+from .pagina import ocr_paginas
+from .paralelo import lotes_consecutivos, ocr_documentos_en_paralelo
+from .perfiles import carpeta_modelo, config_perfil
+from .preprocesado import preparar_lectura, preparar_pagina
+from .rasterizado import contar_paginas, iterar_paginas, rasterizar_pagina
+
+
+class OCRDocument:
+    """Texto OCR por página de un PDF, calculado la primera vez que se pide"""
+
+    def __init__(self, pdf_path, dpi=300, lang='spa', config='', poppler_path=None,
+                 usar_cache=True, capa_texto=True, adaptativo=None, layout=None, perfil=None, tipos=None):
+        """
+        Args:
+            pdf_path: Ruta al archivo PDF
+            dpi: Resolución de rasterizado
+            lang: Idioma de Tesseract
+            config: Opciones adicionales de Tesseract (p.ej. '--psm 6')
+            poppler_path: Carpeta de binarios de Poppler (por defecto, POPPLER_PATH de la configuración)
+            usar_cache: Reutilizar resultados de la caché OCR en disco
+            capa_texto: Usar la capa de texto del PDF en las páginas que la tengan
+            adaptativo: Primera pasada a baja resolución y relectura a `dpi` solo
+                donde haga falta (por defecto, OCR_ADAPTATIVO de la configuración)
+            layout: Layout registrado en ocr.layouts (p.ej. 'parte_firma') para
+                leer solo sus regiones en las páginas sin capa de texto
+            perfil: Perfil de ocr.perfiles para la página completa (p.ej.
+                'justificante_body'); `config` se añade a sus opciones
+            tipos: Tipos de página que interesan (ver ocr.clasificacion); si se
+                indican, las páginas se clasifican antes y las que están en
+                blanco o son sin duda de otro tipo no pasan por el OCR
+        """
+        from config.settings import OCR_ADAPTATIVO, OCR_DPI_BAJO
+
+        self.pdf_path = pdf_path
+        self.dpi = dpi
+        self.lang = lang
+        self.perfil = perfil
+        self.config = config_perfil(perfil, config) if perfil else config
+        self.poppler_path = poppler_path
+        self.usar_cache = usar_cache
+        self.capa_texto = capa_texto
+        if adaptativo is None:
+            adaptativo = OCR_ADAPTATIVO
+        self.dpi_bajo = OCR_DPI_BAJO if adaptativo and OCR_DPI_BAJO < dpi else None
+        self.layout = layout
+        self.tipos = tuple(tipos) if tipos else None
+        self._tipos_pagina = {}
+        self._capa = None
+        self._rejillas = None
+        self._huellas = None
+        # {página: (OCRDocument, página)} de las que repiten otra (ver ocr.duplicados)
+        self.duplicadas = {}
+        self._paginas = None
+        self._ocr = None
+        self._parciales = []
+        self._huella = None
+
+    @classmethod
+    def desde(cls, origen, **kwargs):
+        """
+        Devuelve un OCRDocument a partir de una ruta o reutiliza uno existente
+
+        Args:
+            origen: Ruta al PDF u OCRDocument ya creado
+            **kwargs: Parámetros de OCR si hay que crear la sesión
+
+        Returns:
+            OCRDocument
+        """
+        if isinstance(origen, cls):
+            return origen
+        return cls(origen, **kwargs)
+
+    @property
+    def cargado(self):
+        """True si el texto ya está disponible en memoria"""
+        return self._paginas is not None
+
+    @property
+    def paginas(self):
+        """Lista de textos por página"""
+        if self._paginas is None:
+            ocr_documentos_en_paralelo([self])
+        return self._paginas
+
+    @property
+    def paginas_ocr(self):
+        """Lista de PaginaOCR (texto y palabras con posición) por página"""
+        if self._ocr is None:
+            ocr_documentos_en_paralelo([self])
+        return self._ocr
+
+    def pagina_ocr(self, numero):
+        """
+        Palabras con posición de una página, para las consultas de ocr.espacial
+
+        Args:
+            numero: Número de página (empezando en 1)
+
+        Returns:
+            PaginaOCR o None si la página no existe
+        """
+        paginas = self.paginas_ocr
+        return paginas[numero - 1] if 0 < numero <= len(paginas) else None
+
+    @property
+    def texto(self):
+        """Texto completo del documento"""
+        return '\n'.join(self.paginas)
+
+    def __iter__(self):
+        return iter(self.paginas)
+
+    def __len__(self):
+        return len(self.paginas)
+
+    def iterar_textos(self, paginas_por_bloque=2):
+        """
+        Generador de (número_de_página, texto) que rasteriza y hace OCR bajo demanda
+
+        Las páginas se rasterizan por bloques, así que la memoria no crece con
+        el tamaño del PDF, y si el llamador deja de iterar (p.ej. al encontrar
+        el dato que busca) el resto del documento no se procesa. Lo ya leído
+        se conserva para siguientes lecturas.
+
+        Args:
+            paginas_por_bloque: Páginas rasterizadas de una vez
+        """
+        if self._paginas is not None or self.cargar_de_cache():
+            yield from enumerate(self._paginas, 1)
+            return
+
+        yield from enumerate([pagina.texto for pagina in self._parciales], 1)
+
+        try:
+            total = self.numero_paginas()
+            numero = len(self._parciales) + 1
+            while numero <= total:
+                if not self.pagina_relevante(numero):
+                    self._parciales.append(PaginaOCR([], texto=''))
+                    yield numero, ''
+                    numero += 1
+                    continue
+
+                pagina = self.pagina_capa(numero)
+                if pagina is not None:
+                    self._parciales.append(pagina)
+                    yield numero, pagina.texto
+                    numero += 1
+                    continue
+
+                # Bloque de páginas consecutivas sin capa de texto
+                ultima = numero
+                while (ultima < total and ultima - numero + 1 < paginas_por_bloque
+                       and self.pagina_capa(ultima + 1) is None and self.pagina_relevante(ultima + 1)):
+                    ultima += 1
+                bloque = list(iterar_paginas(
+                    self.pdf_path, dpi=self.dpi_bajo or self.dpi, paginas_por_bloque=paginas_por_bloque,
+                    poppler_path=self.poppler_path, primera=numero, ultima=ultima
+                ))
+                # Una sola ejecución de Tesseract para todo el bloque
+                leidas = ocr_paginas(
+                    [image for _, image in bloque], self.pdf_path, [n for n, _ in bloque],
+                    self.dpi, self.dpi_bajo, lang=self.lang, config=self.config,
+                    poppler_path=self.poppler_path, layout=self.layout
+                )
+                del bloque
+                for numero_imagen, pagina in zip(range(numero, ultima + 1), leidas):
+                    self._parciales.append(pagina)
+                    yield numero_imagen, pagina.texto
+                numero = ultima + 1
+        except Exception as e:
+            print(f"Error en OCR: {e}")
+            return
+
+        self.establecer_paginas(list(self._parciales))
+
+    def numero_paginas(self):
+        """Número de páginas del PDF"""
+        capa = self._paginas_capa()
+        if capa is not None:
+            return len(capa)
+        return contar_paginas(self.pdf_path, self.poppler_path)
+
+    def texto_capa(self, numero):
+        """
+        Texto de la capa de texto de una página si es utilizable
+
+        Args:
+            numero: Número de página (empezando en 1)
+
+        Returns:
+            str o None si la página necesita OCR
+        """
+        pagina = self.pagina_capa(numero)
+        return pagina.texto if pagina is not None else None
+
+    def pagina_capa(self, numero):
+        """
+        Capa de texto de una página (con sus palabras) si es utilizable
+
+        Args:
+            numero: Número de página (empezando en 1)
+
+        Returns:
+            PaginaOCR o None si la página necesita OCR
+        """
+        capa = self._paginas_capa()
+        if capa is None or numero > len(capa):
+            return None
+        pagina = capa[numero - 1]
+        return pagina if pagina.palabras else None
+
+    def _paginas_capa(self):
+        if not self.capa_texto:
+            return None
+        if self._capa is None:
+            try:
+                self._capa = paginas_capa(self.pdf_path)
+            except Exception as e:
+                print(f"Advertencia: no se pudo leer la capa de texto: {e}")
+                self._capa = []
+        # Lista vacía = PDF ilegible para pdfplumber; se delega en Poppler
+        return self._capa or None
+
+    def tipo_pagina(self, numero):
+        """
+        Tipo de una página según ocr.clasificacion, sin hacer su OCR
+
+        Las páginas escaneadas se clasifican por bloques bajo demanda, así que
+        preguntar por la primera no rasteriza todo el documento
+
+        Args:
+            numero: Número de página (empezando en 1)
+
+        Returns:
+            str: Clave de TIPOS_PAGINA, 'vacia' o 'desconocida'
+        """
+        if not self._tipos_pagina:
+            self._cargar_tipos_de_cache()
+        if numero not in self._tipos_pagina:
+            self._clasificar_desde(numero)
+        return self._tipos_pagina.get(numero, DESCONOCIDA)
+
+    def pagina_relevante(self, numero):
+        """
+        True si la página debe pasar por el OCR (según `tipos`)
+
+        Solo se descartan las páginas en blanco y las clasificadas sin
+        ambigüedad como de un tipo que no se ha pedido; cualquier otra
+        etiqueta (desconocida, o una antigua de la caché) se lee
+        """
+        if not self.tipos:
+            return True
+        tipo = self.tipo_pagina(numero)
+        if tipo == VACIA:
+            return False
+        return tipo in self.tipos or tipo not in TIPOS_PAGINA
+
+    def _clasificar_desde(self, numero, paginas_por_bloque=10):
+        from config.settings import OCR_DPI_CLASIFICACION
+
+        total = self.numero_paginas()
+        ultima = min(total, numero + paginas_por_bloque - 1)
+        pendientes = []
+        for actual in range(numero, ultima + 1):
+            if actual in self._tipos_pagina:
+                continue
+            pagina = self.pagina_capa(actual)
+            if pagina is not None:
+                # Capa de texto: se clasifica con su texto, sin rasterizar
+                self._tipos_pagina[actual] = tipo_por_texto(pagina.texto) or DESCONOCIDA
+            else:
+                pendientes.append(actual)
+
+        try:
+            for lote in lotes_consecutivos(pendientes, paginas_por_bloque):
+                imagenes = [image for _, image in iterar_paginas(
+                    self.pdf_path, dpi=OCR_DPI_CLASIFICACION, paginas_por_bloque=len(lote),
+                    poppler_path=self.poppler_path, primera=lote[0], ultima=lote[-1], grayscale=True
+                )]
+                self._tipos_pagina.update(zip(lote, clasificar_imagenes(imagenes, lang=self.lang)))
+        except Exception as e:
+            # Sin clasificación se hace el OCR de todas las páginas, como antes
+            print(f"Advertencia: no se pudieron clasificar las páginas: {e}")
+            for actual in pendientes:
+                self._tipos_pagina.setdefault(actual, DESCONOCIDA)
+            return
+
+        if len(self._tipos_pagina) >= total:
+            cache = obtener_cache() if self.usar_cache else None
+            if cache:
+                try:
+                    cache.guardar(self._clave_tipos(cache), [self._tipos_pagina[n] for n in range(1, total + 1)])
+                except OSError:
+                    pass
+
+    def _cargar_tipos_de_cache(self):
+        cache = obtener_cache() if self.usar_cache else None
+        if not cache:
+            return
+        try:
+            guardado = cache.obtener(self._clave_tipos(cache))
+        except OSError:
+            return
+        if guardado is not None:
+            self._tipos_pagina = {numero: tipo for numero, tipo in enumerate(guardado, 1)}
+
+    def _clave_tipos(self, cache):
+        from config.settings import OCR_DPI_CLASIFICACION
+
+        return cache.clave(self.huella, funcion='tipos_pagina', dpi=OCR_DPI_CLASIFICACION,
+                           lang=self.lang, capa_texto=self.capa_texto, tipos=TIPOS_PAGINA)
+
+    def celdas_firmadas(self, numero):
+        """
+        Celdas firmadas de la rejilla del layout en una página (ver ocr.firmas)
+
+        Args:
+            numero: Número de página (empezando en 1)
+
+        Returns:
+            Lista de filas con un bool por celda, o None si el layout no tiene
+            rejilla o no se detecta en la página
+        """
+        rejillas = self._rejillas_firmas()
+        if numero > len(rejillas):
+            return None
+        return rejillas[numero - 1]
+
+    def _rejillas_firmas(self):
+        if self._rejillas is not None:
+            return self._rejillas
+
+        datos_layout = obtener_layout(self.layout)
+        if not datos_layout or 'rejilla' not in datos_layout:
+            self._rejillas = []
+            return self._rejillas
+
+        from config.settings import OCR_DPI_FIRMAS
+
+        rejilla = datos_layout['rejilla']
+        cache = obtener_cache() if self.usar_cache else None
+        clave = None
+        if cache:
+            try:
+                clave = cache.clave(self.huella, funcion='celdas_firmadas', dpi=OCR_DPI_FIRMAS, rejilla=rejilla)
+                guardado = cache.obtener(clave)
+            except OSError:
+                guardado = None
+            if guardado is not None:
+                self._rejillas = guardado
+                return self._rejillas
+
+        # Rasterizado en gris a baja resolución: basta para medir la tinta
+        rejillas = []
+        try:
+            for _, image in iterar_paginas(self.pdf_path, dpi=OCR_DPI_FIRMAS,
+                                           poppler_path=self.poppler_path, grayscale=True):
+                rejillas.append(detectar_celdas_firmadas(image, rejilla))
+        except Exception as e:
+            print(f"Error detectando firmas: {e}")
+            self._rejillas = []
+            return self._rejillas
+
+        self._rejillas = rejillas
+        if clave:
+            try:
+                cache.guardar(clave, rejillas)
+            except OSError:
+                pass
+        return self._rejillas
+
+    def huellas_paginas(self):
+        """
+        Huella perceptual y miniatura de comparación de cada página
+
+        Returns:
+            Lista de tuplas (huella, miniatura); vacía si no se puede rasterizar
+        """
+        if self._huellas is not None:
+            return self._huellas
+
+        from config.settings import OCR_DPI_HUELLA
+
+        cache = obtener_cache() if self.usar_cache else None
+        clave = None
+        if cache:
+            try:
+                clave = cache.clave(self.huella, funcion='huellas_paginas', dpi=OCR_DPI_HUELLA)
+                guardado = cache.obtener(clave)
+            except OSError:
+                guardado = None
+            if guardado is not None:
+                self._huellas = [decodificar_pagina(datos) for datos in guardado]
+                return self._huellas
+
+        huellas = []
+        try:
+            for _, image in iterar_paginas(self.pdf_path, dpi=OCR_DPI_HUELLA, paginas_por_bloque=10,
+                                           poppler_path=self.poppler_path, grayscale=True):
+                huellas.append((huella_perceptual(image), miniatura_comparacion(image)))
+        except Exception as e:
+            print(f"Advertencia: no se pudieron calcular las huellas de página: {e}")
+            self._huellas = []
+            return self._huellas
+
+        self._huellas = huellas
+        if clave:
+            try:
+                cache.guardar(clave, [codificar_pagina(h, m) for h, m in huellas])
+            except OSError:
+                pass
+        return self._huellas
+
+    def paginas_leidas(self):
+        """PaginaOCR de las primeras páginas ya procesadas con iterar_textos()"""
+        return list(self._parciales)
+
+    def cargar_de_cache(self):
+        """
+        Intenta recuperar el texto de la caché OCR en disco
+
+        Returns:
+            bool: True si se encontró
+        """
+        cache = obtener_cache() if self.usar_cache else None
+        if not cache:
+            return False
+        try:
+            guardado = cache.obtener(self._clave_cache(cache))
+        except OSError:
+            return False
+        if guardado is None:
+            return False
+        self._ocr = [
+            PaginaOCR.desde_lista(palabras, texto=texto)
+            for texto, palabras in zip(guardado['textos'], guardado['palabras'])
+        ]
+        self._paginas = guardado['textos']
+        return True
+
+    def establecer_paginas(self, paginas, guardar=True):
+        """
+        Fija el resultado por página (lo usa el OCR en paralelo) y lo guarda en caché
+
+        Args:
+            paginas: Lista de PaginaOCR por página
+            guardar: Guardar también en la caché en disco
+        """
+        self._ocr = paginas
+        self._paginas = [pagina.texto for pagina in paginas]
+        cache = obtener_cache() if self.usar_cache and guardar else None
+        if cache:
+            try:
+                cache.guardar(self._clave_cache(cache), {
+                    'textos': self._paginas,
+                    'palabras': [pagina.a_lista() for pagina in paginas],
+                })
+            except OSError:
+                pass
+
+    def leer_campo(self, numero, caja, perfil):
+        """
+        Vuelve a leer una zona pequeña de una página escaneada con un perfil de
+        campo (p.ej. 'date_field' a la derecha de una etiqueta localizada con
+        pagina_ocr)
+
+        Args:
+            numero: Número de página (empezando en 1)
+            caja: (x0, y0, x1, y1) normalizada, en las coordenadas de pagina_ocr()
+            perfil: Nombre del perfil en ocr.perfiles
+
+        Returns:
+            str con el texto leído ('' si la página tiene capa de texto o falla)
+        """
+        if self.pagina_capa(numero) is not None:
+            return ''
+        try:
+            image = rasterizar_pagina(self.pdf_path, numero, dpi=self.dpi, poppler_path=self.poppler_path)
+            image, _ = preparar_pagina(image)
+            recorte, _ = preparar_lectura(recortar(image, caja))
+            return textos_lote([recorte], lang=self.lang, config=config_perfil(perfil))[0].strip()
+        except Exception as e:
+            print(f"Error leyendo campo ({perfil}): {e}")
+            return ''
+
+    @property
+    def huella(self):
+        """SHA-256 del contenido del PDF"""
+        if self._huella is None:
+            self._huella = huella_archivo(self.pdf_path)
+        return self._huella
+
+    def _clave_cache(self, cache):
+        from config.settings import OCR_PREPROCESADO
+
+        datos_layout = obtener_layout(self.layout)
+        return cache.clave(
+            self.huella, funcion='texto_paginas', preprocesado=OCR_PREPROCESADO,
+            dpi=self.dpi, dpi_bajo=self.dpi_bajo, lang=self.lang, config=self.config,
+            capa_texto=self.capa_texto, tipos=self.tipos, modelos=(carpeta_modelo('fast'), carpeta_modelo('best')),
+            layout=self.layout, version_layout=datos_layout['version'] if datos_layout else None
+        )
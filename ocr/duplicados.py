@@ -0,0 +1,164 @@
+"""
+Índice de páginas duplicadas entre PDFs
+Los operadores suben a menudo PDFs de firmas que se solapan (el escaneo
+semanal y la recopilación mensual con las mismas hojas). Con una huella
+perceptual (dHash) de cada página se detectan las casi idénticas para hacer
+su OCR una sola vez y contarlas una sola vez.
+"""
+import base64
+
+import numpy as np
+from PIL import Image
+
+from .firmas import binarizar
+
+# dHash de TAMANO_HUELLA x TAMANO_HUELLA bits
+TAMANO_HUELLA = 16
+
+# Diferencia de gris mínima para que un gradiente cuente (zonas en blanco estables)
+UMBRAL_GRADIENTE = 2
+
+# Mapa de tinta para confirmar candidatos (ancho, alto) y lado de sus celdas
+TAMANO_MINIATURA = (400, 566)
+LADO_CELDA = 16
+
+
+def huella_perceptual(image):
+    """
+    dHash de una página: signo del gradiente horizontal en una miniatura
+
+    Args:
+        image: Imagen PIL
+
+    Returns:
+        np.ndarray de bool con TAMANO_HUELLA * TAMANO_HUELLA bits
+    """
+    gris = np.asarray(
+        image.convert('L').resize((TAMANO_HUELLA + 1, TAMANO_HUELLA), Image.BOX), dtype=np.int16
+    )
+    return (gris[:, 1:] - gris[:, :-1] > UMBRAL_GRADIENTE).ravel()
+
+
+def miniatura_comparacion(image):
+    """Mapa de tinta (bool) reducido para confirmar que dos páginas son la misma"""
+    return binarizar(image.convert('L').resize(TAMANO_MINIATURA, Image.BOX))
+
+
+def codificar_pagina(huella, miniatura):
+    """Huella y miniatura serializadas para la caché OCR (JSON)"""
+    return [
+        base64.b64encode(np.packbits(huella).tobytes()).decode('ascii'),
+        base64.b64encode(np.packbits(miniatura).tobytes()).decode('ascii'),
+    ]
+
+
+def decodificar_pagina(datos):
+    """Inversa de codificar_pagina()"""
+    huella = np.unpackbits(np.frombuffer(base64.b64decode(datos[0]), dtype=np.uint8)).astype(bool)
+    ancho, alto = TAMANO_MINIATURA
+    miniatura = np.unpackbits(np.frombuffer(base64.b64decode(datos[1]), dtype=np.uint8))[:ancho * alto]
+    return huella, miniatura.astype(bool).reshape(alto, ancho)
+
+
+def _dilatar(tinta):
+    """Dilata un mapa de tinta un píxel en las 8 direcciones"""
+    alto, ancho = tinta.shape
+    relleno = np.pad(tinta, 1)
+    resultado = np.zeros_like(tinta)
+    for dy in range(3):
+        for dx in range(3):
+            resultado |= relleno[dy:dy + alto, dx:dx + ancho]
+    return resultado
+
+
+def misma_pagina(a, b, diferencia_maxima=6):
+    """
+    Confirma que dos mapas de tinta son la misma página
+
+    Cuenta la tinta de cada página que no aparece (con un píxel de
+    tolerancia) en la otra y la compara por celdas en lugar de globalmente:
+    dos hojas de firmas de alumnos distintos comparten casi toda la
+    plantilla y solo difieren en el nombre y las firmas
+
+    Args:
+        a, b: Mapas de miniatura_comparacion()
+        diferencia_maxima: Píxeles distintos tolerados en cada celda
+
+    Returns:
+        bool
+    """
+    diferencia = (a & ~_dilatar(b)) | (b & ~_dilatar(a))
+    alto, ancho = diferencia.shape
+    celdas = diferencia[:alto - alto % LADO_CELDA, :ancho - ancho % LADO_CELDA].reshape(
+        alto // LADO_CELDA, LADO_CELDA, ancho // LADO_CELDA, LADO_CELDA
+    ).sum(axis=(1, 3))
+    return bool(celdas.max() <= diferencia_maxima)
+
+
+class IndicePaginas:
+    """Índice de huellas perceptuales de las páginas vistas en una ejecución"""
+
+    def __init__(self, distancia_maxima=32, diferencia_maxima=6):
+        """
+        Args:
+            distancia_maxima: Bits distintos (de 256) para considerar candidata una página
+            diferencia_maxima: Píxeles distintos por celda tolerados al confirmar el duplicado
+        """
+        self.distancia_maxima = distancia_maxima
+        self.diferencia_maxima = diferencia_maxima
+        self._claves = []
+        self._huellas = np.zeros((0, TAMANO_HUELLA * TAMANO_HUELLA), dtype=bool)
+        self._miniaturas = []
+
+    def __len__(self):
+        return len(self._claves)
+
+    def buscar_o_anadir(self, clave, huella, miniatura):
+        """
+        Devuelve la clave de la página original si ya hay una casi idéntica;
+        si no, añade esta al índice
+
+        Args:
+            clave: Identificador de la página (p.ej. (documento, número))
+            huella: Resultado de huella_perceptual()
+            miniatura: Resultado de miniatura_comparacion()
+
+        Returns:
+            Clave de la página original o None
+        """
+        if len(self._claves):
+            distancias = np.count_nonzero(self._huellas != huella, axis=1)
+            for posicion in np.argsort(distancias):
+                if distancias[posicion] > self.distancia_maxima:
+                    break
+                if misma_pagina(self._miniaturas[posicion], miniatura, self.diferencia_maxima):
+                    return self._claves[posicion]
+
+        self._claves.append(clave)
+        self._huellas = np.vstack([self._huellas, huella[None, :]])
+        self._miniaturas.append(miniatura)
+        return None
+
+
+def indexar_duplicados(documentos):
+    """
+    Marca en cada OCRDocument las páginas que repiten otra ya vista
+
+    Las páginas duplicadas no se pasan por el OCR (toman el texto de la
+    original) y los extractores pueden ignorarlas al contar
+
+    Args:
+        documentos: Lista de OCRDocument, en el orden de prioridad
+
+    Returns:
+        int: Número de páginas duplicadas encontradas
+    """
+    indice = IndicePaginas()
+    duplicadas = 0
+    for doc in documentos:
+        for numero, (huella, miniatura) in enumerate(doc.huellas_paginas(), 1):
+            original = indice.buscar_o_anadir((doc, numero), huella, miniatura)
+            if original is not None:
+                doc.duplicadas[numero] = original
+                duplicadas += 1
+    return duplicadas
@@ -0,0 +1,331 @@
+"""
+Resultado OCR con posiciones
+Cada página guarda sus palabras con caja (normalizada a la página, 0-1),
+confianza, línea y bloque. PaginaOCR indexa las palabras por token y por
+zona de la página para que los extractores busquen "el texto a la derecha de
+la etiqueta X" o "las líneas bajo la cabecera Y" sin recorrer todo el texto
+con expresiones regulares.
+"""
+import re
+import unicodedata
+from collections import OrderedDict, defaultdict
+
+# Celdas por lado de la rejilla que indexa las palabras por zona
+CELDAS_REJILLA = 16
+
+
+def normalizar_token(texto):
+    """Token en minúsculas, sin tildes ni signos de puntuación"""
+    texto = unicodedata.normalize('NFKD', texto)
+    texto = ''.join(c for c in texto if not unicodedata.combining(c))
+    return re.sub(r'[^\w]', '', texto.lower())
+
+
+def palabras_de_datos(datos, origen=(0, 0), ancho=1, alto=1):
+    """
+    Palabras con caja normalizada a partir de image_to_data / datos_lote
+
+    Args:
+        datos: dict {campo: [valores]} de Tesseract
+        origen: Posición (x, y) en píxeles de la imagen leída dentro de la página
+        ancho, alto: Tamaño en píxeles de la página
+
+    Returns:
+        Lista de palabras; 'bloque' es el block_num de Tesseract y 'linea' un
+        identificador único dentro de esta lectura
+    """
+    ox, oy = origen
+    ancho = max(ancho, 1)
+    alto = max(alto, 1)
+    lineas = {}
+    palabras = []
+
+    for i, texto in enumerate(datos['text']):
+        texto = (texto or '').strip()
+        if not texto:
+            continue
+        try:
+            confianza = float(datos['conf'][i])
+        except (TypeError, ValueError):
+            continue
+        if confianza < 0:
+            continue
+
+        clave_linea = (datos['block_num'][i], datos['par_num'][i], datos['line_num'][i])
+        x, y = ox + datos['left'][i], oy + datos['top'][i]
+        palabras.append({
+            'texto': texto,
+            'conf': confianza,
+            'caja': (
+                round(x / ancho, 5), round(y / alto, 5),
+                round((x + datos['width'][i]) / ancho, 5), round((y + datos['height'][i]) / alto, 5),
+            ),
+            'linea': lineas.setdefault(clave_linea, len(lineas)),
+            'bloque': datos['block_num'][i],
+        })
+    return palabras
+
+
+def unir_palabras(grupos):
+    """
+    Une las palabras de varias lecturas de una misma página (p.ej. las
+    regiones de un layout) renumerando líneas y bloques para que no se repitan
+
+    Args:
+        grupos: Lista de listas de palabras
+
+    Returns:
+        Lista de palabras
+    """
+    lineas = {}
+    bloques = {}
+    unidas = []
+    for grupo, palabras in enumerate(grupos):
+        for palabra in palabras:
+            unidas.append(dict(
+                palabra,
+                linea=lineas.setdefault((grupo, palabra['bloque'], palabra['linea']), len(lineas)),
+                bloque=bloques.setdefault((grupo, palabra['bloque']), len(bloques)),
+            ))
+    return unidas
+
+
+def texto_de_palabras(palabras):
+    """
+    Texto plano de una lista de palabras: una línea por línea de Tesseract y
+    una línea en blanco entre bloques (como image_to_string)
+    """
+    lineas = OrderedDict()
+    for palabra in palabras:
+        lineas.setdefault((palabra['bloque'], palabra['linea']), []).append(palabra['texto'])
+
+    partes = []
+    bloque_anterior = None
+    for (bloque, _), textos in lineas.items():
+        if bloque_anterior is not None and bloque != bloque_anterior:
+            partes.append('')
+        partes.append(' '.join(textos))
+        bloque_anterior = bloque
+    return '\n'.join(partes)
+
+
+class PaginaOCR:
+    """Palabras OCR de una página con consultas espaciales"""
+
+    def __init__(self, palabras, texto=None):
+        """
+        Args:
+            palabras: Lista de dicts con texto, conf, caja, linea y bloque
+            texto: Texto plano (por defecto, compuesto a partir de las palabras)
+        """
+        self.palabras = palabras
+        self._texto = texto
+        self._lineas = None
+        self._tokens = None
+        self._rejilla = None
+
+    @classmethod
+    def desde_lista(cls, datos, texto=None):
+        """Reconstruye la página desde a_lista() (formato de la caché)"""
+        return cls([
+            {'texto': p[0], 'conf': p[1], 'caja': tuple(p[2:6]), 'linea': p[6], 'bloque': p[7]}
+            for p in datos
+        ], texto=texto)
+
+    def a_lista(self):
+        """Palabras como listas (JSON compacto para la caché)"""
+        return [
+            [p['texto'], p['conf'], *p['caja'], p['linea'], p['bloque']]
+            for p in self.palabras
+        ]
+
+    @property
+    def texto(self):
+        if self._texto is None:
+            self._texto = texto_de_palabras(self.palabras)
+        return self._texto
+
+    def lineas(self):
+        """
+        Líneas de la página en orden de lectura
+
+        Returns:
+            Lista de listas de palabras (ordenadas de izquierda a derecha)
+        """
+        if self._lineas is None:
+            agrupadas = OrderedDict()
+            for palabra in self.palabras:
+                agrupadas.setdefault(palabra['linea'], []).append(palabra)
+            self._lineas = [sorted(linea, key=lambda p: p['caja'][0]) for linea in agrupadas.values()]
+        return self._lineas
+
+    def _indice_tokens(self):
+        """{token normalizado: [(línea, posición)]}"""
+        if self._tokens is None:
+            self._tokens = defaultdict(list)
+            for indice_linea, linea in enumerate(self.lineas()):
+                for posicion, palabra in enumerate(linea):
+                    self._tokens[normalizar_token(palabra['texto'])].append((indice_linea, posicion))
+        return self._tokens
+
+    def _indice_rejilla(self):
+        """{(fila, columna): [índices de palabras]} sobre una rejilla de la página"""
+        if self._rejilla is None:
+            self._rejilla = defaultdict(list)
+            for indice, palabra in enumerate(self.palabras):
+                for celda in _celdas(palabra['caja']):
+                    self._rejilla[celda].append(indice)
+        return self._rejilla
+
+    def buscar(self, etiqueta):
+        """
+        Apariciones de una etiqueta (una o varias palabras seguidas en una línea)
+
+        Args:
+            etiqueta: Texto de la etiqueta, p.ej. 'Fecha de inicio'
+
+        Returns:
+            Lista de listas con las palabras de cada aparición
+        """
+        tokens = [normalizar_token(t) for t in etiqueta.split()]
+        tokens = [t for t in tokens if t]
+        if not tokens:
+            return []
+
+        lineas = self.lineas()
+        apariciones = []
+        for indice_linea, posicion in self._indice_tokens().get(tokens[0], []):
+            linea = lineas[indice_linea]
+            candidatas = linea[posicion:posicion + len(tokens)]
+            if [normalizar_token(p['texto']) for p in candidatas] == tokens:
+                apariciones.append(candidatas)
+        return apariciones
+
+    def en_caja(self, caja):
+        """
+        Palabras cuyo centro cae dentro de una caja normalizada
+
+        Args:
+            caja: (x0, y0, x1, y1) en fracción de la página
+
+        Returns:
+            Lista de palabras ordenadas por línea y posición
+        """
+        x0, y0, x1, y1 = caja
+        indices = set()
+        for celda in _celdas(caja):
+            indices.update(self._indice_rejilla().get(celda, []))
+
+        dentro = []
+        for indice in sorted(indices):
+            palabra = self.palabras[indice]
+            cx = (palabra['caja'][0] + palabra['caja'][2]) / 2
+            cy = (palabra['caja'][1] + palabra['caja'][3]) / 2
+            if x0 <= cx <= x1 and y0 <= cy <= y1:
+                dentro.append(palabra)
+        return dentro
+
+    def caja_derecha_de(self, etiqueta, ancho=None, aparicion=0):
+        """
+        Caja normalizada a la derecha de una etiqueta, a su misma altura
+
+        Args:
+            etiqueta: Texto de la etiqueta, p.ej. 'Fecha de inicio'
+            ancho: Ancho de la caja en fracción de página (None = hasta el borde)
+            aparicion: Qué aparición de la etiqueta usar (0 = la primera)
+
+        Returns:
+            (x0, y0, x1, y1) o None si la etiqueta no está en la página
+        """
+        apariciones = self.buscar(etiqueta)
+        if len(apariciones) <= aparicion:
+            return None
+        palabras_etiqueta = apariciones[aparicion]
+        x0 = palabras_etiqueta[-1]['caja'][2]
+        y0 = min(p['caja'][1] for p in palabras_etiqueta)
+        y1 = max(p['caja'][3] for p in palabras_etiqueta)
+        return (x0, y0, 1.0 if ancho is None else min(1.0, x0 + ancho), y1)
+
+    def derecha_de(self, etiqueta, hasta=None, aparicion=0):
+        """
+        Texto a la derecha de una etiqueta, a la misma altura
+
+        Args:
+            etiqueta: Texto de la etiqueta, p.ej. 'Nombre'
+            hasta: Expresión regular de la palabra en la que cortar (p.ej. 'NIF|DNI')
+            aparicion: Qué aparición de la etiqueta usar (0 = la primera)
+
+        Returns:
+            str o None si la etiqueta no está en la página
+        """
+        caja = self.caja_derecha_de(etiqueta, aparicion=aparicion)
+        if caja is None:
+            return None
+
+        valores = sorted(
+            (p for p in self.en_caja(caja) if p['caja'][0] >= caja[0] - 1e-4),
+            key=lambda p: p['caja'][0]
+        )
+        textos = []
+        for palabra in valores:
+            if hasta and re.fullmatch(hasta, palabra['texto'].strip(':'), re.IGNORECASE):
+                break
+            textos.append(palabra['texto'])
+        return ' '.join(textos)
+
+    def lineas_con(self, patron):
+        """
+        Líneas cuyo texto cumple una expresión regular
+
+        Args:
+            patron: Expresión regular (str o compilada), se aplica con search
+
+        Returns:
+            Lista de tuplas (índice_de_línea, match)
+        """
+        patron = re.compile(patron, re.IGNORECASE) if isinstance(patron, str) else patron
+        resultado = []
+        for indice, linea in enumerate(self.lineas()):
+            match = patron.search(' '.join(p['texto'] for p in linea))
+            if match:
+                resultado.append((indice, match))
+        return resultado
+
+    def lineas_bajo(self, indice_linea, numero=None, hasta=None):
+        """
+        Textos de las líneas situadas debajo de una línea
+
+        Args:
+            indice_linea: Índice de la línea de referencia (ver lineas_con)
+            numero: Máximo de líneas a devolver (None = todas)
+            hasta: Expresión regular de la línea en la que parar (p.ej. la
+                siguiente cabecera); esa línea no se incluye
+
+        Returns:
+            Lista de textos de línea, de arriba abajo
+        """
+        lineas = self.lineas()
+        referencia = max(p['caja'][3] for p in lineas[indice_linea])
+        debajo = sorted(
+            (linea for linea in lineas if min(p['caja'][1] for p in linea) >= referencia - 1e-4),
+            key=lambda linea: min(p['caja'][1] for p in linea)
+        )
+        textos = []
+        for linea in debajo:
+            texto = ' '.join(p['texto'] for p in linea)
+            if hasta and re.search(hasta, texto, re.IGNORECASE):
+                break
+            textos.append(texto)
+            if numero is not None and len(textos) >= numero:
+                break
+        return textos
+
+
+def _celdas(caja):
+    """Celdas de la rejilla que toca una caja normalizada"""
+    x0, y0, x1, y1 = caja
+    c0 = min(max(int(x0 * CELDAS_REJILLA), 0), CELDAS_REJILLA - 1)
+    c1 = min(max(int(x1 * CELDAS_REJILLA), 0), CELDAS_REJILLA - 1)
+    f0 = min(max(int(y0 * CELDAS_REJILLA), 0), CELDAS_REJILLA - 1)
+    f1 = min(max(int(y1 * CELDAS_REJILLA), 0), CELDAS_REJILLA - 1)
+    return [(fila, columna) for fila in range(f0, f1 + 1) for columna in range(c0, c1 + 1)]
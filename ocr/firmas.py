@@ -0,0 +1,165 @@
+"""
+Detección de firmas por densidad de tinta
+Localiza la rejilla de firmas en la página rasterizada (líneas horizontales y
+verticales) y mide la tinta dentro de cada celda con NumPy, sin pasar por
+Tesseract
+"""
+from datetime import timedelta
+
+import numpy as np
+
+from .layouts import recortar
+
+# Fracción de la celda que se descarta en cada borde (líneas de la rejilla)
+MARGEN_CELDA = 0.15
+
+
+def umbral_otsu(gris):
+    """
+    Umbral de binarización de Otsu calculado sobre el histograma
+
+    Args:
+        gris: Array uint8 en escala de grises
+
+    Returns:
+        int entre 0 y 255 (los niveles <= umbral son tinta)
+    """
+    histograma = np.bincount(gris.ravel(), minlength=256).astype(np.float64)
+    total = histograma.sum()
+    if total == 0:
+        return 128
+    niveles = np.arange(256)
+    peso_fondo = np.cumsum(histograma)
+    suma_fondo = np.cumsum(histograma * niveles)
+    peso_frente = total - peso_fondo
+    with np.errstate(divide='ignore', invalid='ignore'):
+        media_fondo = suma_fondo / peso_fondo
+        media_frente = (suma_fondo[-1] - suma_fondo) / peso_frente
+        varianza = peso_fondo * peso_frente * (media_fondo - media_frente) ** 2
+    varianza = np.nan_to_num(varianza)
+    return int(np.argmax(varianza))
+
+
+def binarizar(image):
+    """
+    Imagen PIL a matriz booleana de tinta (True = píxel oscuro)
+
+    Args:
+        image: Imagen PIL
+
+    Returns:
+        np.ndarray de bool
+    """
+    gris = np.asarray(image.convert('L'), dtype=np.uint8)
+    return gris <= umbral_otsu(gris)
+
+
+def posiciones_lineas(tinta, eje, fraccion=0.5):
+    """
+    Posiciones de las líneas rectas de la rejilla en un eje
+
+    Args:
+        tinta: Matriz booleana de tinta
+        eje: 0 para líneas horizontales (filas), 1 para verticales (columnas)
+        fraccion: Fracción mínima de píxeles con tinta para considerar línea
+
+    Returns:
+        Lista de posiciones (centro de cada línea)
+    """
+    perfil = tinta.sum(axis=1 - eje)
+    longitud = tinta.shape[1 - eje]
+    indices = np.flatnonzero(perfil >= fraccion * longitud)
+    if not len(indices):
+        return []
+    # Píxeles contiguos forman una misma línea (líneas de varios píxeles de grosor)
+    grupos = np.split(indices, np.flatnonzero(np.diff(indices) > 1) + 1)
+    return [int(grupo.mean()) for grupo in grupos]
+
+
+def _intervalos(lineas, tamano_minimo):
+    """Pares (inicio, fin) entre líneas consecutivas, descartando huecos mínimos"""
+    return [(a, b) for a, b in zip(lineas, lineas[1:]) if b - a >= tamano_minimo]
+
+
+def densidad_celdas(tinta, filas, columnas, margen=MARGEN_CELDA):
+    """
+    Proporción de tinta en el interior de cada celda (vectorizado con imagen integral)
+
+    Args:
+        tinta: Matriz booleana de tinta
+        filas: Lista de (y0, y1) de cada fila
+        columnas: Lista de (x0, x1) de cada columna
+        margen: Fracción de cada borde de la celda que se ignora
+
+    Returns:
+        np.ndarray (filas x columnas) con la densidad de tinta
+    """
+    integral = np.pad(tinta.astype(np.int32).cumsum(axis=0).cumsum(axis=1), ((1, 0), (1, 0)))
+
+    f = np.asarray(filas, dtype=np.float64)
+    c = np.asarray(columnas, dtype=np.float64)
+    alto = f[:, 1] - f[:, 0]
+    ancho = c[:, 1] - c[:, 0]
+    y0 = (f[:, 0] + alto * margen).astype(int)[:, None]
+    y1 = (f[:, 1] - alto * margen).astype(int)[:, None]
+    x0 = (c[:, 0] + ancho * margen).astype(int)[None, :]
+    x1 = (c[:, 1] - ancho * margen).astype(int)[None, :]
+
+    suma = integral[y1, x1] - integral[y0, x1] - integral[y1, x0] + integral[y0, x0]
+    area = np.maximum((y1 - y0) * (x1 - x0), 1)
+    return suma / area
+
+
+def detectar_celdas_firmadas(image, rejilla):
+    """
+    Matriz de celdas firmadas de la rejilla de firmas de una página
+
+    Args:
+        image: Imagen PIL de la página completa
+        rejilla: dict 'rejilla' del layout (caja, dias, tramos, filas/columnas
+            de cabecera y umbral de tinta)
+
+    Returns:
+        Lista de filas (una por semana) con una lista de bool por columna
+        (días x tramos), o None si no se encuentra una rejilla con la forma esperada
+    """
+    tinta = binarizar(recortar(image, rejilla['caja']))
+    alto, ancho = tinta.shape
+
+    filas = _intervalos(posiciones_lineas(tinta, 0), max(2, alto // 100))
+    columnas = _intervalos(posiciones_lineas(tinta, 1), max(2, ancho // 100))
+    filas = filas[rejilla.get('filas_cabecera', 0):]
+    columnas = columnas[rejilla.get('columnas_cabecera', 0):]
+
+    if not filas or len(columnas) != rejilla['dias'] * rejilla['tramos']:
+        return None
+
+    densidad = densidad_celdas(tinta, filas, columnas)
+    return (densidad >= rejilla.get('umbral_tinta', 0.02)).tolist()
+
+
+def dias_firmados(fila, fecha_inicio, fecha_fin, rejilla):
+    """
+    Fechas firmadas de una semana a partir de su fila de celdas
+
+    Las columnas van de lunes a viernes (y dentro de cada día, por tramos);
+    solo se cuentan los días dentro del rango SEMANA DEL ... AL ...
+
+    Args:
+        fila: Lista de bool (dias x tramos)
+        fecha_inicio: Primer día de la semana según la cabecera
+        fecha_fin: Último día de la semana según la cabecera
+        rejilla: dict 'rejilla' del layout (dias, tramos y minimo_tramos
+            firmados para dar el día por asistido)
+
+    Returns:
+        Lista de datetime
+    """
+    firmas = np.asarray(fila, dtype=bool).reshape(rejilla['dias'], rejilla['tramos']).sum(axis=1)
+    lunes = fecha_inicio - timedelta(days=fecha_inicio.weekday())
+    fechas = []
+    for indice in np.flatnonzero(firmas >= rejilla.get('minimo_tramos', 1)):
+        fecha = lunes + timedelta(days=int(indice))
+        if fecha_inicio <= fecha <= fecha_fin:
+            fechas.append(fecha)
+    return fechas
@@ -0,0 +1,127 @@
+"""
+Registro de layouts de documentos con formato fijo
+Cada tipo de documento define sus regiones en coordenadas normalizadas
+(fracción del ancho/alto de la página) y el perfil OCR (ver ocr.perfiles)
+adecuado a cada una, para no pasar por el OCR márgenes, logotipos ni pies de página.
+Las tablas por alumno definen sus columnas por el texto de la cabecera.
+"""
+import re
+
+# Regiones en orden de lectura y sin solaparse: el texto de la página se
+# compone concatenándolas, así que una línea no debe aparecer dos veces.
+# Las cajas son (x0, y0, x1, y1) normalizadas.
+LAYOUTS = {
+    'parte_firma': {
+        'version': 2,
+        'regiones': [
+            # Datos del curso y fechas de inicio/finalización
+            {'nombre': 'cabecera', 'caja': (0.03, 0.02, 0.97, 0.15), 'perfil': 'firma_header'},
+            # DATOS DEL ALUMNO: Nombre / NIF
+            {'nombre': 'alumno', 'caja': (0.03, 0.15, 0.97, 0.27), 'perfil': 'firma_header'},
+            # Cabeceras SEMANA DEL ... AL ... y rejilla de firmas con horarios
+            {'nombre': 'semanas', 'caja': (0.03, 0.27, 0.97, 0.95), 'perfil': 'firma_semanas'},
+        ],
+        # Rejilla de firmas: una fila por semana y una columna por día (L-V) y
+        # tramo; la primera fila (días) y la primera columna (semanas) son cabecera
+        'rejilla': {
+            'caja': (0.03, 0.27, 0.97, 0.95),
+            'filas_cabecera': 1, 'columnas_cabecera': 1,
+            'dias': 5, 'tramos': 2, 'minimo_tramos': 1,
+            'umbral_tinta': 0.02,
+        },
+        # Si el texto de las regiones no contiene alguno de estos patrones, el
+        # layout no encaja con la página y se hace OCR de la página completa
+        'anclas': [r'SEMANA\s+DEL', r'Nombre|ALUMNO'],
+    },
+}
+
+# Tablas con una fila por alumno (ver ocr.tablas). Las columnas se localizan
+# por el texto de su cabecera, de izquierda a derecha; cada fila se identifica
+# por una palabra que cumple el patrón 'fila' (el DNI/NIE)
+TABLAS = {
+    'becas': {
+        'cabecera': r'\b(NIF|DNI|NIE)\b',
+        # Las cabeceras de varias líneas ocupan hasta esta altura sobre y bajo la línea del NIF
+        'alto_cabecera': 0.03,
+        'columnas': [
+            ('numero', r'^N[º°O]?\.?$'),
+            ('nombre', r'APELLIDOS|NOMBRE'),
+            ('nif', r'^(NIF|DNI|NIE)'),
+            ('euros_dia', r'€|D[IÍ]A'),
+            ('transporte', r'TRANSPORTE'),
+            ('manutencion', r'MANUTENCI'),
+            ('alojamiento', r'ALOJAMIENTO|BECA'),
+            ('conciliacion', r'CONCILIACI'),
+            ('otras', r'OTRAS'),
+        ],
+        'obligatorias': ['nombre', 'nif'],
+        'fila': r'[XYZ]?\d{7,8}[A-Z]',
+    },
+}
+
+
+def obtener_layout(nombre):
+    """
+    Layout registrado con ese nombre
+
+    Args:
+        nombre: Clave en LAYOUTS (p.ej. 'parte_firma')
+
+    Returns:
+        dict con el layout o None si no existe
+    """
+    if not nombre:
+        return None
+    layout = LAYOUTS.get(nombre)
+    if layout is None:
+        print(f"Advertencia: layout desconocido '{nombre}', se usa la página completa")
+    return layout
+
+
+def layout_para_archivo(nombre_archivo):
+    """Layout que corresponde a un archivo por su nombre (o None)"""
+    if 'partefirma' in nombre_archivo.lower().replace('_', ''):
+        return 'parte_firma'
+    return None
+
+
+def caja_en_pixeles(caja, ancho, alto):
+    """Convierte una caja normalizada a píxeles de una imagen de ancho x alto"""
+    x0, y0, x1, y1 = caja
+    return (int(x0 * ancho), int(y0 * alto), int(x1 * ancho), int(y1 * alto))
+
+
+def recortar(image, caja=None):
+    """
+    Recorta una región normalizada de una imagen PIL
+
+    Args:
+        image: Imagen PIL
+        caja: (x0, y0, x1, y1) normalizada o None para la imagen completa
+
+    Returns:
+        Imagen PIL
+    """
+    if caja is None:
+        return image
+    return image.crop(caja_en_pixeles(caja, image.width, image.height))
+
+
+def componer_regiones(layout, textos):
+    """
+    Texto de una página a partir del OCR de las regiones del layout
+
+    Args:
+        layout: dict de LAYOUTS
+        textos: Texto de cada región, en el orden de layout['regiones']
+
+    Returns:
+        str con el texto de las regiones en orden o None si el layout no
+        encaja con la página (faltan las anclas)
+    """
+    texto = '\n'.join(t.strip() for t in textos if t and t.strip())
+
+    for ancla in layout.get('anclas', []):
+        if not re.search(ancla, texto, re.IGNORECASE):
+            return None
+    return texto
@@ -0,0 +1,39 @@
+"""
+OCR por lotes
+Todas las lecturas del paquete pasan por aquí y se delegan en el motor OCR
+del proceso (ver ocr.motores). El motor del binario de Tesseract procesa la
+lista de imágenes en una sola ejecución y separa después el resultado por
+página.
+"""
+from .motores import obtener_motor
+
+
+def textos_lote(imagenes, lang='spa', config=''):
+    """
+    Texto de varias imágenes con una única llamada al motor OCR
+
+    Args:
+        imagenes: Lista de imágenes PIL
+        lang: Idioma de Tesseract
+        config: Opciones de Tesseract
+
+    Returns:
+        Lista de textos en el mismo orden que las imágenes
+    """
+    return obtener_motor().textos(imagenes, lang=lang, config=config)
+
+
+def datos_lote(imagenes, lang='spa', config=''):
+    """
+    Palabras con posición y confianza (como image_to_data) de varias imágenes
+    con una única llamada al motor OCR
+
+    Args:
+        imagenes: Lista de imágenes PIL
+        lang: Idioma de Tesseract
+        config: Opciones de Tesseract
+
+    Returns:
+        Lista de dicts {campo: [valores]} en el mismo orden que las imágenes
+    """
+    return obtener_motor().datos(imagenes, lang=lang, config=config)
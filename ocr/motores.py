@@ -0,0 +1,397 @@
+"""
+Motores OCR intercambiables
+Todo el OCR del paquete pasa por un motor con la misma interfaz: el binario
+de Tesseract (por defecto, por lotes con una sola ejecución), Tesseract en el
+propio proceso con tesserocr (el modelo se carga una vez por proceso) o un
+motor de textos precalculados para pruebas. El motor y las rutas salen de
+config.settings; nada se configura al importar.
+"""
+import csv
+import os
+import platform
+import re
+import shlex
+import tempfile
+from abc import ABC, abstractmethod
+
+# Separador de páginas que Tesseract escribe en la salida de texto
+SEPARADOR_PAGINAS = '\f'
+
+CAMPOS_DATOS = ['level', 'page_num', 'block_num', 'par_num', 'line_num', 'word_num',
+                'left', 'top', 'width', 'height', 'conf', 'text']
+
+_motor = None
+
+
+class MotorOCR(ABC):
+    """Interfaz común de los motores OCR (textos y datos son obligatorios)"""
+
+    nombre = ''
+
+    @abstractmethod
+    def textos(self, imagenes, lang='spa', config=''):
+        """
+        Texto de varias imágenes
+
+        Args:
+            imagenes: Lista de imágenes PIL
+            lang: Idioma de Tesseract
+            config: Opciones de Tesseract (ver ocr.perfiles)
+
+        Returns:
+            Lista de textos en el mismo orden que las imágenes
+        """
+
+    @abstractmethod
+    def datos(self, imagenes, lang='spa', config=''):
+        """
+        Palabras con posición y confianza (formato de image_to_data)
+
+        Returns:
+            Lista de dicts {campo: [valores]} en el mismo orden que las imágenes
+        """
+
+    def osd(self, image):
+        """Grados en sentido horario para enderezar la página ('Rotate' del OSD)"""
+        return 0
+
+    def version(self):
+        """Identificador del motor y su versión (forma parte de la clave de caché)"""
+        return self.nombre
+
+
+def ruta_tesseract():
+    """
+    Ejecutable de Tesseract según la configuración
+
+    Returns:
+        SMARTMIND_TESSERACT_CMD si está definido; en Windows, la primera ruta
+        existente de TESSERACT_PATHS; si no, None (el del PATH)
+    """
+    from config.settings import TESSERACT_CMD, TESSERACT_PATHS
+
+    if TESSERACT_CMD:
+        return TESSERACT_CMD
+    if platform.system() == 'Windows':
+        for ruta in TESSERACT_PATHS:
+            if os.path.exists(ruta):
+                return ruta
+    return None
+
+
+class MotorTesseract(MotorOCR):
+    """Binario de Tesseract: una ejecución por lote con una lista de imágenes"""
+
+    nombre = 'tesseract'
+
+    def __init__(self, comando=None):
+        """
+        Args:
+            comando: Ruta del ejecutable (por defecto, ruta_tesseract())
+        """
+        import pytesseract
+
+        self._pytesseract = pytesseract
+        self.comando = comando or ruta_tesseract()
+        if self.comando:
+            pytesseract.pytesseract.tesseract_cmd = self.comando
+
+    def _ejecutar_lote(self, imagenes, lang, config, extension):
+        """Lanza Tesseract sobre una lista de imágenes y devuelve la salida en bruto"""
+        with tempfile.TemporaryDirectory(prefix='ocr_lote_') as carpeta:
+            rutas = []
+            for indice, image in enumerate(imagenes):
+                ruta = os.path.join(carpeta, f'{indice:05d}.png')
+                # Compresión mínima: el PNG es temporal y solo lo lee Tesseract
+                image.save(ruta, compress_level=1)
+                rutas.append(ruta)
+
+            lista = os.path.join(carpeta, 'lista.txt')
+            with open(lista, 'w', encoding='utf-8') as f:
+                f.write('\n'.join(rutas) + '\n')
+
+            salida = os.path.join(carpeta, 'salida')
+            if extension == 'tsv':
+                config = f'{config} -c tessedit_create_tsv=1'.strip()
+            self._pytesseract.pytesseract.run_tesseract(lista, salida, extension=extension, lang=lang,
+                                                        config=config)
+
+            with open(f'{salida}.{extension}', encoding='utf-8') as f:
+                return f.read()
+
+    def textos(self, imagenes, lang='spa', config=''):
+        # Si el lote falla o no se puede separar por página, imagen a imagen
+        if len(imagenes) > 1:
+            try:
+                partes = self._ejecutar_lote(imagenes, lang, config, 'txt').split(SEPARADOR_PAGINAS)
+                if len(partes) >= len(imagenes):
+                    return partes[:len(imagenes)]
+                print(f"Advertencia: el lote OCR devolvió {len(partes)} páginas de {len(imagenes)}")
+            except Exception as e:
+                print(f"Advertencia: OCR por lotes no disponible ({e}), se procesa página a página")
+
+        return [self._pytesseract.image_to_string(image, lang=lang, config=config) for image in imagenes]
+
+    def datos(self, imagenes, lang='spa', config=''):
+        if len(imagenes) > 1:
+            try:
+                return separar_tsv(self._ejecutar_lote(imagenes, lang, config, 'tsv'), len(imagenes))
+            except Exception as e:
+                print(f"Advertencia: OCR por lotes no disponible ({e}), se procesa página a página")
+
+        return [
+            self._pytesseract.image_to_data(image, lang=lang, config=config,
+                                            output_type=self._pytesseract.Output.DICT)
+            for image in imagenes
+        ]
+
+    def osd(self, image):
+        try:
+            osd = self._pytesseract.image_to_osd(image)
+            return int(re.search(r'Rotate: (\d+)', osd).group(1))
+        except Exception:
+            return 0
+
+    def version(self):
+        try:
+            return f'{self.nombre}-{self._pytesseract.get_tesseract_version()}'
+        except Exception:
+            return f'{self.nombre}-desconocida'
+
+
+def opciones_config(config):
+    """
+    Traduce las opciones de línea de comandos de Tesseract a parámetros de la API
+
+    Args:
+        config: p.ej. '--tessdata-dir /ruta --psm 7 --oem 1 -c tessedit_char_whitelist=0123456789'
+
+    Returns:
+        dict con 'psm', 'oem', 'tessdata' (None si no se indican) y 'variables'
+    """
+    opciones = {'psm': None, 'oem': None, 'tessdata': None, 'variables': {}}
+    partes = shlex.split(config or '')
+    indice = 0
+    while indice < len(partes):
+        parte = partes[indice]
+        valor = partes[indice + 1] if indice + 1 < len(partes) else None
+        if parte == '--psm' and valor is not None:
+            opciones['psm'] = int(valor)
+        elif parte == '--oem' and valor is not None:
+            opciones['oem'] = int(valor)
+        elif parte == '--tessdata-dir' and valor is not None:
+            opciones['tessdata'] = valor
+        elif parte == '-c' and valor and '=' in valor:
+            variable, contenido = valor.split('=', 1)
+            opciones['variables'][variable] = contenido
+        else:
+            indice += 1
+            continue
+        indice += 2
+    return opciones
+
+
+class MotorTesserocr(MotorOCR):
+    """
+    Tesseract en el propio proceso con tesserocr (dependencia opcional)
+
+    Cada combinación de idioma, modelo y motor se inicializa una sola vez
+    por proceso, sin lanzar un ejecutable ni escribir temporales por lote
+    """
+
+    nombre = 'tesserocr'
+
+    def __init__(self):
+        import tesserocr
+
+        self._tesserocr = tesserocr
+        self._apis = {}
+
+    def _api(self, lang, config):
+        opciones = opciones_config(config)
+        oem = opciones['oem'] if opciones['oem'] is not None else self._tesserocr.OEM.DEFAULT
+        clave = (lang, opciones['tessdata'], oem)
+        if clave not in self._apis:
+            parametros = {'lang': lang, 'oem': oem}
+            if opciones['tessdata']:
+                parametros['path'] = opciones['tessdata']
+            self._apis[clave] = self._tesserocr.PyTessBaseAPI(**parametros)
+        api = self._apis[clave]
+        api.SetPageSegMode(opciones['psm'] if opciones['psm'] is not None else self._tesserocr.PSM.AUTO)
+        # Las variables de una lectura no deben pasar a la siguiente
+        api.SetVariable('tessedit_char_whitelist', opciones['variables'].get('tessedit_char_whitelist', ''))
+        for variable, valor in opciones['variables'].items():
+            api.SetVariable(variable, valor)
+        return api
+
+    def textos(self, imagenes, lang='spa', config=''):
+        api = self._api(lang, config)
+        textos = []
+        for image in imagenes:
+            api.SetImage(image)
+            textos.append(api.GetUTF8Text())
+        return textos
+
+    def datos(self, imagenes, lang='spa', config=''):
+        RIL = self._tesserocr.RIL
+        api = self._api(lang, config)
+        resultados = []
+        for image in imagenes:
+            datos = {campo: [] for campo in CAMPOS_DATOS}
+            api.SetImage(image)
+            api.Recognize()
+            iterador = api.GetIterator()
+            bloque = parrafo = linea = palabra = 0
+            while iterador is not None:
+                if iterador.IsAtBeginningOf(RIL.BLOCK):
+                    bloque, parrafo, linea = bloque + 1, 0, 0
+                if iterador.IsAtBeginningOf(RIL.PARA):
+                    parrafo, linea = parrafo + 1, 0
+                if iterador.IsAtBeginningOf(RIL.TEXTLINE):
+                    linea, palabra = linea + 1, 0
+                palabra += 1
+                caja = iterador.BoundingBox(RIL.WORD)
+                if caja:
+                    x0, y0, x1, y1 = caja
+                    valores = [5, 1, bloque, parrafo, linea, palabra, x0, y0, x1 - x0, y1 - y0,
+                               iterador.Confidence(RIL.WORD), iterador.GetUTF8Text(RIL.WORD) or '']
+                    for campo, valor in zip(CAMPOS_DATOS, valores):
+                        datos[campo].append(valor)
+                if not iterador.Next(RIL.WORD):
+                    break
+            resultados.append(datos)
+        return resultados
+
+    def osd(self, image):
+        try:
+            with self._tesserocr.PyTessBaseAPI(psm=self._tesserocr.PSM.OSD_ONLY) as api:
+                api.SetImage(image)
+                orientacion = api.DetectOrientationScript()
+            return (360 - int(orientacion['orient_deg'])) % 360 if orientacion else 0
+        except Exception:
+            return 0
+
+    def version(self):
+        return f'{self.nombre}-{self._tesserocr.tesseract_version().split()[1]}'
+
+
+class MotorPrecalculado(MotorOCR):
+    """
+    Textos fijos en lugar de OCR, para pruebas sin Tesseract
+
+    Las palabras de datos() se reparten por líneas sobre la imagen con
+    confianza alta, suficiente para ejercitar el resto del pipeline
+    """
+
+    nombre = 'precalculado'
+
+    def __init__(self, textos=None, por_defecto=''):
+        """
+        Args:
+            textos: Lista de textos que se devuelven en orden, o función
+                (imagen, config) -> texto
+            por_defecto: Texto cuando la lista se agota
+        """
+        self._textos = textos if callable(textos) else list(textos or [])
+        self.por_defecto = por_defecto
+        self.llamadas = []
+
+    def _texto(self, image, config):
+        self.llamadas.append((image.size, config))
+        if callable(self._textos):
+            return self._textos(image, config)
+        return self._textos.pop(0) if self._textos else self.por_defecto
+
+    def textos(self, imagenes, lang='spa', config=''):
+        return [self._texto(image, config) for image in imagenes]
+
+    def datos(self, imagenes, lang='spa', config=''):
+        resultados = []
+        for image in imagenes:
+            datos = {campo: [] for campo in CAMPOS_DATOS}
+            lineas = [linea.split() for linea in self._texto(image, config).splitlines()]
+            alto_linea = image.height // max(len(lineas), 1)
+            for num_linea, palabras in enumerate(lineas, 1):
+                ancho_palabra = image.width // max(len(palabras), 1)
+                for num_palabra, palabra in enumerate(palabras, 1):
+                    valores = [5, 1, 1, 1, num_linea, num_palabra, (num_palabra - 1) * ancho_palabra,
+                               (num_linea - 1) * alto_linea, ancho_palabra, alto_linea, 95.0, palabra]
+                    for campo, valor in zip(CAMPOS_DATOS, valores):
+                        datos[campo].append(valor)
+            resultados.append(datos)
+        return resultados
+
+
+def separar_tsv(tsv, numero_imagenes):
+    """Reparte las filas del TSV de Tesseract por imagen según page_num"""
+    resultados = [{campo: [] for campo in CAMPOS_DATOS} for _ in range(numero_imagenes)]
+    lector = csv.DictReader(tsv.splitlines(), delimiter='\t', quoting=csv.QUOTE_NONE)
+    for fila in lector:
+        indice = int(fila['page_num']) - 1
+        if not 0 <= indice < numero_imagenes:
+            raise ValueError(f"página {indice + 1} fuera del lote")
+        destino = resultados[indice]
+        for campo in CAMPOS_DATOS:
+            valor = fila.get(campo) or ''
+            if campo == 'text':
+                destino[campo].append(valor)
+            elif campo == 'conf':
+                destino[campo].append(float(valor) if valor else -1.0)
+            else:
+                destino[campo].append(int(valor) if valor else 0)
+    return resultados
+
+
+MOTORES = {
+    'tesseract': MotorTesseract,
+    'tesserocr': MotorTesserocr,
+    'precalculado': MotorPrecalculado,
+}
+
+
+def crear_motor(nombre):
+    """
+    Crea el motor registrado con ese nombre
+
+    Si no existe o su dependencia no está instalada, se usa el binario de
+    Tesseract
+
+    Returns:
+        MotorOCR
+    """
+    clase = MOTORES.get(nombre)
+    if clase is None:
+        print(f"Advertencia: motor OCR desconocido '{nombre}', se usa tesseract")
+        return MotorTesseract()
+    try:
+        return clase()
+    except ImportError as e:
+        print(f"Advertencia: motor OCR '{nombre}' no disponible ({e}), se usa tesseract")
+        return MotorTesseract()
+
+
+def obtener_motor():
+    """Motor OCR de este proceso (OCR_MOTOR de la configuración), creado la primera vez"""
+    global _motor
+    if _motor is None:
+        from config.settings import OCR_MOTOR
+
+        _motor = crear_motor(OCR_MOTOR)
+    return _motor
+
+
+def establecer_motor(motor):
+    """
+    Sustituye el motor de este proceso (p.ej. un MotorPrecalculado en pruebas)
+
+    Los workers del OCR en paralelo crean el suyo desde la configuración, así
+    que un motor establecido aquí solo se usa con un único worker
+
+    Args:
+        motor: MotorOCR o None para volver al de la configuración
+    """
+    from .cache import version_tesseract
+
+    global _motor
+    _motor = motor
+    version_tesseract.cache_clear()
@@ -0,0 +1,173 @@
+"""
+Búsqueda de alumnos de la lista del curso en texto OCR
+Con los nombres y DNI de la lista (extraer_alumnos_excel) se construye un
+autómata de Aho-Corasick con todas sus variantes; cada página se recorre una
+sola vez, así que el coste depende de la longitud del texto y no del número
+de alumnos, y solo se cuentan nombres que están en la lista.
+"""
+import hashlib
+import re
+import unicodedata
+from collections import deque
+
+# Confusiones típicas del OCR: se aplican igual al texto y a los patrones
+CONFUSIONES_OCR = str.maketrans({'0': 'O', '1': 'I', '|': 'I', '5': 'S', '8': 'B'})
+
+# Palabras que no bastan por sí solas para identificar a un alumno
+PARTICULAS = {'DE', 'DEL', 'LA', 'LAS', 'LOS', 'Y', 'I'}
+
+
+def normalizar_texto(texto):
+    """
+    Texto en mayúsculas, sin tildes, con las confusiones del OCR unificadas y
+    las palabras separadas por un único espacio (también al principio y al final)
+
+    Args:
+        texto: Texto OCR o de la lista de alumnos
+
+    Returns:
+        str
+    """
+    texto = unicodedata.normalize('NFKD', texto.upper())
+    texto = ''.join(c for c in texto if not unicodedata.combining(c))
+    texto = texto.translate(CONFUSIONES_OCR)
+    return f" {' '.join(re.findall(r'[A-Z0-9]+', texto))} "
+
+
+def variantes_nombre(nombre_completo):
+    """
+    Formas en que puede aparecer un nombre de la lista
+
+    Args:
+        nombre_completo: Nombre de la lista, 'APELLIDOS, NOMBRE' o 'NOMBRE APELLIDOS'
+
+    Returns:
+        Tupla (formas completas, formas sin el segundo apellido), sets de
+        textos normalizados sin los espacios de los extremos
+    """
+    if ',' in nombre_completo:
+        apellidos, nombre = (parte.split() for parte in nombre_completo.split(',', 1))
+    else:
+        partes = nombre_completo.split()
+        # Sin coma se asume nombre de pila (una palabra) seguido de los apellidos
+        nombre, apellidos = partes[:1], partes[1:]
+
+    completas = {' '.join(nombre + apellidos), ' '.join(apellidos + nombre)}
+    # Sin el segundo apellido (habitual en justificantes y citas)
+    parciales = set()
+    if len(apellidos) > 1 and apellidos[0].upper() not in PARTICULAS:
+        parciales = {' '.join(nombre + apellidos[:1]), ' '.join(apellidos[:1] + nombre)}
+
+    def normalizar(formas):
+        return {normalizar_texto(forma).strip() for forma in formas if forma.strip()}
+
+    return normalizar(completas), normalizar(parciales) - normalizar(completas)
+
+
+def variantes_dni(dni):
+    """DNI/NIE normalizado con y sin letra de control (el OCR la pierde a menudo)"""
+    dni = re.sub(r'[^0-9A-Z]', '', str(dni).upper())
+    formas = {dni}
+    if len(dni) == 9 and dni[-1].isalpha():
+        formas.add(dni[:-1])
+        formas.add(f'{dni[:-1]} {dni[-1]}')
+    return {normalizar_texto(forma).strip() for forma in formas if len(forma) >= 7}
+
+
+class BuscadorAlumnos:
+    """Autómata de Aho-Corasick con los nombres y DNI de la lista del curso"""
+
+    def __init__(self, alumnos, clave='nombre_completo'):
+        """
+        Args:
+            alumnos: Lista de dicts con 'nombre_completo' y 'dni' (extraer_alumnos_excel)
+            clave: Campo que identifica a cada alumno en los resultados
+        """
+        self.alumnos = [alumno[clave] for alumno in alumnos]
+
+        # Patrón -> alumno; los que comparten dos alumnos no identifican a
+        # ninguno y las formas completas tienen prioridad sobre las parciales
+        completas, parciales = {}, {}
+        for indice, alumno in enumerate(alumnos):
+            formas_completas, formas_parciales = variantes_nombre(alumno[clave])
+            if alumno.get('dni'):
+                formas_completas |= variantes_dni(alumno['dni'])
+            for forma in formas_completas:
+                completas.setdefault(forma, set()).add(indice)
+            for forma in formas_parciales:
+                parciales.setdefault(forma, set()).add(indice)
+
+        self.patrones = {forma: indices.pop() for forma, indices in completas.items() if len(indices) == 1}
+        for forma, indices in parciales.items():
+            if len(indices) == 1 and forma not in completas:
+                self.patrones[forma] = indices.pop()
+
+        self._construir()
+
+    def _construir(self):
+        """Trie de los patrones (con espacio delante y detrás) y enlaces de fallo"""
+        self._transiciones = [{}]
+        self._salidas = [[]]
+        for forma, indice in self.patrones.items():
+            estado = 0
+            for caracter in f' {forma} ':
+                siguiente = self._transiciones[estado].get(caracter)
+                if siguiente is None:
+                    siguiente = len(self._transiciones)
+                    self._transiciones[estado][caracter] = siguiente
+                    self._transiciones.append({})
+                    self._salidas.append([])
+                estado = siguiente
+            self._salidas[estado].append((indice, len(forma) + 2))
+
+        self._fallos = [0] * len(self._transiciones)
+        cola = deque(self._transiciones[0].values())
+        while cola:
+            estado = cola.popleft()
+            for caracter, siguiente in self._transiciones[estado].items():
+                fallo = self._fallos[estado]
+                while fallo and caracter not in self._transiciones[fallo]:
+                    fallo = self._fallos[fallo]
+                destino = self._transiciones[fallo].get(caracter, 0)
+                self._fallos[siguiente] = destino if destino != siguiente else 0
+                self._salidas[siguiente] = self._salidas[siguiente] + self._salidas[self._fallos[siguiente]]
+                cola.append(siguiente)
+
+    @property
+    def huella(self):
+        """SHA-256 de los patrones (para la clave de caché de los resultados)"""
+        contenido = '|'.join(f'{forma}={self.alumnos[indice]}' for forma, indice in sorted(self.patrones.items()))
+        return hashlib.sha256(contenido.encode('utf-8')).hexdigest()
+
+    def buscar(self, texto):
+        """
+        Alumnos de la lista que aparecen en un texto, en una sola pasada
+
+        Args:
+            texto: Texto OCR de una página
+
+        Returns:
+            Lista de claves de alumno (sin repetir) en orden de aparición
+        """
+        coincidencias = []
+        estado = 0
+        for posicion, caracter in enumerate(normalizar_texto(texto)):
+            while estado and caracter not in self._transiciones[estado]:
+                estado = self._fallos[estado]
+            estado = self._transiciones[estado].get(caracter, 0)
+            for indice, longitud in self._salidas[estado]:
+                coincidencias.append((posicion + 1 - longitud, posicion + 1, indice))
+
+        # Una coincidencia dentro de otra más larga ('MARIA GARCIA' dentro de
+        # 'MARIA GARCIA LOPEZ') no cuenta: la más larga identifica mejor
+        coincidencias.sort(key=lambda c: (c[0], -c[1]))
+        encontrados = []
+        fin_cubierto = -1
+        for inicio, fin, indice in coincidencias:
+            if fin <= fin_cubierto:
+                continue
+            fin_cubierto = fin
+            alumno = self.alumnos[indice]
+            if alumno not in encontrados:
+                encontrados.append(alumno)
+        return encontrados
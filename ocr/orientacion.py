@@ -0,0 +1,137 @@
+"""
+Detección rápida de orientación de páginas escaneadas
+Heurística de perfiles de proyección sobre una miniatura con NumPy; el OSD de
+Tesseract solo se usa cuando la heurística no está segura. La rotación se
+guarda en la caché OCR por huella de la página.
+"""
+import numpy as np
+
+from .cache import huella_bytes, obtener_cache
+from .firmas import binarizar
+
+# Lado mayor de la miniatura sobre la que se mide
+LADO_MINIATURA = 1000
+
+# Relación mínima entre las dos hipótesis para fiarse de la heurística
+MARGEN_DECISION = 1.3
+
+# Proporción mínima de tinta; por debajo la página se considera en blanco
+TINTA_MINIMA = 0.002
+
+
+def miniatura(image, lado=LADO_MINIATURA):
+    """Copia en escala de grises con el lado mayor limitado a `lado` píxeles"""
+    mini = image.convert('L')
+    mini.thumbnail((lado, lado))
+    return mini
+
+
+def _contraste(perfil):
+    """Variación del perfil de proyección: alta cuando cruza líneas de texto"""
+    total = perfil.sum()
+    return np.abs(np.diff(perfil)).sum() / total if total else 0.0
+
+
+def _ascendentes_descendentes(tinta):
+    """
+    Tinta por encima y por debajo del cuerpo central (altura de la x) de
+    cada línea de texto horizontal
+
+    En texto derecho hay más ascendentes y mayúsculas que descendentes, así
+    que la tinta sobre el cuerpo de la línea supera a la de debajo
+    """
+    perfil = tinta.sum(axis=1)
+    con_tinta = perfil > 0
+    arriba = abajo = 0
+    # Bandas de filas consecutivas con tinta = líneas de texto
+    bordes = np.flatnonzero(np.diff(np.concatenate(([0], con_tinta.astype(np.int8), [0]))))
+    for inicio, fin in zip(bordes[::2], bordes[1::2]):
+        banda = perfil[inicio:fin]
+        if len(banda) < 4:
+            continue
+        cuerpo = np.flatnonzero(banda >= 0.5 * banda.max())
+        arriba += banda[:cuerpo[0]].sum()
+        abajo += banda[cuerpo[-1] + 1:].sum()
+    return arriba, abajo
+
+
+def orientacion_rapida(image):
+    """
+    Rotación de una página con perfiles de proyección
+
+    Args:
+        image: Imagen PIL (mejor ya reducida con miniatura())
+
+    Returns:
+        Grados que hay que girar en sentido horario para enderezarla (mismo
+        criterio que 'Rotate' del OSD de Tesseract) o None si no está clara
+    """
+    tinta = binarizar(image)
+    if tinta.mean() < TINTA_MINIMA:
+        return 0
+
+    horizontal = _contraste(tinta.sum(axis=1))
+    vertical = _contraste(tinta.sum(axis=0))
+    if max(horizontal, vertical) < MARGEN_DECISION * min(horizontal, vertical):
+        return None
+
+    # Líneas verticales: se gira 90º antihorario para medir arriba/abajo
+    girada = horizontal < vertical
+    if girada:
+        tinta = np.rot90(tinta)
+
+    arriba, abajo = _ascendentes_descendentes(tinta)
+    if arriba >= MARGEN_DECISION * abajo:
+        derecha = True
+    elif abajo >= MARGEN_DECISION * arriba:
+        derecha = False
+    else:
+        return None
+
+    if girada:
+        return 270 if derecha else 90
+    return 0 if derecha else 180
+
+
+def orientacion_osd(image):
+    """Rotación según el OSD del motor OCR (0 si falla)"""
+    from .motores import obtener_motor
+
+    return obtener_motor().osd(image)
+
+
+def detectar_rotacion(image):
+    """
+    Rotación necesaria para enderezar una página escaneada
+
+    Primero consulta la caché por huella de la miniatura, después la
+    heurística de proyección y solo si no está segura el OSD de Tesseract
+
+    Args:
+        image: Imagen PIL de la página
+
+    Returns:
+        int: Grados en sentido horario (0, 90, 180 o 270)
+    """
+    mini = miniatura(image)
+    cache = obtener_cache()
+    clave = None
+    if cache:
+        clave = cache.clave(huella_bytes(mini.tobytes()), funcion='orientacion', tamano=mini.size)
+        try:
+            guardado = cache.obtener(clave)
+        except OSError:
+            guardado = None
+        if guardado is not None:
+            return guardado
+
+    angulo = orientacion_rapida(mini)
+    if angulo is None:
+        angulo = orientacion_osd(image)
+
+    if clave:
+        try:
+            cache.guardar(clave, angulo)
+        except OSError:
+            pass
+    return angulo
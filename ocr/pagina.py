@@ -0,0 +1,221 @@
+"""
+OCR de páginas rasterizadas
+Combina el preprocesado, el DPI adaptativo, los layouts registrados y el OCR
+por lotes: cada página se endereza, con layout solo se leen sus regiones,
+con DPI adaptativo cada lectura empieza a baja resolución, y todas las
+lecturas de un mismo paso con las mismas opciones van en una única
+ejecución de Tesseract. Todas las lecturas se piden en TSV para conservar
+cada palabra con su caja y su confianza (ver ocr.espacial)
+"""
+from collections import OrderedDict
+
+from .adaptativo import bloques_de_palabras, bloques_dudosos, caja_alta_resolucion, tasa_aciertos
+from .espacial import PaginaOCR, palabras_de_datos, texto_de_palabras, unir_palabras
+from .layouts import caja_en_pixeles, componer_regiones, obtener_layout
+from .lote import datos_lote
+from .perfiles import config_perfil
+from .preprocesado import enderezar, preparar_lectura, preparar_pagina
+from .rasterizado import rasterizar_pagina
+
+
+def _por_config(elementos, config_de, procesar):
+    """
+    Procesa elementos agrupados por opciones de Tesseract (un lote por grupo)
+
+    Args:
+        elementos: Lista de elementos
+        config_de: Función elemento -> opciones de Tesseract
+        procesar: Función (opciones, elementos_del_grupo) -> lista de resultados
+
+    Returns:
+        Lista de resultados en el orden de `elementos`
+    """
+    grupos = OrderedDict()
+    for posicion, elemento in enumerate(elementos):
+        grupos.setdefault(config_de(elemento), []).append(posicion)
+
+    resultados = [None] * len(elementos)
+    for config, posiciones in grupos.items():
+        for posicion, resultado in zip(posiciones, procesar(config, [elementos[p] for p in posiciones])):
+            resultados[posicion] = resultado
+    return resultados
+
+
+def _sustituir_bloques(palabras, nuevos):
+    """
+    Cambia las palabras de algunos bloques de una lectura por las de su relectura
+
+    Args:
+        palabras: Palabras de la lectura original
+        nuevos: {bloque: palabras releídas}
+
+    Returns:
+        Lista de palabras con los bloques en el orden original
+    """
+    agrupadas = OrderedDict()
+    for palabra in palabras:
+        agrupadas.setdefault(palabra['bloque'], []).append(palabra)
+
+    siguiente_linea = max((p['linea'] for p in palabras), default=-1) + 1
+    resultado = []
+    for num, palabras_bloque in agrupadas.items():
+        if num not in nuevos:
+            resultado.extend(palabras_bloque)
+            continue
+        lineas = {}
+        for palabra in nuevos[num]:
+            linea = lineas.setdefault((palabra['bloque'], palabra['linea']), siguiente_linea + len(lineas))
+            resultado.append(dict(palabra, linea=linea, bloque=num))
+        siguiente_linea += len(lineas)
+    return resultado
+
+
+def ocr_paginas(imagenes, pdf_path, paginas, dpi, dpi_bajo=None, lang='spa', config='', poppler_path=None,
+                rotaciones=None, layout=None):
+    """
+    OCR de un lote de páginas ya rasterizadas
+
+    Sin dpi_bajo las imágenes están a la resolución final y se leen
+    directamente; con dpi_bajo son las de baja resolución y cada página se
+    vuelve a rasterizar a `dpi` solo si alguna de sus lecturas no es fiable
+
+    Args:
+        imagenes: Lista de imágenes PIL
+        pdf_path: Ruta al PDF (para rasterizar a alta resolución)
+        paginas: Número de página (empezando en 1) de cada imagen
+        dpi: Resolución completa
+        dpi_bajo: Resolución de la primera pasada o None
+        lang: Idioma de Tesseract
+        config: Opciones de Tesseract para la página completa
+        poppler_path: Carpeta de binarios de Poppler
+        rotaciones: Grados ya aplicados a cada imagen que hay que aplicar
+            también a la de alta resolución
+        layout: Nombre del layout registrado (ver ocr.layouts) o None
+
+    Returns:
+        Lista de PaginaOCR (texto y palabras con posición) de cada página
+    """
+    from config.settings import OCR_CONFIANZA_MINIMA, OCR_TASA_ACIERTOS_MINIMA
+
+    rotaciones = rotaciones or [0] * len(imagenes)
+    altas = {}
+
+    # Enderezado por página; el mismo ángulo se aplica después a alta resolución
+    preparadas = [preparar_pagina(image) for image in imagenes]
+    imagenes = [image for image, _ in preparadas]
+    angulos = [angulo for _, angulo in preparadas]
+
+    def imagen_alta(indice):
+        # Se rasteriza como mucho una vez por página, aunque fallen varias regiones
+        if indice not in altas:
+            imagen = rasterizar_pagina(pdf_path, paginas[indice], dpi=dpi, poppler_path=poppler_path)
+            rotacion = rotaciones[indice]
+            if rotacion:
+                imagen = imagen.rotate(rotacion, expand=True)
+            altas[indice] = enderezar(imagen, angulos[indice])
+        return altas[indice]
+
+    def fuente(imagen, caja):
+        """Imagen de la página y caja normalizada -> (imagen, caja en píxeles o None)"""
+        return imagen, caja_en_pixeles(caja, imagen.width, imagen.height) if caja else None
+
+    def leer_palabras(config_lote, fuentes):
+        """Fuentes (imagen, caja en píxeles o None) -> palabras de cada una, con caja en la página"""
+        recortes = []
+        origenes = []
+        for imagen, caja in fuentes:
+            recorte, (x, y) = preparar_lectura(imagen.crop(caja) if caja else imagen)
+            recortes.append(recorte)
+            origenes.append(((caja[0] if caja else 0) + x, (caja[1] if caja else 0) + y))
+        datos = datos_lote(recortes, lang=lang, config=config_lote)
+        return [
+            palabras_de_datos(d, origen, imagen.width, imagen.height)
+            for d, origen, (imagen, _) in zip(datos, origenes, fuentes)
+        ]
+
+    def leer(lecturas):
+        """Lecturas (indice_imagen, caja, opciones) -> lista de palabras de cada lectura"""
+        palabras = _por_config(lecturas, lambda l: l[2], lambda cfg, grupo: leer_palabras(
+            cfg, [fuente(imagenes[i], caja) for i, caja, _ in grupo]
+        ))
+        if not dpi_bajo:
+            return palabras
+
+        # Relecturas a alta resolución: bloques dudosos recortados o la lectura completa
+        relecturas = []
+        for posicion, (indice, caja, cfg) in enumerate(lecturas):
+            bloques = bloques_de_palabras(palabras[posicion])
+            dudosos = bloques_dudosos(bloques, OCR_CONFIANZA_MINIMA, OCR_TASA_ACIERTOS_MINIMA)
+            if dudosos is None:
+                continue
+            alta = imagen_alta(indice)
+            if not dudosos:
+                relecturas.append((posicion, None, fuente(alta, caja), cfg))
+                continue
+            baja = imagenes[indice]
+            escala = alta.width / baja.width
+            for num in dudosos:
+                x0, y0, x1, y1 = bloques[num]['caja']
+                caja_baja = [x0 * baja.width, y0 * baja.height, x1 * baja.width, y1 * baja.height]
+                caja_alta = caja_alta_resolucion(caja_baja, escala, alta.width, alta.height)
+                relecturas.append((posicion, num, (alta, caja_alta), cfg))
+
+        releidas = _por_config(relecturas, lambda r: r[3], lambda cfg, grupo: leer_palabras(
+            cfg, [r[2] for r in grupo]
+        ))
+        parciales = OrderedDict()
+        for (posicion, num, _, _), nuevas in zip(relecturas, releidas):
+            if num is None:
+                palabras[posicion] = nuevas
+            else:
+                parciales.setdefault(posicion, {})[num] = nuevas
+
+        # Si tras releer los bloques siguen faltando datos clave, lectura completa
+        completas = []
+        for posicion, nuevos in parciales.items():
+            palabras[posicion] = _sustituir_bloques(palabras[posicion], nuevos)
+            if tasa_aciertos(texto_de_palabras(palabras[posicion])) < OCR_TASA_ACIERTOS_MINIMA:
+                completas.append(posicion)
+        releidas = _por_config(completas, lambda p: lecturas[p][2], lambda cfg, grupo: leer_palabras(
+            cfg, [fuente(imagen_alta(lecturas[p][0]), lecturas[p][1]) for p in grupo]
+        ))
+        for posicion, nuevas in zip(completas, releidas):
+            palabras[posicion] = nuevas
+        return palabras
+
+    resultados = [None] * len(imagenes)
+
+    datos_layout = obtener_layout(layout)
+    if datos_layout:
+        regiones = datos_layout['regiones']
+        leidas = leer([
+            (indice, region['caja'], config_perfil(region['perfil']))
+            for indice in range(len(imagenes)) for region in regiones
+        ])
+        for indice in range(len(imagenes)):
+            inicio = indice * len(regiones)
+            por_region = leidas[inicio:inicio + len(regiones)]
+            texto = componer_regiones(datos_layout, [texto_de_palabras(p) for p in por_region])
+            if texto is not None:
+                resultados[indice] = PaginaOCR(unir_palabras(por_region), texto=texto)
+
+    # Páginas sin layout o en las que el layout no encaja: página completa
+    pendientes = [indice for indice, resultado in enumerate(resultados) if resultado is None]
+    if pendientes:
+        for indice, palabras in zip(pendientes, leer([(indice, None, config) for indice in pendientes])):
+            resultados[indice] = PaginaOCR(unir_palabras([palabras]))
+    return resultados
+
+
+def ocr_imagen(image, pdf_path, pagina, dpi, dpi_bajo=None, lang='spa', config='', poppler_path=None,
+               rotacion=0, layout=None):
+    """
+    OCR de una sola página ya rasterizada (ver ocr_paginas)
+
+    Returns:
+        PaginaOCR de la página
+    """
+    return ocr_paginas(
+        [image], pdf_path, [pagina], dpi, dpi_bajo=dpi_bajo, lang=lang, config=config,
+        poppler_path=poppler_path, rotaciones=[rotacion], layout=layout
+    )[0]
@@ -0,0 +1,209 @@
+"""
+OCR en paralelo con un pool de procesos
+Reparte las páginas de todos los PDFs entre varios procesos (respetando el
+límite de CPU del contenedor) y devuelve el resultado en orden de página
+"""
+import math
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+from .espacial import PaginaOCR
+from .pagina import ocr_paginas
+from .rasterizado import iterar_paginas
+
+
+def limite_cpus():
+    """
+    Número de CPUs disponibles para el proceso
+    Tiene en cuenta la cuota de cgroups (deploy.resources.limits.cpus en
+    docker-compose.yml) y la afinidad del proceso
+
+    Returns:
+        int: CPUs utilizables (mínimo 1)
+    """
+    try:
+        cpus = len(os.sched_getaffinity(0))
+    except AttributeError:
+        cpus = os.cpu_count() or 1
+
+    cuota = None
+    try:
+        # cgroup v2: "<cuota> <periodo>" o "max <periodo>"
+        with open('/sys/fs/cgroup/cpu.max') as f:
+            valor, periodo = f.read().split()
+            if valor != 'max':
+                cuota = int(valor) / int(periodo)
+    except (OSError, ValueError):
+        try:
+            # cgroup v1
+            with open('/sys/fs/cgroup/cpu/cpu.cfs_quota_us') as f:
+                valor = int(f.read())
+            with open('/sys/fs/cgroup/cpu/cpu.cfs_period_us') as f:
+                periodo = int(f.read())
+            if valor > 0 and periodo > 0:
+                cuota = valor / periodo
+        except (OSError, ValueError):
+            pass
+
+    if cuota:
+        cpus = min(cpus, int(cuota + 0.5))
+    return max(1, cpus)
+
+
+def numero_workers(max_workers=None):
+    """Workers a usar: parámetro explícito, configuración o límite de CPU"""
+    from config.settings import OCR_MAX_WORKERS
+
+    if max_workers:
+        return max(1, max_workers)
+    if OCR_MAX_WORKERS > 0:
+        return OCR_MAX_WORKERS
+    return limite_cpus()
+
+
+def lotes_consecutivos(paginas, tamano):
+    """
+    Divide números de página en lotes de páginas consecutivas
+
+    Args:
+        paginas: Números de página ordenados
+        tamano: Páginas máximas por lote
+
+    Returns:
+        Lista de listas de números de página
+    """
+    lotes = []
+    for pagina in paginas:
+        if lotes and pagina == lotes[-1][-1] + 1 and len(lotes[-1]) < tamano:
+            lotes[-1].append(pagina)
+        else:
+            lotes.append([pagina])
+    return lotes
+
+
+def _ocr_lote(trabajo):
+    """
+    Rasteriza y pasa por Tesseract un lote de páginas consecutivas (se
+    ejecuta en el worker, con una sola llamada a Poppler y a Tesseract)
+
+    Args:
+        trabajo: Tupla (pdf_path, paginas, dpi, dpi_bajo, lang, config, poppler_path, layout);
+            con dpi_bajo se hace primero una pasada a baja resolución y con
+            layout solo se leen sus regiones
+
+    Returns:
+        Lista con la PaginaOCR de cada página (None en todas si falla)
+    """
+    pdf_path, paginas, dpi, dpi_bajo, lang, config, poppler_path, layout = trabajo
+    try:
+        imagenes = [image for _, image in iterar_paginas(
+            pdf_path, dpi=dpi_bajo or dpi, paginas_por_bloque=len(paginas),
+            poppler_path=poppler_path, primera=paginas[0], ultima=paginas[-1]
+        )]
+        return ocr_paginas(imagenes, pdf_path, paginas, dpi, dpi_bajo, lang=lang, config=config,
+                           poppler_path=poppler_path, layout=layout)
+    except Exception as e:
+        print(f"Error en OCR ({os.path.basename(pdf_path)}, páginas {paginas[0]}-{paginas[-1]}): {e}")
+        return [None] * len(paginas)
+
+
+def ocr_documentos_en_paralelo(documentos, max_workers=None):
+    """
+    Hace el OCR de todas las páginas de varios OCRDocument en un único pool
+
+    Los documentos que ya tienen texto (o lo encuentran en caché) no se
+    reprocesan, de los leídos parcialmente con iterar_textos() solo se
+    procesan las páginas que faltan, las páginas con capa de texto no se
+    rasterizan, las descartadas por su tipo (ver OCRDocument.tipos) quedan
+    vacías y las marcadas como duplicadas (ver ocr.duplicados) toman el
+    texto de su original. Cada worker recibe lotes de páginas consecutivas que pasan
+    por una única ejecución de Tesseract. Si una página falla queda vacía y
+    el documento no se guarda en caché.
+
+    Args:
+        documentos: Lista de OCRDocument
+        max_workers: Procesos a usar (por defecto, configuración o límite de CPU)
+    """
+    pendientes = [doc for doc in documentos if not doc.cargado and not doc.cargar_de_cache()]
+    if not pendientes:
+        return
+
+    from config.settings import OCR_PAGINAS_POR_LOTE
+
+    por_procesar = []
+    planes = []
+    for doc in pendientes:
+        try:
+            total = doc.numero_paginas()
+        except Exception as e:
+            print(f"Error en OCR: {e}")
+            doc.establecer_paginas([], guardar=False)
+            continue
+
+        leidas = doc.paginas_leidas()
+        paginas = leidas + [None] * (total - len(leidas))
+        sin_capa = []
+        for indice in range(len(leidas), total):
+            # Las duplicadas de otra página (ver ocr.duplicados) no se leen:
+            # toman el resultado de la original al final
+            if indice + 1 in doc.duplicadas:
+                continue
+            # Páginas en blanco o sin duda de otro tipo (ver ocr.clasificacion)
+            if not doc.pagina_relevante(indice + 1):
+                paginas[indice] = PaginaOCR([], texto='')
+                continue
+            # Las páginas con capa de texto no pasan por Tesseract
+            pagina = doc.pagina_capa(indice + 1)
+            if pagina is not None:
+                paginas[indice] = pagina
+            else:
+                sin_capa.append(indice + 1)
+        por_procesar.append((doc, paginas, sin_capa))
+        planes.append((doc, paginas))
+
+    # Lotes lo bastante pequeños para que todos los workers tengan trabajo
+    total_ocr = sum(len(sin_capa) for _, _, sin_capa in por_procesar)
+    workers = numero_workers(max_workers)
+    tamano_lote = max(1, min(OCR_PAGINAS_POR_LOTE, math.ceil(total_ocr / workers)))
+
+    trabajos = []
+    destinos = []
+    for doc, paginas, sin_capa in por_procesar:
+        for lote in lotes_consecutivos(sin_capa, tamano_lote):
+            trabajos.append((doc.pdf_path, lote, doc.dpi, doc.dpi_bajo,
+                             doc.lang, doc.config, doc.poppler_path, doc.layout))
+            destinos.append((paginas, lote))
+
+    workers = min(workers, len(trabajos))
+    if not trabajos:
+        resultados = []
+    elif workers <= 1:
+        resultados = [_ocr_lote(trabajo) for trabajo in trabajos]
+    else:
+        contexto = multiprocessing.get_context('spawn')
+        with ProcessPoolExecutor(max_workers=workers, mp_context=contexto) as executor:
+            resultados = list(executor.map(_ocr_lote, trabajos))
+
+    for (paginas, lote), leidas in zip(destinos, resultados):
+        for numero, pagina in zip(lote, leidas):
+            paginas[numero - 1] = pagina
+
+    # Páginas duplicadas: resultado de la página original (de esta tanda o ya cargada)
+    paginas_por_doc = {id(doc): paginas for doc, paginas in planes}
+    for doc, paginas in planes:
+        for pagina, (original, pagina_original) in doc.duplicadas.items():
+            if pagina > len(paginas) or paginas[pagina - 1] is not None:
+                continue
+            fuente = paginas_por_doc.get(id(original))
+            if fuente is None and original.cargado:
+                fuente = original.paginas_ocr
+            if fuente is not None and pagina_original <= len(fuente):
+                paginas[pagina - 1] = fuente[pagina_original - 1]
+
+    for doc, paginas in planes:
+        if any(pagina is None for pagina in paginas):
+            # Se conservan las páginas legibles, pero no se guarda en caché
+            doc.establecer_paginas([pagina or PaginaOCR([], texto='') for pagina in paginas], guardar=False)
+        else:
+            doc.establecer_paginas(paginas)
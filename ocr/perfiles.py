@@ -0,0 +1,90 @@
+"""
+Perfiles OCR por tipo de documento y campo
+Cada perfil fija el modo de segmentación (psm), el motor (oem), la lista de
+caracteres permitidos y el modelo (tessdata_fast o tessdata_best). Los campos
+pequeños con alfabeto restringido se leen antes y con menos errores con el
+modelo rápido; el texto libre de los documentos usa el modelo completo.
+"""
+DIGITOS = '0123456789'
+
+# Letras de control del DNI/NIE (incluye las iniciales X, Y, Z del NIE)
+LETRAS_DNI = 'TRWAGMYFPDXBNJZSQVHLCKE'
+
+PERFILES = {
+    # Página completa con maquetación libre
+    'documento': {'psm': 3, 'oem': 1, 'lista_blanca': None, 'modelo': 'best'},
+    # Cabecera y datos del alumno del parte de firmas (bloque de texto uniforme)
+    'firma_header': {'psm': 6, 'oem': 1, 'lista_blanca': None, 'modelo': 'fast'},
+    # Tabla de semanas del parte de firmas
+    'firma_semanas': {'psm': 6, 'oem': 1, 'lista_blanca': None, 'modelo': 'fast'},
+    # Cabecera de una página a baja resolución para clasificarla (ver ocr.clasificacion)
+    'clasificacion': {'psm': 6, 'oem': 1, 'lista_blanca': None, 'modelo': 'fast'},
+    # Campos de una sola línea
+    'dni_field': {'psm': 7, 'oem': 1, 'lista_blanca': DIGITOS + LETRAS_DNI, 'modelo': 'fast'},
+    'date_field': {'psm': 7, 'oem': 1, 'lista_blanca': DIGITOS + '/:', 'modelo': 'fast'},
+    # Justificantes y otorgamiento de becas: texto corrido en un bloque
+    'justificante_body': {'psm': 6, 'oem': 1, 'lista_blanca': None, 'modelo': 'best'},
+    'becas_body': {'psm': 6, 'oem': 1, 'lista_blanca': None, 'modelo': 'best'},
+}
+
+
+def obtener_perfil(nombre):
+    """
+    Perfil registrado con ese nombre
+
+    Args:
+        nombre: Clave en PERFILES (p.ej. 'date_field')
+
+    Returns:
+        dict con el perfil o None si no existe
+    """
+    if not nombre:
+        return None
+    perfil = PERFILES.get(nombre)
+    if perfil is None:
+        print(f"Advertencia: perfil OCR desconocido '{nombre}', se usan las opciones por defecto")
+    return perfil
+
+
+def carpeta_modelo(modelo):
+    """
+    Carpeta de tessdata de un modelo
+
+    Args:
+        modelo: 'fast' o 'best'
+
+    Returns:
+        str o '' para usar la tessdata por defecto
+    """
+    from config.settings import OCR_TESSDATA_BEST, OCR_TESSDATA_FAST
+
+    return OCR_TESSDATA_FAST if modelo == 'fast' else OCR_TESSDATA_BEST
+
+
+def config_perfil(nombre, extra=''):
+    """
+    Opciones de Tesseract de un perfil
+
+    Args:
+        nombre: Nombre del perfil en PERFILES
+        extra: Opciones adicionales que se añaden al final
+
+    Returns:
+        str con las opciones (p.ej. '--psm 7 --oem 1 -c tessedit_char_whitelist=0123456789/:');
+        solo `extra` si el perfil no existe
+    """
+    perfil = obtener_perfil(nombre)
+    if perfil is None:
+        return extra
+
+    partes = []
+    carpeta = carpeta_modelo(perfil['modelo'])
+    if carpeta:
+        partes.append(f'--tessdata-dir "{carpeta}"')
+    partes.append(f"--psm {perfil['psm']}")
+    partes.append(f"--oem {perfil['oem']}")
+    if perfil['lista_blanca']:
+        partes.append(f"-c tessedit_char_whitelist={perfil['lista_blanca']}")
+    if extra:
+        partes.append(extra)
+    return ' '.join(partes)
@@ -0,0 +1,208 @@
+"""
+Preprocesado de imágenes antes del OCR
+Escala de grises, binarización adaptativa, enderezado y recorte de márgenes
+con NumPy. Cada paso se activa o desactiva en config.settings.OCR_PREPROCESADO
+y su tiempo se acumula en TIEMPOS (por proceso).
+"""
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+
+import numpy as np
+from PIL import Image
+
+from .firmas import binarizar
+
+# Segundos y llamadas acumulados por paso en este proceso
+TIEMPOS = defaultdict(lambda: {'segundos': 0.0, 'llamadas': 0})
+
+
+@contextmanager
+def _medir(paso):
+    inicio = time.perf_counter()
+    try:
+        yield
+    finally:
+        TIEMPOS[paso]['segundos'] += time.perf_counter() - inicio
+        TIEMPOS[paso]['llamadas'] += 1
+
+
+def pasos_activos():
+    """Pasos de preprocesado activos según la configuración"""
+    from config.settings import OCR_PREPROCESADO
+
+    return OCR_PREPROCESADO
+
+
+def tiempos_preprocesado():
+    """
+    Tiempo acumulado de cada paso en este proceso
+
+    Returns:
+        dict {paso: {'segundos': float, 'llamadas': int}}
+    """
+    return {paso: dict(valores) for paso, valores in TIEMPOS.items()}
+
+
+def reiniciar_tiempos():
+    TIEMPOS.clear()
+
+
+def angulo_inclinacion(image, maximo=5.0, paso=0.25):
+    """
+    Inclinación del texto de una página (perfil de proyección)
+
+    Para cada ángulo candidato se proyectan los píxeles con tinta de una
+    miniatura sobre el eje vertical; el ángulo con el perfil más contrastado
+    es el que alinea las líneas de texto
+
+    Args:
+        image: Imagen PIL
+        maximo: Inclinación máxima buscada en grados
+        paso: Resolución de la búsqueda en grados
+
+    Returns:
+        float: Grados a girar en sentido antihorario (PIL) para enderezar
+    """
+    mini = image.convert('L')
+    mini.thumbnail((1000, 1000))
+    ys, xs = np.nonzero(binarizar(mini))
+    if len(ys) < 100:
+        return 0.0
+    # Con una muestra de la tinta basta para el perfil
+    salto = max(1, len(ys) // 100000)
+    ys = ys[::salto].astype(np.float64)
+    xs = xs[::salto].astype(np.float64) - mini.width / 2
+
+    mejor_angulo = 0.0
+    mejor_puntuacion = -1.0
+    for angulo in np.arange(-maximo, maximo + paso / 2, paso):
+        proyeccion = np.round(ys - xs * np.tan(np.radians(angulo))).astype(np.int64)
+        perfil = np.bincount(proyeccion - proyeccion.min())
+        puntuacion = float(np.square(np.diff(perfil)).sum())
+        if puntuacion > mejor_puntuacion:
+            mejor_angulo, mejor_puntuacion = float(angulo), puntuacion
+    return mejor_angulo
+
+
+def enderezar(image, angulo):
+    """Gira la imagen `angulo` grados (antihorario) sin cambiar su tamaño"""
+    if abs(angulo) < 0.1:
+        return image
+    return image.rotate(angulo, resample=Image.BILINEAR, fillcolor=255 if image.mode == 'L' else 'white')
+
+
+def binarizar_adaptativo(image, ventana=None, sensibilidad=0.15):
+    """
+    Binarización con umbral local (media de la vecindad, método de Bradley)
+
+    Tolera sombras y escaneos con iluminación irregular, donde un umbral
+    global borra parte del texto
+
+    Args:
+        image: Imagen PIL
+        ventana: Lado de la vecindad en píxeles (por defecto, 1/40 de la página)
+        sensibilidad: Fracción por debajo de la media local para considerar tinta
+
+    Returns:
+        Imagen PIL en modo 'L' con valores 0 y 255
+    """
+    gris = np.asarray(image.convert('L'))
+    alto, ancho = gris.shape
+    radio = (ventana or max(15, min(alto, ancho) // 40)) // 2
+
+    integral = np.zeros((alto + 1, ancho + 1), dtype=np.int64)
+    np.cumsum(np.cumsum(gris, axis=0, dtype=np.int64), axis=1, out=integral[1:, 1:])
+
+    y0 = np.clip(np.arange(alto) - radio, 0, alto)
+    y1 = np.clip(np.arange(alto) + radio + 1, 0, alto)
+    x0 = np.clip(np.arange(ancho) - radio, 0, ancho)
+    x1 = np.clip(np.arange(ancho) + radio + 1, 0, ancho)
+
+    suma = integral[y1][:, x1]
+    suma -= integral[y0][:, x1]
+    suma -= integral[y1][:, x0]
+    suma += integral[y0][:, x0]
+    area = (y1 - y0)[:, None] * (x1 - x0)[None, :]
+
+    tinta = gris.astype(np.int64) * area * 100 <= suma * int(100 * (1 - sensibilidad))
+    return Image.fromarray(np.where(tinta, 0, 255).astype(np.uint8))
+
+
+def caja_sin_margenes(image, relleno=0.01, minimo=2):
+    """
+    Caja de una imagen sin sus márgenes en blanco
+
+    Args:
+        image: Imagen PIL
+        relleno: Margen que se conserva, en fracción del lado
+        minimo: Píxeles con tinta mínimos por fila/columna (ignora motas)
+
+    Returns:
+        Tupla (x0, y0, x1, y1) en píxeles o None si no hay tinta
+    """
+    tinta = binarizar(image)
+    filas = np.flatnonzero(tinta.sum(axis=1) >= minimo)
+    columnas = np.flatnonzero(tinta.sum(axis=0) >= minimo)
+    if not len(filas) or not len(columnas):
+        return None
+    margen_y = int(image.height * relleno)
+    margen_x = int(image.width * relleno)
+    return (
+        int(max(0, columnas[0] - margen_x)), int(max(0, filas[0] - margen_y)),
+        int(min(image.width, columnas[-1] + 1 + margen_x)), int(min(image.height, filas[-1] + 1 + margen_y)),
+    )
+
+
+def recortar_margenes(image, relleno=0.01, minimo=2):
+    """Recorta los márgenes en blanco de una imagen (la original si no hay tinta)"""
+    caja = caja_sin_margenes(image, relleno, minimo)
+    return image.crop(caja) if caja else image
+
+
+def preparar_pagina(image):
+    """
+    Preprocesado de la página completa que conserva su geometría
+    (las cajas de los layouts siguen siendo válidas)
+
+    Returns:
+        Tupla (imagen, ángulo de enderezado aplicado)
+    """
+    pasos = pasos_activos()
+    angulo = 0.0
+    if pasos.get('escala_grises') and image.mode != 'L':
+        with _medir('escala_grises'):
+            image = image.convert('L')
+    if pasos.get('enderezar'):
+        with _medir('enderezar'):
+            angulo = angulo_inclinacion(image)
+            image = enderezar(image, angulo)
+    return image, angulo
+
+
+def preparar_lectura(image):
+    """
+    Preprocesado final de una imagen (o recorte) justo antes de Tesseract
+
+    Args:
+        image: Imagen PIL
+
+    Returns:
+        Tupla (imagen, (x, y)) con la posición del recorte de márgenes en la
+        imagen recibida, para llevar las cajas de las palabras a la página
+    """
+    pasos = pasos_activos()
+    origen = (0, 0)
+    if pasos.get('escala_grises') and image.mode != 'L':
+        with _medir('escala_grises'):
+            image = image.convert('L')
+    if pasos.get('recortar_margenes'):
+        with _medir('recortar_margenes'):
+            caja = caja_sin_margenes(image)
+            if caja:
+                image = image.crop(caja)
+                origen = caja[:2]
+    if pasos.get('binarizar'):
+        with _medir('binarizar'):
+            image = binarizar_adaptativo(image)
+    return image, origen
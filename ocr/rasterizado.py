@@ -0,0 +1,85 @@
+"""
+Rasterizado de PDFs por bloques de páginas
+Genera las imágenes de forma perezosa para que la memoria no dependa del
+número de páginas del documento y el llamador pueda parar en cuanto encuentre
+lo que busca
+"""
+from pdf2image import convert_from_path, pdfinfo_from_path
+
+
+def _escala_grises(grayscale):
+    """Valor de grayscale: el indicado o, por defecto, el de la configuración"""
+    if grayscale is not None:
+        return grayscale
+    from config.settings import OCR_PREPROCESADO
+
+    return OCR_PREPROCESADO.get('escala_grises', False)
+
+
+def _poppler(poppler_path):
+    """Carpeta de Poppler: la indicada o, por defecto, la de la configuración"""
+    if poppler_path:
+        return poppler_path
+    from config.settings import POPPLER_PATH
+
+    return POPPLER_PATH
+
+
+def contar_paginas(pdf_path, poppler_path=None):
+    """Número de páginas de un PDF sin rasterizarlo"""
+    return int(pdfinfo_from_path(pdf_path, poppler_path=_poppler(poppler_path))['Pages'])
+
+
+def rasterizar_pagina(pdf_path, pagina, dpi=300, poppler_path=None, grayscale=None):
+    """
+    Rasteriza una sola página
+
+    Args:
+        pdf_path: Ruta al PDF
+        pagina: Número de página (empezando en 1)
+        dpi: Resolución
+        poppler_path: Carpeta de binarios de Poppler
+        grayscale: Rasterizar directamente en escala de grises (por defecto,
+            según OCR_PREPROCESADO['escala_grises'])
+
+    Returns:
+        Imagen PIL
+    """
+    images = convert_from_path(
+        pdf_path, dpi=dpi, first_page=pagina, last_page=pagina,
+        poppler_path=_poppler(poppler_path), grayscale=_escala_grises(grayscale)
+    )
+    return images[0]
+
+
+def iterar_paginas(pdf_path, dpi=300, paginas_por_bloque=2, poppler_path=None,
+                   grayscale=None, primera=1, ultima=None):
+    """
+    Generador de (número_de_página, imagen) que rasteriza por bloques
+
+    Solo hay en memoria las imágenes de un bloque; si el llamador deja de
+    iterar, las páginas restantes no se llegan a rasterizar.
+
+    Args:
+        pdf_path: Ruta al PDF
+        dpi: Resolución
+        paginas_por_bloque: Páginas que se piden a Poppler en cada llamada
+        poppler_path: Carpeta de binarios de Poppler
+        grayscale: Rasterizar directamente en escala de grises (por defecto,
+            según OCR_PREPROCESADO['escala_grises'])
+        primera: Primera página (empezando en 1)
+        ultima: Última página (por defecto, la última del documento)
+    """
+    if ultima is None:
+        ultima = contar_paginas(pdf_path, poppler_path)
+    grayscale = _escala_grises(grayscale)
+
+    for inicio in range(primera, ultima + 1, paginas_por_bloque):
+        fin = min(inicio + paginas_por_bloque - 1, ultima)
+        images = convert_from_path(
+            pdf_path, dpi=dpi, first_page=inicio, last_page=fin,
+            poppler_path=_poppler(poppler_path), grayscale=grayscale
+        )
+        for offset, image in enumerate(images):
+            yield inicio + offset, image
+        del images
@@ -0,0 +1,141 @@
+"""
+Lectura de tablas por la posición de las palabras
+Las columnas se delimitan por el centro de los textos de la cabecera y las
+filas por la palabra que identifica cada registro (el DNI), sobre las
+palabras de PaginaOCR: sirve igual para la capa de texto (pdfplumber) que para
+el OCR de páginas escaneadas y para documentos de varias páginas.
+"""
+import re
+import statistics
+
+
+def _centro_x(palabra):
+    return (palabra['caja'][0] + palabra['caja'][2]) / 2
+
+
+def _centro_y(palabra):
+    return (palabra['caja'][1] + palabra['caja'][3]) / 2
+
+
+def _limpiar(texto):
+    return re.sub(r'[^0-9A-Z]', '', texto.upper())
+
+
+def _banda_cabecera(pagina, tabla):
+    """Palabras de la cabecera de la tabla o None si la página no la tiene"""
+    lineas = pagina.lineas()
+    mejor, aciertos_mejor = None, 0
+    for indice, _ in pagina.lineas_con(tabla['cabecera']):
+        linea = lineas[indice]
+        y0 = min(p['caja'][1] for p in linea) - tabla['alto_cabecera']
+        y1 = max(p['caja'][3] for p in linea) + tabla['alto_cabecera']
+        banda = [p for p in pagina.palabras if y0 <= _centro_y(p) <= y1]
+        aciertos = sum(
+            any(re.search(patron, p['texto'], re.IGNORECASE) for p in banda)
+            for _, patron in tabla['columnas']
+        )
+        if aciertos > aciertos_mejor:
+            mejor, aciertos_mejor = banda, aciertos
+    return mejor
+
+
+def limites_columnas(banda, tabla):
+    """
+    Límites horizontales de cada columna a partir de la cabecera
+
+    Cada columna toma la palabra más a la izquierda que cumple su patrón a
+    la derecha de la columna anterior; los límites son los puntos medios
+    entre los centros de columnas vecinas
+
+    Args:
+        banda: Palabras de la cabecera
+        tabla: dict de TABLAS (ver ocr.layouts)
+
+    Returns:
+        Lista de (columna, x0, x1) normalizados o None si falta alguna
+        columna obligatoria
+    """
+    centros = []
+    minimo = -1.0
+    for nombre, patron in tabla['columnas']:
+        candidatas = sorted(
+            _centro_x(p) for p in banda
+            if _centro_x(p) > minimo and re.search(patron, p['texto'], re.IGNORECASE)
+        )
+        if candidatas:
+            centros.append((nombre, candidatas[0]))
+            minimo = candidatas[0]
+
+    encontradas = {nombre for nombre, _ in centros}
+    if not all(nombre in encontradas for nombre in tabla.get('obligatorias', [])):
+        return None
+
+    limites = []
+    for indice, (nombre, centro) in enumerate(centros):
+        x0 = 0.0 if indice == 0 else (centros[indice - 1][1] + centro) / 2
+        x1 = 1.0 if indice == len(centros) - 1 else (centro + centros[indice + 1][1]) / 2
+        limites.append((nombre, x0, x1))
+    return limites
+
+
+def filas_tabla(paginas, tabla):
+    """
+    Filas de una tabla que puede ocupar varias páginas
+
+    Las páginas sin cabecera (continuación de la tabla) usan los límites de
+    columnas de la anterior. Cada fila abarca las líneas entre los puntos
+    medios con la fila anterior y la siguiente, así que los nombres partidos
+    en dos líneas y las marcas algo desplazadas caen en su fila.
+
+    Args:
+        paginas: Lista de PaginaOCR
+        tabla: dict de TABLAS (ver ocr.layouts)
+
+    Returns:
+        Lista de dicts {columna: texto} con 'id' (la palabra del patrón de
+        fila, normalizada) y 'pagina' (número de página)
+    """
+    patron_fila = re.compile(tabla['fila'])
+    filas = []
+    limites = None
+
+    for numero, pagina in enumerate(paginas, 1):
+        if not pagina.palabras:
+            continue
+        fondo = 0.0
+        banda = _banda_cabecera(pagina, tabla)
+        if banda:
+            limites = limites_columnas(banda, tabla) or limites
+            fondo = max(p['caja'][3] for p in banda)
+        if limites is None:
+            continue
+
+        palabras = [p for p in pagina.palabras if _centro_y(p) > fondo]
+        anclas = sorted(
+            (_centro_y(p), _limpiar(p['texto'])) for p in palabras
+            if patron_fila.fullmatch(_limpiar(p['texto']))
+        )
+        if not anclas:
+            continue
+
+        alturas = [p['caja'][3] - p['caja'][1] for p in palabras]
+        separaciones = [b[0] - a[0] for a, b in zip(anclas, anclas[1:])]
+        paso = statistics.median(separaciones) if separaciones else 2 * statistics.median(alturas)
+
+        for indice, (y, identificador) in enumerate(anclas):
+            y0 = fondo if indice == 0 else (anclas[indice - 1][0] + y) / 2
+            y1 = y + paso / 2 if indice == len(anclas) - 1 else (y + anclas[indice + 1][0]) / 2
+            celdas = {nombre: [] for nombre, _, _ in limites}
+            for palabra in sorted(palabras, key=lambda p: (p['linea'], p['caja'][0])):
+                if not y0 < _centro_y(palabra) <= y1:
+                    continue
+                x = _centro_x(palabra)
+                for nombre, x0, x1 in limites:
+                    if x0 <= x < x1:
+                        celdas[nombre].append(palabra['texto'])
+                        break
+            fila = {nombre: ' '.join(textos) for nombre, textos in celdas.items()}
+            fila['id'] = identificador
+            fila['pagina'] = numero
+            filas.append(fila)
+    return filas
@@ -43,7 +43,6 @@ def render_cierre_mes():
         extraer_alumnos_excel
     )
     from sections.evaluacion.cierre_mes.generacion_word import generar_parte_mensual
-    from sections.evaluacion.cierre_mes.utilidades import buscar_coincidencia
     
     tab1, tab2, tab3 = st.tabs(["Subir Archivos", "Procesar", "Descargar"])
     
@@ -170,7 +169,7 @@ def render_cierre_mes():
                         
                         status.text("Extrayendo justificantes...")
                         progress.progress(45)
-                        justificantes_dict = extraer_justificantes_mejorado(justif_path)
+                        justificantes_dict = extraer_justificantes_mejorado(justif_path, alumnos_excel)
                         
                         status.text("Calculando días lectivos y faltas...")
                         progress.progress(60)
@@ -7,8 +7,14 @@ import os
 import re
 from datetime import datetime, timedelta
 from collections import defaultdict
-from pdf2image import convert_from_path
-import pytesseract
+
+from ocr import OCRDocument, ocr_documentos_en_paralelo
+from ocr.duplicados import indexar_duplicados
+from ocr.firmas import dias_firmados
+from ocr.layouts import LAYOUTS
+
+# Cabecera de cada semana del parte de firmas
+PATRON_SEMANA = r'SEMANA\s+DEL\s+(\d{1,2})/(\d{1,2})\s+AL\s+(\d{1,2})/(\d{1,2})/(\d{4})'
 
 def extraer_texto_con_ocr(pdf_path, dpi=300):
     """
@@ -21,29 +27,33 @@ def extraer_texto_con_ocr(pdf_path, dpi=300):
     Returns:
         Lista de textos extraídos por página
     """
-    try:
-        images = convert_from_path(pdf_path, dpi=dpi)
-        textos_por_pagina = []
-        
-        for image in images:
-            texto = pytesseract.image_to_string(image, lang='spa')
-            textos_por_pagina.append(texto)
-        
-        return textos_por_pagina
-    except Exception as e:
-        print(f"Error en OCR: {e}")
-        return []
+    return list(OCRDocument(pdf_path, dpi=dpi).paginas)
+
+def _limpiar_nombre(nombre):
+    """Quita dígitos y signos de un nombre leído por OCR"""
+    nombre = re.sub(r'\d+', '', nombre)
+    nombre = re.sub(r'[^\w\s]', ' ', nombre)
+    return ' '.join(nombre.split())
 
-def extraer_nombre_alumno_ocr(texto):
+def extraer_nombre_alumno_ocr(texto, pagina=None):
     """
     Extrae el nombre del alumno del texto OCR
     
     Args:
         texto: Texto extraído por OCR
+        pagina: PaginaOCR de la página (opcional); si se pasa, el nombre se
+            busca primero a la derecha de la etiqueta "Nombre"
     
     Returns:
         Nombre del alumno o None
     """
+    if pagina is not None:
+        for aparicion in range(len(pagina.buscar('Nombre'))):
+            valor = pagina.derecha_de('Nombre', hasta=r'NIF|DNI', aparicion=aparicion)
+            nombre = _limpiar_nombre(valor or '')
+            if len(nombre) > 5:
+                return nombre
+    
     patrones = [
         r'DATOS\s+DEL\s+ALUMNO.*?Nombre[:\s]+([A-ZÁÉÍÓÚÑ\s]+?)(?:\n|NIF|DNI)',
         r'Nombre[:\s]+([A-ZÁÉÍÓÚÑ][A-ZÁÉÍÓÚÑ\s]+?)(?:\n|NIF|DNI)',
@@ -53,22 +63,62 @@ def extraer_nombre_alumno_ocr(texto):
     for patron in patrones:
         match = re.search(patron, texto, re.IGNORECASE | re.DOTALL)
         if match:
-            nombre = match.group(1).strip()
-            nombre = re.sub(r'\d+', '', nombre)
-            nombre = re.sub(r'[^\w\s]', ' ', nombre)
-            nombre = ' '.join(nombre.split())
+            nombre = _limpiar_nombre(match.group(1).strip())
             if len(nombre) > 5:
                 return nombre
     
     return None
 
-def extraer_fechas_de_pdf(pdf_path):
+def _fecha_junto_a(pagina, etiqueta, texto):
+    """
+    Fecha (día, mes, año) escrita a la derecha de una etiqueta del parte
+    Si no se encuentra por posición, se busca "etiqueta: dd/mm/aaaa" en el texto
+    """
+    valor = pagina.derecha_de(etiqueta) if pagina is not None else None
+    match = re.search(r'(\d{1,2})/(\d{1,2})/(\d{4})', valor) if valor else None
+    if match is None:
+        match = re.search(
+            r'\s+'.join(etiqueta.split()) + r':\s+(\d{1,2})/(\d{1,2})/(\d{4})',
+            texto,
+            re.IGNORECASE
+        )
+    return match.groups() if match else None
+
+def _releer_fecha(documento, numero, pagina, etiqueta):
+    """
+    Relee con el perfil de fechas (solo dígitos y '/') la zona a la derecha
+    de una etiqueta cuando la lectura de la página no dio una fecha válida
+    """
+    caja = pagina.caja_derecha_de(etiqueta, ancho=0.3) if pagina is not None else None
+    if caja is None:
+        return None
+    x0, y0, x1, y1 = caja
+    margen = (y1 - y0) / 2
+    texto = documento.leer_campo(numero, (x0, max(0.0, y0 - margen), x1, min(1.0, y1 + margen)), 'date_field')
+    match = re.search(r'(\d{1,2})/(\d{1,2})/(\d{4})', texto)
+    return match.groups() if match else None
+
+def _semanas_de_pagina(texto, pagina):
+    """
+    Cabeceras "SEMANA DEL dd/mm AL dd/mm/aaaa" de una página
+    
+    Returns:
+        Lista de tuplas (índice_de_línea, match); el índice es None si las
+        cabeceras solo se encuentran en el texto plano
+    """
+    en_texto = list(re.finditer(PATRON_SEMANA, texto, re.IGNORECASE))
+    en_lineas = pagina.lineas_con(PATRON_SEMANA) if pagina is not None else []
+    if en_lineas and len(en_lineas) >= len(en_texto):
+        return en_lineas
+    return [(None, match) for match in en_texto]
+
+def extraer_fechas_de_pdf(documento):
     """
     Extrae todas las fechas encontradas en un PDF usando OCR
     Prioriza "Fecha de inicio" y "Fecha de finalización"
     
     Args:
-        pdf_path: Ruta al archivo PDF
+        documento: Ruta al archivo PDF u OCRDocument ya creado
     
     Returns:
         Lista de objetos datetime
@@ -76,32 +126,18 @@ def extraer_fechas_de_pdf(pdf_path):
     fechas = []
     
     try:
-        textos = extraer_texto_con_ocr(pdf_path, dpi=300)
+        documento = OCRDocument.desde(documento, dpi=300, layout='parte_firma', perfil='documento',
+                                      tipos=('parte_firma',))
         
-        for texto in textos:
+        for numero, (texto, pagina) in enumerate(zip(documento.paginas, documento.paginas_ocr), 1):
             # PRIORIDAD 1: Buscar "Fecha de inicio" y "Fecha de finalización"
-            match_inicio = re.search(
-                r'Fecha\s+de\s+inicio:\s+(\d{1,2})/(\d{1,2})/(\d{4})',
-                texto,
-                re.IGNORECASE
-            )
-            match_fin = re.search(
-                r'Fecha\s+de\s+finalización:\s+(\d{1,2})/(\d{1,2})/(\d{4})',
-                texto,
-                re.IGNORECASE
-            )
-            
-            if match_inicio:
-                dia, mes, año = match_inicio.groups()
-                try:
-                    fecha = datetime(int(año), int(mes), int(dia))
-                    if 2024 <= fecha.year <= 2026 and fecha.month <= 12:
-                        fechas.append(fecha)
-                except:
-                    pass
-            
-            if match_fin:
-                dia, mes, año = match_fin.groups()
+            for etiqueta in ('Fecha de inicio', 'Fecha de finalización'):
+                fecha_etiqueta = _fecha_junto_a(pagina, etiqueta, texto) or _releer_fecha(
+                    documento, numero, pagina, etiqueta
+                )
+                if not fecha_etiqueta:
+                    continue
+                dia, mes, año = fecha_etiqueta
                 try:
                     fecha = datetime(int(año), int(mes), int(dia))
                     if 2024 <= fecha.year <= 2026 and fecha.month <= 12:
@@ -110,10 +146,7 @@ def extraer_fechas_de_pdf(pdf_path):
                     pass
             
             # PRIORIDAD 2: Buscar patrón SEMANA DEL DD/MM AL DD/MM/YYYY
-            patron_semana = r'SEMANA\s+DEL\s+(\d{1,2})/(\d{1,2})\s+AL\s+(\d{1,2})/(\d{1,2})/(\d{4})'
-            matches = re.finditer(patron_semana, texto, re.IGNORECASE)
-            
-            for match in matches:
+            for _, match in _semanas_de_pagina(texto, pagina):
                 dia1, mes1, dia2, mes2, año = match.groups()
                 try:
                     fecha_inicio = datetime(int(año), int(mes1), int(dia1))
@@ -130,12 +163,12 @@ def extraer_fechas_de_pdf(pdf_path):
     
     return fechas
 
-def contar_dias_con_firmas_por_alumno(pdf_path):
+def contar_dias_con_firmas_por_alumno(documento):
     """
     Cuenta los días con firma por alumno en un PDF
     
     Args:
-        pdf_path: Ruta al archivo PDF
+        documento: Ruta al archivo PDF u OCRDocument ya creado
     
     Returns:
         Diccionario {nombre_alumno: numero_de_dias}
@@ -143,28 +176,45 @@ def contar_dias_con_firmas_por_alumno(pdf_path):
     dias_por_alumno = {}
     
     try:
-        textos = extraer_texto_con_ocr(pdf_path, dpi=300)
+        documento = OCRDocument.desde(documento, dpi=300, layout='parte_firma', perfil='documento',
+                                      tipos=('parte_firma',))
+        rejilla = LAYOUTS['parte_firma']['rejilla']
         
-        for texto in textos:
-            nombre = extraer_nombre_alumno_ocr(texto)
+        for numero, (texto, pagina) in enumerate(zip(documento.paginas, documento.paginas_ocr), 1):
+            # Página repetida de otro PDF (o del mismo): ya se contó
+            if numero in documento.duplicadas:
+                continue
+            
+            nombre = extraer_nombre_alumno_ocr(texto, pagina)
             if not nombre:
                 continue
             
-            patron_semana = r'SEMANA\s+DEL\s+(\d{1,2})/(\d{1,2})\s+AL\s+(\d{1,2})/(\d{1,2})/(\d{4})'
-            semanas = re.finditer(patron_semana, texto, re.IGNORECASE)
+            semanas = _semanas_de_pagina(texto, pagina)
+            
+            # Celdas firmadas por densidad de tinta: una fila por semana
+            celdas = documento.celdas_firmadas(numero)
+            if celdas is not None and len(celdas) != len(semanas):
+                celdas = None
             
             dias_con_firma = 0
             
-            for semana_match in semanas:
+            for indice_semana, (linea_semana, semana_match) in enumerate(semanas):
                 dia1, mes1, dia2, mes2, año = semana_match.groups()
                 try:
                     fecha_inicio = datetime(int(año), int(mes1), int(dia1))
                     fecha_fin = datetime(int(año), int(mes2), int(dia2))
                     
-                    # Extraer contexto alrededor de la semana
-                    inicio_match = semana_match.start()
-                    fin_contexto = min(inicio_match + 500, len(texto))
-                    contexto = texto[inicio_match:fin_contexto]
+                    if celdas is not None:
+                        dias_con_firma += len(dias_firmados(celdas[indice_semana], fecha_inicio, fecha_fin, rejilla))
+                        continue
+                    
+                    # Sin rejilla detectada: horarios HH:MM bajo la cabecera de la semana
+                    if linea_semana is not None:
+                        contexto = '\n'.join(pagina.lineas_bajo(linea_semana, hasta=PATRON_SEMANA))
+                    else:
+                        inicio_match = semana_match.start()
+                        fin_contexto = min(inicio_match + 500, len(texto))
+                        contexto = texto[inicio_match:fin_contexto]
                     
                     # Buscar horarios (HH:MM)
                     horarios = re.findall(r'\b(\d{1,2}):(\d{2})\b', contexto)
@@ -212,11 +262,26 @@ def calcular_dias_lectivos_y_asistencias(firmas_pdfs):
     todas_las_fechas = []
     asistencias_por_alumno = defaultdict(lambda: {'dias_empresa': 0, 'dias_aula': 0})
     
+    # OCR de todas las páginas de todos los PDFs repartido en el pool de procesos
+    documentos = {
+        pdf_path: OCRDocument(pdf_path, dpi=300, layout='parte_firma', perfil='documento',
+                              tipos=('parte_firma',))
+        for pdf_path in firmas_pdfs if os.path.exists(pdf_path)
+    }
+    # Páginas repetidas entre PDFs solapados: un solo OCR y un solo conteo
+    duplicadas = indexar_duplicados(list(documentos.values()))
+    if duplicadas:
+        print(f"    {duplicadas} páginas duplicadas entre los PDFs de firmas")
+    ocr_documentos_en_paralelo(list(documentos.values()))
+    
     # Procesar cada PDF
     for idx, pdf_path in enumerate(firmas_pdfs, 1):
         if not os.path.exists(pdf_path):
             print(f"Advertencia: No encontrado {pdf_path}")
             continue
+        if firmas_pdfs.index(pdf_path) < idx - 1:
+            print(f"Advertencia: {os.path.basename(pdf_path)} repetido, se cuenta una sola vez")
+            continue
         
         nombre_pdf = os.path.basename(pdf_path)
         print(f"\n[{idx}/{len(firmas_pdfs)}] Procesando: {nombre_pdf}")
@@ -224,13 +289,16 @@ def calcular_dias_lectivos_y_asistencias(firmas_pdfs):
         # Determinar si es PDF de aula o empresa
         es_aula = 'ParteFirma_30y31' in nombre_pdf or 'aula' in nombre_pdf.lower()
         
+        # Un único pase OCR compartido por todos los extractores
+        documento = documentos[pdf_path]
+        
         # Extraer fechas
-        fechas = extraer_fechas_de_pdf(pdf_path)
+        fechas = extraer_fechas_de_pdf(documento)
         todas_las_fechas.extend(fechas)
         print(f"    {len(fechas)} fechas detectadas")
         
         # Contar días por alumno
-        dias_por_alumno = contar_dias_con_firmas_por_alumno(pdf_path)
+        dias_por_alumno = contar_dias_con_firmas_por_alumno(documento)
         print(f"    {len(dias_por_alumno)} alumnos procesados")
         
         for nombre, dias in dias_por_alumno.items():
@@ -12,6 +12,9 @@ from collections import defaultdict
 import shutil
 import tempfile
 
+from ocr import OCRDocument
+from ocr.nombres import BuscadorAlumnos
+
 def obtener_mes_anterior():
     """
     Obtiene el nombre del mes anterior al actual
@@ -38,24 +41,26 @@ def extraer_datos_curso_pdf(pdf_path):
         tuple: (numero_curso, especialidad)
     """
     try:
-        with pdfplumber.open(pdf_path) as pdf:
-            text = pdf.pages[0].extract_text()
-            
-            # Número de curso
-            numero_curso = "2024/1339"
-            match = re.search(r'Nº de Curso\s+(\d{4}/\d{4})', text)
-            if match:
-                numero_curso = match.group(1)
-            
-            # Especialidad
-            especialidad = "OPERACIONES AUXILIARES DE SERVICIOS ADMINISTRATIVOS Y GENERALES"
-            lines = text.split('\n')
-            for i, line in enumerate(lines):
-                if 'OPERACIONES AUXILIARES' in line:
-                    especialidad = line.strip()
-                    break
-            
-            return numero_curso, especialidad
+        # Primera página: capa de texto o, si está escaneada, OCR
+        text = ''
+        for _, text in OCRDocument(pdf_path, dpi=300, perfil='becas_body').iterar_textos():
+            break
+        
+        # Número de curso
+        numero_curso = "2024/1339"
+        match = re.search(r'Nº de Curso\s+(\d{4}/\d{4})', text)
+        if match:
+            numero_curso = match.group(1)
+        
+        # Especialidad
+        especialidad = "OPERACIONES AUXILIARES DE SERVICIOS ADMINISTRATIVOS Y GENERALES"
+        lines = text.split('\n')
+        for i, line in enumerate(lines):
+            if 'OPERACIONES AUXILIARES' in line:
+                especialidad = line.strip()
+                break
+        
+        return numero_curso, especialidad
     except Exception as e:
         print(f"Error extrayendo datos del curso: {e}")
         return "2024/1339", "OPERACIONES AUXILIARES DE SERVICIOS ADMINISTRATIVOS Y GENERALES"
@@ -227,37 +232,47 @@ def extraer_becas_ayudas_simple(pdf_path):
     
     return ayudas_por_alumno
 
-def extraer_justificantes(pdf_path):
+def extraer_justificantes(documento, alumnos_excel=None):
     """
     Extrae justificantes del PDF
     
     Args:
-        pdf_path: Ruta al PDF de justificantes
+        documento: Ruta al PDF de justificantes u OCRDocument ya creado
+        alumnos_excel: Lista de alumnos del curso (extraer_alumnos_excel); si
+            se indica, solo se cuentan sus nombres y DNI
     
     Returns:
         dict: Diccionario {nombre: cantidad}
     """
     justificantes = defaultdict(int)
+    buscador = BuscadorAlumnos(alumnos_excel) if alumnos_excel else None
     
     try:
-        with pdfplumber.open(pdf_path) as pdf:
-            for page in pdf.pages:
-                text = page.extract_text()
-                if not text:
-                    continue
+        # Capa de texto en los justificantes digitales, OCR en los escaneados;
+        # las páginas en blanco y las de otro tipo se descartan antes del OCR
+        documento = OCRDocument.desde(documento, dpi=300, perfil='justificante_body',
+                                      tipos=('justificante',))
+        for _, text in documento.iterar_textos():
+            if not text:
+                continue
+            
+            if buscador:
+                for nombre in buscador.buscar(text):
+                    justificantes[nombre] += 1
+                continue
+            
+            if 'JUSTIFICANTE' in text or 'prestación servicios' in text:
+                patrones = [
+                    r'(?:trabajadora|paciente|alumno|Doña|Don)\s+(?:Doña|Don)?\s*([A-ZÁÉÍÓÚÑ][a-záéíóúñ]+(?:\s+[A-ZÁÉÍÓÚÑ][a-záéíóúñ]+)+)',
+                    r'([A-Z][A-ZÁÉÍÓÚÑ]+(?:\s+[A-Z][A-ZÁÉÍÓÚÑ]+)+)[,\s]+(?:con|NIE|DNI)'
+                ]
                 
-                if 'JUSTIFICANTE' in text or 'prestación servicios' in text:
-                    patrones = [
-                        r'(?:trabajadora|paciente|alumno|Doña|Don)\s+(?:Doña|Don)?\s*([A-ZÁÉÍÓÚÑ][a-záéíóúñ]+(?:\s+[A-ZÁÉÍÓÚÑ][a-záéíóúñ]+)+)',
-                        r'([A-Z][A-ZÁÉÍÓÚÑ]+(?:\s+[A-Z][A-ZÁÉÍÓÚÑ]+)+)[,\s]+(?:con|NIE|DNI)'
-                    ]
-                    
-                    for patron in patrones:
-                        match = re.search(patron, text, re.IGNORECASE)
-                        if match:
-                            nombre = match.group(1).strip().upper()
-                            justificantes[nombre] += 1
-                            break
+                for patron in patrones:
+                    match = re.search(patron, text, re.IGNORECASE)
+                    if match:
+                        nombre = match.group(1).strip().upper()
+                        justificantes[nombre] += 1
+                        break
     except Exception as e:
         print(f"Error extrayendo justificantes: {e}")
     
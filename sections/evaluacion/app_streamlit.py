@@ -13,7 +13,8 @@ from cierre_mes.procesamiento_datos import (
     extraer_justificantes
 )
 from cierre_mes.generacion_word import construir_observaciones, generar_parte_mensual
-from cierre_mes.utilidades import normalizar_nombre, buscar_coincidencia
+from cierre_mes.utilidades import normalizar_nombre
+from utils.student_resolver import ResolutorAlumnos
 
 def procesar_cierre_mensual(archivos_config):
     print("INICIANDO CIERRE MENSUAL")
@@ -41,16 +42,22 @@ def procesar_cierre_mensual(archivos_config):
         
         alumnos_finales = []
         
+        # Cada fuente se indexa una sola vez para todos los alumnos
+        ayudas_resolutor = ResolutorAlumnos(ayudas_por_alumno)
+        justificantes_resolutor = ResolutorAlumnos(justificantes_por_alumno)
+        asistencias_resolutor = ResolutorAlumnos(asistencias_por_alumno)
+        faltas_resolutor = ResolutorAlumnos(faltas_por_alumno)
+        
         for alumno_excel in alumnos_excel:
             nombre = alumno_excel['nombre_completo']
             dni = alumno_excel['dni']
             
-            ayudas = buscar_coincidencia(nombre, ayudas_por_alumno) or []
-            justificantes = buscar_coincidencia(nombre, justificantes_por_alumno) or 0
-            asistencias = buscar_coincidencia(nombre, asistencias_por_alumno)
+            ayudas = ayudas_resolutor.buscar(nombre, dni=dni) or []
+            justificantes = justificantes_resolutor.buscar(nombre, dni=dni) or 0
+            asistencias = asistencias_resolutor.buscar(nombre, dni=dni)
             dias_empresa = asistencias['dias_empresa'] if asistencias else 0
             dias_aula = asistencias['dias_aula'] if asistencias else 0
-            faltas = buscar_coincidencia(nombre, faltas_por_alumno) or 0
+            faltas = faltas_resolutor.buscar(nombre, dni=dni) or 0
             
             observaciones = construir_observaciones(
                 ayudas=ayudas,
@@ -1,23 +1,38 @@
 """
-VERSION FINAL - Camelot con observaciones corregidas
+VERSION FINAL - Tabla de becas por posición de palabras con observaciones corregidas
 """
 
 import re
 from collections import defaultdict
 from datetime import datetime
-import os
 
-os.environ['TESSDATA_PREFIX'] = r'C:\Program Files\Tesseract-OCR\tessdata'
-POPPLER_PATH = r'C:\Users\Arancha\Downloads\poppler-24.08.0\Library\bin'
+from config.settings import OCR_PREPROCESADO
+from ocr import OCRDocument
+from ocr.cache import obtener_cache
+from ocr.layouts import TABLAS
+from ocr.nombres import BuscadorAlumnos
+from ocr.orientacion import detectar_rotacion
+from ocr.pagina import ocr_paginas
+from ocr.rasterizado import rasterizar_pagina
+from ocr.tablas import filas_tabla
+from utils.student_resolver import ResolutorAlumnos
+from utils.workbook_cache import obtener_libro
 
 
 def extraer_becas_ayudas_tabla(pdf_path, alumnos_excel=None):
     """
-    Extrae becas usando camelot - Lee columnas de la tabla
+    Extrae becas leyendo las columnas de la tabla por la posición de las palabras
+
+    La tabla se lee una vez (todas sus páginas) y sus filas se indexan por DNI
+    y nombre, así que cada alumno se resuelve sin recorrer la tabla.
+
+    Args:
+        pdf_path: Ruta al PDF de becas y ayudas
+        alumnos_excel: Lista de alumnos con 'nombre_completo' y 'dni'
+
+    Returns:
+        dict {nombre_completo: [ayudas]}
     """
-    import camelot
-    import pandas as pd
-    
     if not alumnos_excel:
         print("ERROR: Se necesita lista de alumnos con DNI")
         return {}
@@ -25,27 +40,25 @@ def extraer_becas_ayudas_tabla(pdf_path, alumnos_excel=None):
     ayudas_dict = {}
     
     print("=" * 80)
-    print("EXTRAYENDO BECAS CON CAMELOT")
+    print("EXTRAYENDO BECAS DE LA TABLA")
     print("=" * 80)
     
     try:
         # Extraer tabla
         print("\nExtrayendo tabla del PDF...")
         
-        tables = camelot.read_pdf(
-            pdf_path,
-            pages='1',
-            flavor='stream',
-            table_areas=['50,500,800,100']
-        )
+        paginas = OCRDocument(pdf_path, dpi=300, perfil='becas_body').paginas_ocr
+        filas = filas_tabla(paginas, TABLAS['becas'])
         
-        if len(tables) == 0:
-            print("ERROR: No se encontraron tablas")
+        if not filas:
+            print("ERROR: No se encontraron filas en la tabla")
             return {}
         
-        df = tables[0].df
+        print(f"Tabla: {len(filas)} filas en {len(paginas)} páginas\n")
         
-        print(f"Tabla: {df.shape[0]} filas x {df.shape[1]} columnas\n")
+        indice = ResolutorAlumnos()
+        for fila in filas:
+            indice.agregar(fila['nombre'], fila, dni=fila['id'])
         
         print("="*80)
         print("BUSCANDO ALUMNOS")
@@ -57,51 +70,28 @@ def extraer_becas_ayudas_tabla(pdf_path, alumnos_excel=None):
             nombre = alumno['nombre_completo']
             dni = alumno['dni']
             
-            # Buscar DNI en la tabla
-            fila_encontrada = None
-            
-            for idx in range(len(df)):
-                fila = df.iloc[idx]
-                fila_texto = ' '.join([str(x) for x in fila if pd.notna(x)])
-                
-                if dni in fila_texto:
-                    fila_encontrada = fila
-                    break
+            fila_encontrada = indice.buscar(nombre, dni=dni)
             
             ayudas = []
             
             if fila_encontrada is not None:
                 print(f"\n{nombre} ({dni}):")
                 
-                # Estructura de columnas:
-                # 0: Nº
-                # 1: Apellidos y Nombre
-                # 2: NIF
-                # 3: €/día
-                # 4: Ayuda transporte (X)
-                # 5: Manutención
-                # 6: Alojamiento/Beca (X para Discapacidad)
-                # 7: Ayuda conciliación (X)
-                # 8: Otras (texto "DISCAPACIDAD")
-                
-                # DISCAPACIDAD
-                col_8 = str(fila_encontrada.iloc[8] if len(fila_encontrada) > 8 else '').upper()
-                col_6 = str(fila_encontrada.iloc[6] if len(fila_encontrada) > 6 else '').strip().upper()
+                # Alojamiento/Beca con X u "Otras" = DISCAPACIDAD
+                otras = fila_encontrada.get('otras', '').upper()
+                alojamiento = fila_encontrada.get('alojamiento', '').strip().upper()
                 
-                if 'DISCAPAC' in col_8 or col_6 == 'X':
+                if 'DISCAPAC' in otras or alojamiento == 'X':
                     ayudas.append('Discapacidad')
                     print(f"  -> Discapacidad")
                 else:
-                    # TRANSPORTE (columna 4)
-                    col_4 = str(fila_encontrada.iloc[4] if len(fila_encontrada) > 4 else '').strip().upper()
+                    transporte = fila_encontrada.get('transporte', '').strip().upper()
+                    conciliacion = fila_encontrada.get('conciliacion', '').strip().upper()
                     
-                    # CONCILIACION (columna 7)
-                    col_7 = str(fila_encontrada.iloc[7] if len(fila_encontrada) > 7 else '').strip().upper()
-                    
-                    if col_4 == 'X':
+                    if transporte == 'X':
                         ayudas.append('Transporte')
                     
-                    if col_7 == 'X':
+                    if conciliacion == 'X':
                         ayudas.append('Conciliación')
                     
                     if ayudas:
@@ -120,10 +110,6 @@ def extraer_becas_ayudas_tabla(pdf_path, alumnos_excel=None):
         print(f"Con ayudas: {len([a for a in ayudas_dict.values() if a])}")
         print(f"{'=' * 80}\n")
         
-    except ImportError:
-        print("\nERROR: camelot-py no instalado")
-        print("pip install camelot-py[cv] --break-system-packages")
-        return {}
     except Exception as e:
         print(f"ERROR: {e}")
         import traceback
@@ -136,26 +122,24 @@ extraer_becas_por_filas_imagen = extraer_becas_ayudas_tabla
 
 
 def extraer_alumnos_excel(excel_path):
-    import openpyxl
     alumnos = []
     try:
-        wb = openpyxl.load_workbook(excel_path)
-        ws = wb.active
+        filas = obtener_libro(excel_path).filas(None)
         nombre_col = None
         dni_col = None
-        for row in ws.iter_rows(min_row=1, max_row=10):
-            for cell in row:
-                if cell.value:
-                    val = str(cell.value).lower()
+        for fila in filas[:10]:
+            for columna, valor in enumerate(fila):
+                if valor:
+                    val = str(valor).lower()
                     if 'nombre' in val or 'apellido' in val:
-                        nombre_col = cell.column
+                        nombre_col = columna
                     if 'dni' in val or 'nif' in val:
-                        dni_col = cell.column
-        if not nombre_col or not dni_col:
+                        dni_col = columna
+        if nombre_col is None or dni_col is None:
             return []
-        for row in ws.iter_rows(min_row=2):
-            nombre = row[nombre_col - 1].value
-            dni = row[dni_col - 1].value
+        for fila in filas[1:]:
+            nombre = fila[nombre_col]
+            dni = fila[dni_col]
             if nombre and dni:
                 nombre_str = str(nombre).strip()
                 dni_str = str(dni).strip()
@@ -194,24 +178,72 @@ def calcular_dias_lectivos_y_faltas_corregido(firmas_pdfs, alumnos_excel, dias_a
     return dias_lectivos, faltas_dict, dias_asistidos_dict
 
 
-def extraer_justificantes_mejorado(pdf_path):
-    import pytesseract
-    from pdf2image import convert_from_path
+def _textos_justificantes(documento):
+    """
+    Texto de cada página de un PDF de justificantes
+
+    Las páginas con capa de texto se usan tal cual; las escaneadas se
+    clasifican (las en blanco y las que son sin duda de otro tipo quedan vacías),
+    se enderezan y se pasan por Tesseract en lotes de páginas
+    """
+    from config.settings import OCR_PAGINAS_POR_LOTE
+
+    total = documento.numero_paginas()
+    for inicio in range(1, total + 1, OCR_PAGINAS_POR_LOTE):
+        numeros = list(range(inicio, min(inicio + OCR_PAGINAS_POR_LOTE, total + 1)))
+        # Justificantes digitales: capa de texto sin rasterizar ni OCR
+        textos = {
+            numero: documento.texto_capa(numero) if documento.pagina_relevante(numero) else ''
+            for numero in numeros
+        }
+        escaneadas = [numero for numero in numeros if textos[numero] is None]
+        imagenes = []
+        rotaciones = []
+        for numero in escaneadas:
+            image = rasterizar_pagina(documento.pdf_path, numero, dpi=documento.dpi_bajo or documento.dpi,
+                                      poppler_path=documento.poppler_path)
+            # Heurística sobre miniatura; OSD solo si no está clara
+            rotacion = -detectar_rotacion(image)
+            if rotacion:
+                image = image.rotate(rotacion, expand=True)
+            imagenes.append(image)
+            rotaciones.append(rotacion)
+        if escaneadas:
+            leidos = ocr_paginas(imagenes, documento.pdf_path, escaneadas, documento.dpi, documento.dpi_bajo,
+                                 lang=documento.lang, config=documento.config,
+                                 poppler_path=documento.poppler_path, rotaciones=rotaciones)
+            textos.update((numero, pagina.texto) for numero, pagina in zip(escaneadas, leidos))
+        for numero in numeros:
+            yield textos[numero]
+
+
+def extraer_justificantes_mejorado(pdf_path, alumnos_excel=None):
     justificantes_dict = defaultdict(int)
+    cache = obtener_cache()
+    clave = None
+    # Con la lista del curso solo se cuentan sus alumnos (por nombre o DNI)
+    buscador = BuscadorAlumnos(alumnos_excel) if alumnos_excel else None
     try:
         print("=" * 80)
         print("EXTRAYENDO JUSTIFICANTES")
         print("=" * 80)
-        images = convert_from_path(pdf_path, dpi=300, poppler_path=POPPLER_PATH)
-        for image in images:
-            try:
-                osd = pytesseract.image_to_osd(image)
-                angle = int(re.search(r'Rotate: (\d+)', osd).group(1))
-                if angle != 0:
-                    image = image.rotate(-angle, expand=True)
-            except:
-                pass
-            texto = pytesseract.image_to_string(image, lang='spa', config='--psm 6')
+        documento = OCRDocument(pdf_path, dpi=300, perfil='justificante_body', tipos=('justificante',))
+        if cache:
+            clave = cache.clave_archivo(pdf_path, funcion='justificantes', dpi=300, dpi_bajo=documento.dpi_bajo,
+                                        lang='spa', config=documento.config, capa_texto=True,
+                                        tipos=documento.tipos,
+                                        preprocesado=OCR_PREPROCESADO,
+                                        alumnos=buscador.huella if buscador else None)
+            guardado = cache.obtener(clave)
+            if guardado is not None:
+                print(f"Resultado en caché: {len(guardado)} alumnos con justificantes\n")
+                return guardado
+        for texto in _textos_justificantes(documento):
+            if buscador:
+                for nombre_completo in buscador.buscar(texto):
+                    justificantes_dict[nombre_completo] += 1
+                    print(f"  {nombre_completo}: +1 justificante")
+                continue
             matches = re.finditer(r'([A-ZÁÉÍÓÚÑ]+(?:\s+[A-ZÁÉÍÓÚÑ]+)*)[,\s]+([A-ZÁÉÍÓÚÑ][a-záéíóúñ]+(?:\s+[A-ZÁÉÍÓÚÑ][a-záéíóúñ]+)*)', texto)
             nombres_en_pagina = set()
             for match in matches:
@@ -224,6 +256,8 @@ def extraer_justificantes_mejorado(pdf_path):
                     justificantes_dict[nombre_completo] += 1
                     print(f"  {nombre_completo}: +1 justificante")
         print(f"\nTotal: {len(justificantes_dict)} alumnos con justificantes\n")
+        if cache:
+            cache.guardar(clave, dict(justificantes_dict))
     except Exception as e:
         print(f"Error: {e}")
     return dict(justificantes_dict)
@@ -271,18 +305,28 @@ def obtener_mes_anterior():
 
 
 def extraer_datos_curso_pdf(pdf_path):
-    import pytesseract
-    from pdf2image import convert_from_path
+    cache = obtener_cache()
     try:
-        images = convert_from_path(pdf_path, dpi=300, poppler_path=POPPLER_PATH)
-        for image in images:
-            texto = pytesseract.image_to_string(image, lang='spa', config='--psm 6')
+        documento = OCRDocument(pdf_path, dpi=300, perfil='becas_body')
+        if cache:
+            clave = cache.clave_archivo(pdf_path, funcion='datos_curso', dpi=300, dpi_bajo=documento.dpi_bajo,
+                                        lang='spa', config=documento.config, capa_texto=True,
+                                        preprocesado=OCR_PREPROCESADO)
+            guardado = cache.obtener(clave)
+            if guardado is not None:
+                return tuple(guardado)
+        resultado = ('', '')
+        # Se para en la primera página con datos: el resto no se rasteriza
+        for _, texto in documento.iterar_textos():
             match_curso = re.search(r'N[°º]\s*de\s*Curso[:\s]+(\d{4}/\d+)', texto, re.IGNORECASE)
             numero_curso = match_curso.group(1) if match_curso else ''
             match_esp = re.search(r'OPERACIONES AUXILIARES[^\n]+', texto, re.IGNORECASE)
             especialidad = match_esp.group(0) if match_esp else ''
             if numero_curso or especialidad:
-                return numero_curso, especialidad
-        return '', ''
+                resultado = (numero_curso, especialidad)
+                break
+        if cache:
+            cache.guardar(clave, list(resultado))
+        return resultado
     except:
         return '', ''
\ No newline at end of file
@@ -2,6 +2,7 @@
 Módulo de funciones auxiliares
 Funciones de utilidad general
 """
+from utils.student_resolver import ResolutorAlumnos
 
 def normalizar_nombre(nombre):
     """
@@ -15,14 +16,18 @@ def normalizar_nombre(nombre):
     """
     return ' '.join(nombre.upper().split())
 
-def buscar_coincidencia(nombre_buscar, diccionario):
+def buscar_coincidencia(nombre_buscar, diccionario, dni=None):
     """
     Busca un nombre en un diccionario con coincidencia flexible
     Útil para relacionar datos entre diferentes fuentes
     
+    Indexa el diccionario en cada llamada: para buscar a todos los alumnos
+    en una misma fuente, crear un ResolutorAlumnos una vez y usar buscar()
+    
     Args:
         nombre_buscar: Nombre a buscar
-        diccionario: Diccionario donde buscar
+        diccionario: Diccionario donde buscar (claves: nombres o DNI)
+        dni: DNI del alumno, si se conoce
     
     Returns:
         El valor encontrado o None
@@ -30,33 +35,7 @@ def buscar_coincidencia(nombre_buscar, diccionario):
     if not diccionario:
         return None
     
-    nombre_norm = normalizar_nombre(nombre_buscar)
-    
-    # Extraer apellidos
-    if ',' in nombre_norm:
-        apellidos = nombre_norm.split(',')[0].strip()
-    else:
-        apellidos = nombre_norm.split()[0] if nombre_norm.split() else nombre_norm
-    
-    # Búsqueda exacta
-    for key in diccionario.keys():
-        if normalizar_nombre(key) == nombre_norm:
-            return diccionario[key]
-    
-    # Búsqueda por apellidos
-    for key in diccionario.keys():
-        key_norm = normalizar_nombre(key)
-        
-        if ',' in key_norm:
-            key_apellidos = key_norm.split(',')[0].strip()
-        else:
-            key_apellidos = key_norm.split()[0] if key_norm.split() else key_norm
-        
-        # Comparar apellidos
-        if apellidos in key_norm or key_apellidos in nombre_norm:
-            return diccionario[key]
-    
-    return None
+    return ResolutorAlumnos(diccionario).buscar(nombre_buscar, dni=dni)
 
 def validar_dni(dni):
     """
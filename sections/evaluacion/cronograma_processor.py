@@ -3,11 +3,12 @@ Procesador de Cronograma
 Extrae información de fechas Y MÓDULOS del cronograma
 """
 import pandas as pd
-import io
 import re
 from datetime import datetime
 from typing import Dict, List
 
+from utils.workbook_cache import obtener_libro
+
 
 class CronogramaProcessor:
     """Procesa archivos de cronograma para extraer fechas y módulos"""
@@ -30,7 +31,7 @@ class CronogramaProcessor:
         """
         try:
 
-            self.df = pd.read_excel(io.BytesIO(file_bytes), header=None)
+            self.df = obtener_libro(file_bytes).hoja(0, header=None)
             
             self._extraer_fechas()
             
@@ -80,7 +81,7 @@ class CronogramaProcessor:
             file_bytes: Bytes del archivo Excel
         """
         try:
-            df = pd.read_excel(io.BytesIO(file_bytes), sheet_name='Calculos_UF', header=None)
+            df = obtener_libro(file_bytes).hoja('Calculos_UF', header=None)
             
             modulos = []
             
@@ -8,10 +8,26 @@ from typing import Dict, List, Optional
 import io
 import re
 
+from utils.layout_cache import obtener_cache_disposiciones
+from utils.workbook_cache import obtener_libro
+
+
+def _str(region):
+    """Operaciones de cadena de pandas (.str) sobre las celdas de una matriz de texto"""
+    return pd.Series(region.ravel(), dtype=object).str
+
+
+def _matriz(serie, forma):
+    """Resultado de _str() con la forma de la región original"""
+    return serie.to_numpy().reshape(forma)
+
 
 class ExcelProcessorReal:
     """Procesa archivos Excel de asistencias - 100% Dinámico"""
     
+    # Bloque de datos administrativos (curso, expediente, centro...): filas y columnas
+    REGION_INFO = (15, 10)
+    
     def __init__(self):
         self.archivo_excel = None
         self.df_asistencias = None
@@ -27,6 +43,12 @@ class ExcelProcessorReal:
         self.provincia = None
         self.alumnos_data = []
         self.modulos_config = []
+        self._valores = None
+        self._texto = None
+        self._minusculas = None
+        self._es_texto = None
+        self._numeros = None
+        self._cabecera_alumnos = None
         
     def cargar_asistencias(self, file_bytes: bytes) -> Dict:
         """
@@ -39,7 +61,7 @@ class ExcelProcessorReal:
             Dict con datos procesados
         """
         try:
-            self.archivo_excel = pd.ExcelFile(io.BytesIO(file_bytes))
+            self.archivo_excel = obtener_libro(file_bytes)
             
             # Buscar la pestaña de ASISTENCIA
             pestaña_asistencia = None
@@ -52,16 +74,24 @@ class ExcelProcessorReal:
                 pestaña_asistencia = self.archivo_excel.sheet_names[0]
             
             # Cargar datos
-            self.df_asistencias = pd.read_excel(
-                self.archivo_excel, 
-                sheet_name=pestaña_asistencia, 
-                header=None
-            )
+            self.df_asistencias = self.archivo_excel.hoja(pestaña_asistencia, header=None)
             
-            # Extraer información
-            self._extraer_info_administrativa()
-            self._detectar_modulos()
-            self._extraer_alumnos()
+            # Con la disposición de un Excel con la misma estructura solo se leen los alumnos
+            cache = obtener_cache_disposiciones()
+            disposicion = cache.obtener('asistencias', self.archivo_excel, pestaña_asistencia) if cache else None
+            if not (disposicion and self._aplicar_disposicion(disposicion)):
+                self._preparar_matriz()
+                
+                # Extraer información
+                self._extraer_info_administrativa()
+                self._detectar_modulos()
+                self._extraer_alumnos()
+                
+                if cache and self.alumnos_data:
+                    fila_inicio = self._cabecera_alumnos[0]
+                    # La cabecera incluye las filas 7 y 10, de donde salen las horas de los módulos
+                    cache.guardar('asistencias', self.archivo_excel, pestaña_asistencia,
+                                  max(fila_inicio, 11), self._disposicion())
             estadisticas = self._calcular_estadisticas()
             
             return {
@@ -83,58 +113,137 @@ class ExcelProcessorReal:
         except Exception as e:
             raise Exception(f"Error al procesar asistencias: {str(e)}")
     
+    def _preparar_matriz(self, desde=0, columnas=None, cabecera=None):
+        """
+        Matrices de la hoja para buscar con operaciones vectorizadas en lugar
+        de recorrer celda a celda con df.iloc
+
+        _texto: celdas de texto sin espacios en los extremos ('' en las demás)
+        _minusculas: _texto en minúsculas
+        _es_texto: máscara de las celdas de texto
+        _numeros: valor numérico de cada celda (también '12,5' escrito como texto) o NaN
+
+        Solo las celdas de texto pasan por operaciones de cadena: los números y
+        las celdas vacías, la mayoría de la hoja, se resuelven con máscaras.
+        _texto y _minusculas son matrices de objetos: con cadenas de ancho fijo
+        una sola celda larga multiplicaría la memoria de toda la hoja.
+
+        Args:
+            desde: Primera fila a preparar (las anteriores quedan vacías)
+            columnas: Columnas a preparar (por defecto, todas)
+            cabecera: (filas, columnas) del principio de la hoja que se preparan
+                además de las anteriores
+        """
+        df = self.df_asistencias
+        self._valores = df.to_numpy(dtype=object)
+        forma = self._valores.shape
+        if columnas is None:
+            columnas = range(forma[1])
+        self._es_texto = np.zeros(forma, dtype=bool)
+        self._numeros = np.full(forma, np.nan)
+        
+        bloques = [(slice(desde, None), columnas)]
+        if cabecera:
+            bloques.append((slice(0, cabecera[0]), range(cabecera[1])))
+        for filas, columnas in bloques:
+            columnas = np.array(sorted({c for c in columnas if c < forma[1]}), dtype=int)
+            
+            # Las columnas numéricas no tienen texto; el tipo de cada celda solo
+            # se mira en las columnas mixtas (cabeceras, nombres, 'EXENTO'...)
+            numericas = np.array([
+                pd.api.types.is_numeric_dtype(tipo) and not pd.api.types.is_bool_dtype(tipo)
+                for tipo in df.dtypes.iloc[columnas]
+            ], dtype=bool)
+            mixtas = columnas[~numericas]
+            numericas = columnas[numericas]
+            if len(numericas):
+                self._numeros[filas, numericas] = df.iloc[filas, numericas].to_numpy(dtype=float)
+            if len(mixtas):
+                bloque = self._valores[filas, mixtas]
+                self._es_texto[filas, mixtas] = np.frompyfunc(lambda v: isinstance(v, str), 1, 1)(bloque).astype(bool)
+                es_numero = np.frompyfunc(
+                    lambda v: isinstance(v, (int, float, np.number)) and not isinstance(v, bool), 1, 1
+                )(bloque).astype(bool)
+                self._numeros[filas, mixtas] = np.where(es_numero, bloque, np.nan).astype(float)
+        
+        filas, columnas = np.nonzero(self._es_texto)
+        textos = [str(v).strip() for v in self._valores[filas, columnas]]
+        self._texto = np.full(self._valores.shape, '', dtype=object)
+        self._minusculas = np.full(self._valores.shape, '', dtype=object)
+        self._texto[filas, columnas] = textos
+        self._minusculas[filas, columnas] = [texto.lower() for texto in textos]
+        # El texto numérico ('12,5') también cuenta como número
+        self._numeros[filas, columnas] = pd.to_numeric(
+            pd.Series(textos, dtype=object).str.replace(',', '.', regex=False), errors='coerce'
+        ).to_numpy(dtype=float)
+    
+    def _asegurar_matriz(self):
+        """Prepara las matrices si df_asistencias se asignó sin cargar_asistencias"""
+        if self._texto is None or self._texto.shape != self.df_asistencias.shape:
+            self._preparar_matriz()
+    
+    def _contiene(self, *textos, filas=slice(None), columnas=slice(None)):
+        """Máscara de las celdas (en minúsculas) que contienen todos los textos"""
+        region = self._minusculas[filas, columnas]
+        mascara = np.ones(region.shape, dtype=bool)
+        for texto in textos:
+            mascara &= _matriz(_str(region).contains(texto, regex=False), region.shape).astype(bool)
+        return mascara
+    
+    def _cumple(self, patron, filas=slice(None), columnas=slice(None)):
+        """Máscara de las celdas cuyo texto cumple una expresión regular"""
+        region = self._texto[filas, columnas]
+        return _matriz(_str(region).contains(patron, regex=True), region.shape).astype(bool)
+    
     def _extraer_info_administrativa(self):
         """Extrae información administrativa del archivo"""
-        df = self.df_asistencias
+        self._asegurar_matriz()
+        
+        # Buscar en las primeras 15 filas y 10 columnas; el valor es la celda de la derecha
+        region = (slice(0, self.REGION_INFO[0]), slice(0, self.REGION_INFO[1]))
+        n_filas, n_columnas = self._texto[region].shape
+        vecinas = np.hstack([self._valores, np.full((self._valores.shape[0], 1), None)])[:n_filas, 1:n_columnas + 1]
+        siguiente = np.array(
+            [['' if pd.isna(v) else str(v).strip() for v in fila] for fila in vecinas], dtype=object
+        ).reshape(n_filas, n_columnas)
+        con_valor = siguiente != ''
+        
+        def primero(mascara):
+            posiciones = np.argwhere(mascara & con_valor)
+            return siguiente[tuple(posiciones[0])] if len(posiciones) else None
+        
+        # Curso
+        if not self.curso_codigo:
+            self.curso_codigo = primero(self._contiene('curso', ':', filas=region[0], columnas=region[1]))
+        
+        # Nombre del curso
+        if not self.curso_nombre:
+            etiqueta = (self._contiene('nombre', filas=region[0], columnas=region[1])
+                        | self._contiene('certificado profesional', filas=region[0], columnas=region[1]))
+            valor = primero(etiqueta & (_matriz(_str(siguiente).len(), siguiente.shape) > 10))
+            if valor:
+                match = re.search(r'\(([A-Z]{4}\d{4})\)', valor)
+                if match:
+                    self.codigo_certificado = match.group(1)
+                    self.curso_nombre = valor.replace(f'({self.codigo_certificado})', '').strip()
+                else:
+                    self.curso_nombre = valor
+        
+        # Expediente
+        if not self.numero_expediente:
+            self.numero_expediente = primero(self._contiene('expediente', filas=region[0], columnas=region[1]))
+        
+        # Centro formativo
+        if not self.centro_formativo:
+            self.centro_formativo = primero(self._contiene('centro', 'formativ', filas=region[0], columnas=region[1]))
         
-        # Buscar en las primeras 15 filas
-        for i in range(min(15, df.shape[0])):
-            for col in range(min(10, df.shape[1])):
-                val = str(df.iloc[i, col]).lower() if pd.notna(df.iloc[i, col]) else ''
-                
-                if not val or val == 'nan':
-                    continue
-                
-                valor_siguiente = None
-                if col + 1 < df.shape[1]:
-                    valor_siguiente = df.iloc[i, col + 1]
-                    if pd.notna(valor_siguiente):
-                        valor_siguiente = str(valor_siguiente).strip()
-                
-                # Curso
-                if 'curso' in val and ':' in val and not self.curso_codigo:
-                    if valor_siguiente:
-                        self.curso_codigo = valor_siguiente
-                
-                # Nombre del curso
-                if ('nombre' in val or 'certificado profesional' in val) and not self.curso_nombre:
-                    if valor_siguiente and len(valor_siguiente) > 10:
-                        match = re.search(r'\(([A-Z]{4}\d{4})\)', valor_siguiente)
-                        if match:
-                            self.codigo_certificado = match.group(1)
-                            self.curso_nombre = valor_siguiente.replace(f'({self.codigo_certificado})', '').strip()
-                        else:
-                            self.curso_nombre = valor_siguiente
-                
-                # Expediente
-                if 'expediente' in val and not self.numero_expediente:
-                    if valor_siguiente:
-                        self.numero_expediente = valor_siguiente
-                
-                # Centro formativo
-                if 'centro' in val and 'formativ' in val and not self.centro_formativo:
-                    if valor_siguiente:
-                        self.centro_formativo = valor_siguiente
-                
-                # Dirección
-                if 'direcci' in val and not self.direccion:
-                    if valor_siguiente:
-                        self.direccion = valor_siguiente
-                
-                # Localidad
-                if 'localidad' in val and not self.localidad:
-                    if valor_siguiente:
-                        self.localidad = valor_siguiente
+        # Dirección
+        if not self.direccion:
+            self.direccion = primero(self._contiene('direcci', filas=region[0], columnas=region[1]))
+        
+        # Localidad
+        if not self.localidad:
+            self.localidad = primero(self._contiene('localidad', filas=region[0], columnas=region[1]))
         
         # Valores por defecto
         if not self.numero_expediente and self.curso_codigo:
@@ -162,84 +271,56 @@ class ExcelProcessorReal:
     
     def _detectar_modulos(self):
         """Detecta módulos automáticamente"""
-        df = self.df_asistencias
+        self._asegurar_matriz()
+        n_filas, n_columnas = self._texto.shape
         self.modulos_config = []
         
         # Buscar fila de módulos (contiene códigos MF)
-        fila_modulos = None
-        for i in range(min(30, df.shape[0])):
-            for col in range(df.shape[1]):
-                val = str(df.iloc[i, col]) if pd.notna(df.iloc[i, col]) else ''
-                if re.search(r'MF\d{4}_\d', val):
-                    fila_modulos = i
-                    break
-            if fila_modulos:
-                break
+        filas_mf = np.flatnonzero(self._cumple(r'MF\d{4}_\d', filas=slice(0, 30)).any(axis=1))
+        fila_modulos = int(filas_mf[0]) if len(filas_mf) else 5
+        if fila_modulos >= n_filas:
+            raise Exception("No se detectaron módulos en el archivo")
         
-        if fila_modulos is None:
-            fila_modulos = 5
+        codigos = pd.Series(self._texto[fila_modulos]).str.extract(r'(MF\d{4}_\d)')[0]
+        columnas_modulo = np.flatnonzero(codigos.notna().to_numpy())
+        
+        # Columnas con 'total asistencia' en las 4 filas bajo la de módulos
+        filas_enc = slice(fila_modulos + 1, fila_modulos + 5)
+        columnas_total = np.flatnonzero(self._contiene('total', 'asistencia', filas=filas_enc).any(axis=0))
+        
+        # Horas totales en las filas 7 y 10 (H TOTAL TEORIA): números enteros entre 30 y 500
+        filas_horas = [f for f in (7, 10) if f < n_filas]
+        horas = self._numeros[filas_horas]
+        candidatas = (
+            ~self._es_texto[filas_horas]
+            & (horas > 30) & (horas < 500)
+            # Las columnas de asistencia tienen decimales
+            & (horas == np.floor(horas))
+        )
+        columnas_horas = np.flatnonzero(candidatas.any(axis=0))
         
-        # Detectar módulos
-        for col in range(df.shape[1]):
-            val = str(df.iloc[fila_modulos, col]) if pd.notna(df.iloc[fila_modulos, col]) else ''
-            
-            match = re.search(r'MF\d{4}_\d', val)
-            if not match:
-                continue
-            
-            codigo = match.group()
+        for col in columnas_modulo:
+            codigo = codigos[col]
+            val = self._texto[fila_modulos, col]
             
             # Extraer nombre
             nombre = ''
             if ':' in val:
-                partes = val.split(':', 1)
-                if len(partes) > 1:
-                    nombre = partes[1].split('\n')[0].strip()
-                    nombre = re.sub(r'Fechas:.*$', '', nombre).strip()
-            
-            # Buscar columna de asistencia
-            col_asistencia = None
-            for offset in range(1, 20):
-                if col + offset >= df.shape[1]:
-                    break
-                
-                for fila_enc in range(fila_modulos + 1, min(fila_modulos + 5, df.shape[0])):
-                    val_enc = str(df.iloc[fila_enc, col + offset]).lower() if pd.notna(df.iloc[fila_enc, col + offset]) else ''
-                    if 'total' in val_enc and 'asistencia' in val_enc:
-                        col_asistencia = col + offset
-                        break
-                
-                if col_asistencia:
-                    break
-            
-            # Buscar horas totales en la fila 7 (H TOTAL TEORIA)
-            horas_totales = 0
-            
-            # Primero buscar en las columnas cercanas al módulo
-            for offset in range(-2, 8):
-                if not (0 <= col + offset < df.shape[1]):
-                    continue
-                
-                # Buscar específicamente en fila 7 y 10 donde suelen estar las horas
-                for fila_busq in [7, 10]:
-                    if fila_busq < df.shape[0]:
-                        val_horas = df.iloc[fila_busq, col + offset]
-                        if pd.notna(val_horas) and isinstance(val_horas, (int, float)):
-                            if 30 < val_horas < 500:
-                                # Verificar que no sea una columna de asistencia (que tiene decimales)
-                                if isinstance(val_horas, int) or val_horas == int(val_horas):
-                                    horas_totales = int(val_horas)
-                                    break
-                
-                if horas_totales > 0:
-                    break
+                nombre = val.split(':', 1)[1].split('\n')[0].strip()
+                nombre = re.sub(r'Fechas:.*$', '', nombre).strip()
             
-            # Si no encuentra, usar valor por defecto basado en el código
-            if horas_totales == 0:
-                horas_totales = 100
-            
-            if not col_asistencia:
+            # Columna de asistencia: la primera 'total asistencia' a menos de 20 columnas
+            siguiente = columnas_total[np.searchsorted(columnas_total, col, side='right'):]
+            if not len(siguiente) or siguiente[0] >= col + 20:
                 continue
+            col_asistencia = int(siguiente[0])
+            
+            # Horas en la primera columna candidata cercana al módulo (fila 7 antes que 10)
+            horas_totales = 100
+            cercanas = columnas_horas[(columnas_horas >= col - 2) & (columnas_horas < col + 8)]
+            if len(cercanas):
+                fila = int(np.argmax(candidatas[:, cercanas[0]]))
+                horas_totales = int(horas[fila, cercanas[0]])
             
             self.modulos_config.append({
                 'codigo': codigo,
@@ -253,73 +334,131 @@ class ExcelProcessorReal:
         if not self.modulos_config:
             raise Exception("No se detectaron módulos en el archivo")
     
-    def _extraer_alumnos(self):
-        """Extrae datos de alumnos"""
-        df = self.df_asistencias
-        self.alumnos_data = []
+    def _aplicar_disposicion(self, disposicion):
+        """
+        Extrae los alumnos con una disposición guardada, sin detectar cabeceras ni módulos
         
-        if not self.modulos_config:
-            raise Exception("No se detectaron módulos")
+        La disposición solo guarda la estructura (módulos y cabecera de los
+        alumnos): los datos administrativos se leen siempre de esta hoja.
+        
+        Args:
+            disposicion: dict de _disposicion() de un Excel con la misma huella
+            
+        Returns:
+            True si la disposición valida en esta hoja (columnas dentro de la
+            hoja y al menos un alumno); si no, no cambia nada
+        """
+        try:
+            fila_inicio, col_alumno, col_dni = (int(x) for x in disposicion['cabecera_alumnos'])
+            modulos = [dict(m) for m in disposicion['modulos']]
+            columnas = [int(m['col_horas_asistidas']) for m in modulos]
+        except (KeyError, TypeError, ValueError):
+            return False
+        
+        if not modulos or max(columnas + [col_alumno]) >= self.df_asistencias.shape[1]:
+            return False
+        
+        self._preparar_matriz(desde=fila_inicio, columnas=[col_alumno, col_dni, *columnas],
+                              cabecera=self.REGION_INFO)
+        self.modulos_config = modulos
+        self._extraer_alumnos(cabecera=(fila_inicio, col_alumno, col_dni))
+        if not self.alumnos_data:
+            self.modulos_config = []
+            self._texto = None
+            return False
+        
+        self._extraer_info_administrativa()
+        return True
+    
+    def _disposicion(self):
+        """Estructura detectada en la hoja (serializable en JSON) para la caché"""
+        return {
+            'modulos': self.modulos_config,
+            'cabecera_alumnos': list(self._cabecera_alumnos)
+        }
+    
+    def _detectar_cabecera_alumnos(self):
+        """
+        Busca la cabecera 'alumno' de la tabla de alumnos
         
-        # Buscar fila de inicio de alumnos
+        Returns:
+            (fila de inicio de los alumnos, columna del nombre, columna del DNI)
+        """
         fila_inicio = 10
         col_alumno = 1
         col_dni = 2
         
-        for i in range(min(30, df.shape[0])):
-            for col in range(min(10, df.shape[1])):
-                val = str(df.iloc[i, col]).lower() if pd.notna(df.iloc[i, col]) else ''
-                if val == 'alumno':
-                    col_alumno = col
-                    fila_inicio = i + 1
-                    
-                    for c in range(col, min(col + 5, df.shape[1])):
-                        val_dni = str(df.iloc[i, c]).lower() if pd.notna(df.iloc[i, c]) else ''
-                        if 'dni' in val_dni or 'nie' in val_dni:
-                            col_dni = c
-                            break
-                    break
-            if col_alumno != 1:
-                break
+        cabeceras = np.argwhere(self._minusculas[:30, :10] == 'alumno')
+        if len(cabeceras):
+            fila, col_alumno = (int(x) for x in cabeceras[0])
+            fila_inicio = fila + 1
+            columnas_dni = np.flatnonzero(
+                self._contiene('dni', filas=fila, columnas=slice(col_alumno, col_alumno + 5))
+                | self._contiene('nie', filas=fila, columnas=slice(col_alumno, col_alumno + 5))
+            )
+            if len(columnas_dni):
+                col_dni = col_alumno + int(columnas_dni[0])
         
-        # Extraer alumnos
-        for i in range(fila_inicio, df.shape[0]):
-            nombre = df.iloc[i, col_alumno] if col_alumno < df.shape[1] else None
-            dni = df.iloc[i, col_dni] if col_dni < df.shape[1] else None
-            
-            if not pd.notna(nombre) or not isinstance(nombre, str) or len(nombre.strip()) < 3:
-                continue
-            
-            if any(palabra in str(nombre).lower() for palabra in [
-                'total', 'media', 'tutor', 'profesor', 'firma'
-            ]):
-                continue
-            
+        return fila_inicio, col_alumno, col_dni
+    
+    def _extraer_alumnos(self, cabecera=None):
+        """
+        Extrae datos de alumnos
+        
+        Args:
+            cabecera: (fila de inicio, columna del nombre, columna del DNI) ya
+                conocida; si se omite, se detecta
+        """
+        self._asegurar_matriz()
+        n_filas, n_columnas = self._texto.shape
+        self.alumnos_data = []
+        
+        if not self.modulos_config:
+            raise Exception("No se detectaron módulos")
+        
+        fila_inicio, col_alumno, col_dni = cabecera or self._detectar_cabecera_alumnos()
+        self._cabecera_alumnos = (fila_inicio, col_alumno, col_dni)
+        
+        if col_alumno >= n_columnas or fila_inicio >= n_filas:
+            return self.alumnos_data
+        
+        # Filas de alumnos: nombre de texto, de al menos 3 caracteres y que no sea un pie
+        filas = slice(fila_inicio, n_filas)
+        nombres = self._texto[filas, col_alumno]
+        validas = self._es_texto[filas, col_alumno] & (_str(nombres).len().to_numpy() >= 3)
+        minusculas = _str(self._minusculas[filas, col_alumno])
+        for palabra in ['total', 'media', 'tutor', 'profesor', 'firma']:
+            validas &= ~minusculas.contains(palabra, regex=False).to_numpy(dtype=bool)
+        indices = np.flatnonzero(validas) + fila_inicio
+        
+        dnis = ['N/A'] * len(indices)
+        if col_dni < n_columnas:
+            dnis = ['N/A' if pd.isna(v) else str(v).strip() for v in self._valores[indices, col_dni]]
+        
+        # Horas asistidas de todos los alumnos y módulos a la vez
+        columnas = [m['col_horas_asistidas'] for m in self.modulos_config]
+        horas = self._numeros[np.ix_(indices, columnas)]
+        exentos = np.zeros(horas.shape, dtype=bool)
+        minusculas = self._minusculas[np.ix_(indices, columnas)]
+        for palabra in ['exento', 'convalidado', 'convalida']:
+            exentos |= _matriz(_str(minusculas).contains(palabra, regex=False), minusculas.shape).astype(bool)
+        vacias = np.isnan(horas)
+        horas, exentos, vacias = horas.tolist(), exentos.tolist(), vacias.tolist()
+        nombres = self._texto[indices, col_alumno].tolist()
+        
+        for posicion, nombre in enumerate(nombres):
             alumno = {
-                'nombre': str(nombre).strip(),
-                'dni': str(dni).strip() if pd.notna(dni) else 'N/A',
+                'nombre': nombre,
+                'dni': dnis[posicion],
                 'modulos': []
             }
             
-            for modulo_cfg in self.modulos_config:
-                col_horas = modulo_cfg['col_horas_asistidas']
-                horas_valor = df.iloc[i, col_horas] if col_horas < df.shape[1] else None
+            for indice_modulo, modulo_cfg in enumerate(self.modulos_config):
                 horas_asistidas = 0
-                
-                if pd.notna(horas_valor):
-                    if isinstance(horas_valor, (int, float)):
-                        horas_asistidas = float(horas_valor)
-                    elif isinstance(horas_valor, str):
-                        horas_lower = horas_valor.lower().strip()
-                        if any(palabra in horas_lower for palabra in [
-                            'exento', 'convalidado', 'convalida'
-                        ]):
-                            horas_asistidas = modulo_cfg['horas_totales']
-                        else:
-                            try:
-                                horas_asistidas = float(horas_valor.replace(',', '.'))
-                            except:
-                                horas_asistidas = 0
+                if exentos[posicion][indice_modulo]:
+                    horas_asistidas = modulo_cfg['horas_totales']
+                elif not vacias[posicion][indice_modulo]:
+                    horas_asistidas = horas[posicion][indice_modulo]
                 
                 modulo_alumno = {
                     'codigo': modulo_cfg['codigo'],
@@ -3,9 +3,10 @@ Procesador de Excel para extraer datos de alumnos
 Compatible con word_generator_grupal.py
 """
 
-import openpyxl
 import re
 
+from utils.workbook_cache import obtener_libro
+
 
 class ExcelProcessor:
     """Procesa el Excel y extrae datos para el acta"""
@@ -17,11 +18,11 @@ class ExcelProcessor:
         """Carga datos desde el Excel"""
         print("   Leyendo hojas del Excel...")
         
-        wb = openpyxl.load_workbook(self.excel_path)
-        ws_resumen = wb['RESUMEN']
-        ws_asistencia = wb['ASISTENCIA']
-        curso_codigo = ws_asistencia['C1'].value
-        curso_nombre_completo = ws_asistencia['C2'].value
+        libro = obtener_libro(self.excel_path)
+        filas_resumen = libro.filas('RESUMEN')
+        filas_asistencia = libro.filas('ASISTENCIA')
+        curso_codigo = self._valor(filas_asistencia, 0, 2)
+        curso_nombre_completo = self._valor(filas_asistencia, 1, 2)
         
         import re
         curso_nombre = re.sub(r'\s*\([^)]*\)', '', curso_nombre_completo).strip()
@@ -32,7 +33,7 @@ class ExcelProcessor:
         print(f"   Certificado: {codigo_certificado}")
         print(f"   Nombre limpio: {curso_nombre}")
         
-        headers = [cell.value for cell in ws_resumen[1]]
+        headers = list(filas_resumen[0]) if filas_resumen else []
         nivel = '1'
         modulos_info = []
         for i, header in enumerate(headers):
@@ -64,9 +65,7 @@ class ExcelProcessor:
                 nivel = match_nivel.group(1)
                 print(f"   Nivel del curso (extraído de {primer_modulo}): {nivel}")
         
-        alumnos = self._cargar_alumnos(ws_resumen, modulos_info)
-        
-        wb.close()
+        alumnos = self._cargar_alumnos(filas_resumen, modulos_info)
         
         return {
             'curso_codigo': curso_codigo,
@@ -80,6 +79,13 @@ class ExcelProcessor:
             'alumnos': alumnos
         }
     
+    @staticmethod
+    def _valor(filas, fila, columna):
+        """Valor de una celda (índices desde 0) o None si está fuera del rango usado"""
+        if fila < len(filas) and columna < len(filas[fila]):
+            return filas[fila][columna]
+        return None
+    
     def _get_denominacion_modulo(self, codigo_modulo: str) -> str:
         """Obtiene la denominación completa del módulo"""
         denominaciones = {
@@ -89,27 +95,27 @@ class ExcelProcessor:
         }
         return denominaciones.get(codigo_modulo, '')
     
-    def _cargar_alumnos(self, ws_resumen, modulos_info):
-        """Carga información de alumnos"""
+    def _cargar_alumnos(self, filas_resumen, modulos_info):
+        """Carga información de alumnos de las filas de RESUMEN"""
         print("   Procesando alumnos...")
         
         alumnos = []
         
-        for row_idx in range(2, ws_resumen.max_row + 1):
-            row = list(ws_resumen[row_idx])
+        for indice in range(1, len(filas_resumen)):
+            nombre = self._valor(filas_resumen, indice, 1)
             
-            if not row[1].value:
+            if not nombre:
                 continue
             
             alumno = {
-                'dni': row[2].value or '',
-                'nombre': row[1].value or '',
-                'asistencia': row[5].value,
+                'dni': self._valor(filas_resumen, indice, 2) or '',
+                'nombre': nombre,
+                'asistencia': self._valor(filas_resumen, indice, 5),
                 'modulos': []
             }
             
             for mod_info in modulos_info:
-                valor = row[mod_info['columna']].value
+                valor = self._valor(filas_resumen, indice, mod_info['columna'])
                 nota, tipo = self._extraer_nota(valor)
                 
                 alumno['modulos'].append({
@@ -6,10 +6,14 @@ VERSIÓN FINAL - Búsqueda dinámica sin posiciones fijas
 
 import re
 import pandas as pd
-import pdfplumber
 from datetime import datetime
 from typing import Dict, List, Optional
 
+from ocr import extraer_texto_hibrido
+from utils.layout_cache import obtener_cache_disposiciones
+from utils.sheet_index import IndiceHoja
+from utils.workbook_cache import obtener_libro
+
 
 class CertificacionesOcupadosProcessor:
     """Procesa PDF y Excel para generar datos de certificaciones"""
@@ -44,10 +48,9 @@ class CertificacionesOcupadosProcessor:
         """
         print("Extrayendo datos del PDF...")
         
-        with pdfplumber.open(self.pdf_path) as pdf:
-            texto_completo = ""
-            for page in pdf.pages:
-                texto_completo += page.extract_text() + "\n"
+        texto_completo = ""
+        for texto_pagina in extraer_texto_hibrido(self.pdf_path):
+            texto_completo += texto_pagina + "\n"
 
         expediente_match = re.search(r'Resumen comunicación\s+([^\n]+)', texto_completo)
         if expediente_match:
@@ -141,30 +144,78 @@ class CertificacionesOcupadosProcessor:
         
         return participantes
     
-    def _buscar_columna_puntuacion(self, df: pd.DataFrame, fila_inicio: int, rango_filas: int = 10) -> Optional[int]:
+    def _buscar_columna_puntuacion(self, indice: IndiceHoja, fila_inicio: int, rango_filas: int = 10) -> Optional[int]:
         """
         Busca dinámicamente la columna que contiene 'PUNTUACIÓN FINAL' o 'DEL MÓDULO'
         
         Args:
-            df: DataFrame del Excel
+            indice: Índice de la hoja del Excel
             fila_inicio: Fila desde donde empezar a buscar
             rango_filas: Cuántas filas buscar
             
         Returns:
             Índice de la columna o None
         """
-        for offset in range(rango_filas):
-            fila = fila_inicio + offset
-            if fila >= len(df):
+        posicion = indice.primera('PUNTUACIÓN FINAL', 'DEL MÓDULO',
+                                  filas=range(fila_inicio, fila_inicio + rango_filas))
+        if posicion:
+            print(f"  Columna de puntuación encontrada: {posicion[1]} (fila {posicion[0]})")
+            return posicion[1]
+        
+        return None
+    
+    def _nota_en_columna(self, df: pd.DataFrame, indice: IndiceHoja, alumno_fila: int, columna: int):
+        """
+        Busca la nota (X.X) de un alumno en la columna de puntuación y su estado APTO/NO APTO
+        
+        Args:
+            df: Hoja del Excel
+            indice: Índice de la hoja
+            alumno_fila: Fila del DNI del alumno
+            columna: Columna de PUNTUACIÓN FINAL
+            
+        Returns:
+            (nota, estado) o (None, None) si no hay nota en las 24 filas siguientes
+        """
+        nota_final = None
+        estado = None
+        
+        for offset in range(1, 25):
+            fila_buscar = alumno_fila + offset
+            if fila_buscar >= len(df):
                 break
             
-            for col in range(len(df.columns)):
-                celda = str(df.iloc[fila, col])
-                if 'PUNTUACIÓN FINAL' in celda or 'DEL MÓDULO' in celda:
-                    print(f"  Columna de puntuación encontrada: {col} (fila {fila})")
-                    return col
+            celda = df.iloc[fila_buscar, columna]
+            
+            if pd.notna(celda):
+                celda_str = str(celda).strip()
+                
+                # Buscar patrón (X.X) o (X)
+                match_puntuacion = re.search(r'\((\d+\.?\d*)\)', celda_str)
+                
+                if match_puntuacion:
+                    nota_final = float(match_puntuacion.group(1))
+                    print(f"    Fila {fila_buscar}: '{celda_str}' -> Nota: {nota_final}")
+                    
+                    # Verificar estado APTO/NO APTO en filas y columnas cercanas
+                    filas_check = range(max(0, fila_buscar - 3), fila_buscar + 4)
+                    columnas_check = range(max(0, columna - 3), columna + 4)
+                    filas_no_apto = {f for f, _ in indice.buscar('NO APTO', filas_check, columnas_check)}
+                    filas_apto = {f for f, _ in indice.buscar('APTO', filas_check, columnas_check)}
+                    for check_fila in filas_check:
+                        if check_fila in filas_no_apto:
+                            estado = 'NO APTO'
+                        elif check_fila in filas_apto:
+                            estado = 'APTO'
+                        if estado:
+                            break
+                    
+                    if not estado:
+                        estado = 'APTO'
+                    
+                    break
         
-        return None
+        return nota_final, estado
     
     def extraer_calificaciones_excel(self) -> Dict[str, str]:
         """
@@ -176,7 +227,19 @@ class CertificacionesOcupadosProcessor:
         """
         print("\nExtrayendo calificaciones del Excel...")
 
-        df = pd.read_excel(self.excel_path, sheet_name=0, header=None)
+        libro = obtener_libro(self.excel_path)
+        hoja = libro.sheet_names[0]
+        df = libro.hoja(hoja, header=None)
+        indice = libro.indice(hoja)
+        
+        # Columna de puntuación de un Excel anterior con la misma cabecera
+        cache = obtener_cache_disposiciones()
+        disposicion = cache.obtener('certificaciones', libro, hoja) if cache else None
+        columna_guardada = disposicion.get('columna_puntuacion') if isinstance(disposicion, dict) else None
+        if not isinstance(columna_guardada, int) or columna_guardada >= df.shape[1]:
+            columna_guardada = None
+        columnas_detectadas = set()
+        filas_alumnos = []
         
         calificaciones = {}
 
@@ -184,89 +247,54 @@ class CertificacionesOcupadosProcessor:
             dni = alumno['dni']
 
             # Buscar la fila donde aparece el DNI del alumno
-            alumno_fila = None
-            for idx, row in df.iterrows():
-                # Buscar DNI en cualquier columna de la fila
-                fila_texto = ' '.join([str(cell) for cell in row if pd.notna(cell)])
-                if dni in fila_texto:
-                    alumno_fila = idx
-                    print(f"\n{alumno['nombre']} ({dni}) encontrado en fila {idx}")
-                    break
+            alumno_fila = indice.fila_con(dni)
+            if alumno_fila is not None:
+                print(f"\n{alumno['nombre']} ({dni}) encontrado en fila {alumno_fila}")
             
             if alumno_fila is None:
                 print(f"  ADVERTENCIA: No se encontró en Excel")
                 calificaciones[dni] = "S-0"
                 continue
             
-            # Buscar dinámicamente la columna de PUNTUACIÓN FINAL
-            columna_puntuacion = self._buscar_columna_puntuacion(df, alumno_fila, rango_filas=15)
-            
+            filas_alumnos.append(alumno_fila)
             nota_final = None
             estado = None
             
-            # ESTRATEGIA 1: Si encontramos la columna específica, buscar ahí
-            if columna_puntuacion is not None:
-                print(f"  Buscando en columna {columna_puntuacion}...")
-                
-                for offset in range(1, 25):
-                    fila_buscar = alumno_fila + offset
-                    if fila_buscar >= len(df):
-                        break
-                    
-                    celda = df.iloc[fila_buscar, columna_puntuacion]
-                    
-                    if pd.notna(celda):
-                        celda_str = str(celda).strip()
-                        
-                        # Buscar patrón (X.X) o (X)
-                        match_puntuacion = re.search(r'\((\d+\.?\d*)\)', celda_str)
-                        
-                        if match_puntuacion:
-                            nota_final = float(match_puntuacion.group(1))
-                            print(f"    Fila {fila_buscar}: '{celda_str}' -> Nota: {nota_final}")
-                            
-                            # Verificar estado APTO/NO APTO en filas cercanas
-                            for check_offset in range(-3, 4):
-                                check_fila = fila_buscar + check_offset
-                                if 0 <= check_fila < len(df):
-                                    # Buscar en varias columnas cercanas
-                                    for col_offset in range(-3, 4):
-                                        col_check = columna_puntuacion + col_offset
-                                        if 0 <= col_check < len(df.columns):
-                                            celda_check = str(df.iloc[check_fila, col_check])
-                                            if 'NO APTO' in celda_check:
-                                                estado = 'NO APTO'
-                                                break
-                                            elif 'APTO' in celda_check and estado != 'NO APTO':
-                                                estado = 'APTO'
-                                if estado:
-                                    break
-                            
-                            if not estado:
-                                estado = 'APTO'
-                            
-                            break
+            # ESTRATEGIA 1: la columna de PUNTUACIÓN FINAL de la disposición guardada
+            # (si el alumno tiene la etiqueta en esa columna) o buscada dinámicamente
+            ventana = range(alumno_fila, alumno_fila + 15)
+            if columna_guardada is not None and any(
+                indice.buscar(etiqueta, ventana, range(columna_guardada, columna_guardada + 1))
+                for etiqueta in ('PUNTUACIÓN FINAL', 'DEL MÓDULO')
+            ):
+                print(f"  Buscando en columna {columna_guardada} (disposición guardada)...")
+                nota_final, estado = self._nota_en_columna(df, indice, alumno_fila, columna_guardada)
+            
+            if nota_final is None:
+                columna_puntuacion = self._buscar_columna_puntuacion(indice, alumno_fila, rango_filas=15)
+                if columna_puntuacion is not None:
+                    columnas_detectadas.add(columna_puntuacion)
+                if columna_puntuacion is not None and columna_puntuacion != columna_guardada:
+                    print(f"  Buscando en columna {columna_puntuacion}...")
+                    nota_final, estado = self._nota_en_columna(df, indice, alumno_fila, columna_puntuacion)
             
             # ESTRATEGIA 2: Si no encontró en columna específica, búsqueda amplia
             if nota_final is None:
                 print(f"  Búsqueda amplia en todas las columnas...")
                 
-                for offset in range(1, 30):
-                    fila_buscar = alumno_fila + offset
-                    if fila_buscar >= len(df):
-                        break
-                    
-                    # Concatenar toda la fila
-                    fila_completa = []
-                    for col in range(len(df.columns)):
-                        celda = df.iloc[fila_buscar, col]
-                        if pd.notna(celda):
-                            fila_completa.append(str(celda))
-                    
-                    fila_texto = ' '.join(fila_completa)
+                # Solo las filas con indicadores clave o con APTO (por el índice)
+                filas_amplia = range(alumno_fila + 1, alumno_fila + 30)
+                filas_clave = {
+                    f for etiqueta in ['PUNTUACIÓN FINAL', 'DEL MÓDULO', 'CALIFICACIÓN FINAL']
+                    for f, _ in indice.buscar(etiqueta, filas_amplia)
+                }
+                filas_apto = {f for f, _ in indice.buscar('APTO', filas_amplia)}
+                
+                for fila_buscar in sorted(filas_clave | filas_apto):
+                    fila_texto = indice.texto_fila(fila_buscar)
                     
                     # Buscar líneas que contengan indicadores clave
-                    if any(keyword in fila_texto for keyword in ['PUNTUACIÓN FINAL', 'DEL MÓDULO', 'CALIFICACIÓN FINAL']):
+                    if fila_buscar in filas_clave:
                         # Extraer todos los números entre paréntesis
                         numeros = re.findall(r'\((\d+\.?\d*)\)', fila_texto)
                         
@@ -289,7 +317,7 @@ class CertificacionesOcupadosProcessor:
                                 break
                     
                     # También buscar líneas con APTO y números
-                    elif 'APTO' in fila_texto and '(' in fila_texto:
+                    elif '(' in fila_texto:
                         numeros = re.findall(r'\((\d+\.?\d*)\)', fila_texto)
                         notas_validas = [float(n) for n in numeros if 0 <= float(n) <= 10]
                         
@@ -319,6 +347,11 @@ class CertificacionesOcupadosProcessor:
             
             calificaciones[dni] = calificacion
         
+        # Se guarda la columna solo si todos los alumnos que la buscaron dieron la misma
+        if cache and len(columnas_detectadas) == 1 and filas_alumnos:
+            cache.guardar('certificaciones', libro, hoja, min(filas_alumnos),
+                          {'columna_puntuacion': columnas_detectadas.pop()})
+        
         return calificaciones
     
     def combinar_datos(self) -> List[Dict]:
@@ -4,10 +4,12 @@ PROCESADOR DE DATOS TRANSVERSALES (FCOO03)
 Extrae datos de archivos Excel para generar actas transversales
 """
 import pandas as pd
-from io import BytesIO
 from typing import Dict, List
 import re
 
+from utils.sheet_index import IndiceHoja
+from utils.workbook_cache import obtener_libro
+
 
 class TransversalesProcessor:
     """
@@ -34,22 +36,20 @@ class TransversalesProcessor:
             print("\n📊 Procesando archivos de transversales...")
             
             # Leer pestaña ASISTENCIA para obtener datos del curso
-            df_asist = pd.read_excel(BytesIO(control_bytes), sheet_name='ASISTENCIA', header=None)
+            libro = obtener_libro(control_bytes)
+            df_asist = libro.hoja('ASISTENCIA', header=None)
+            indice = libro.indice('ASISTENCIA')
             
             # Extraer datos del curso de las primeras filas
-            curso_codigo = self._extraer_valor(df_asist, 0, 'curso:')
-            curso_nombre = self._extraer_valor(df_asist, 1, 'nombre:')
-            convocatoria = self._extraer_valor(df_asist, 2, 'convocatoria:')
+            curso_codigo = self._extraer_valor(indice, 0, 'curso:')
+            curso_nombre = self._extraer_valor(indice, 1, 'nombre:')
+            convocatoria = self._extraer_valor(indice, 2, 'convocatoria:')
             
             print(f"  📋 Curso: {curso_codigo}")
             print(f"  📝 Nombre: {curso_nombre}")
             
             # Buscar fila con "FCOO03" para obtener fechas
-            fila_fcoo03 = None
-            for idx, row in df_asist.iterrows():
-                if any('FCOO03' in str(val) for val in row if pd.notna(val)):
-                    fila_fcoo03 = idx
-                    break
+            fila_fcoo03 = indice.fila_con('FCOO03')
             
             fechas = ''
             horas_fcoo03 = ''
@@ -73,11 +73,7 @@ class TransversalesProcessor:
             print(f"  ⏱️ Horas: {horas_fcoo03}")
             
             # Buscar fila de encabezados (donde está "ALUMNO", "DNI", etc.)
-            fila_encabezado = None
-            for idx, row in df_asist.iterrows():
-                if any('ALUMNO' in str(val).upper() for val in row if pd.notna(val)):
-                    fila_encabezado = idx
-                    break
+            fila_encabezado = indice.fila_con('ALUMNO')
             
             if fila_encabezado is None:
                 raise Exception("No se encontró la fila de encabezados con 'ALUMNO'")
@@ -85,12 +81,7 @@ class TransversalesProcessor:
             print(f"  📌 Encabezado en fila: {fila_encabezado}")
             
             # Leer datos de alumnos desde la fila después del encabezado
-            df_alumnos = pd.read_excel(
-                BytesIO(control_bytes), 
-                sheet_name='ASISTENCIA', 
-                header=fila_encabezado,
-                skiprows=0
-            )
+            df_alumnos = libro.hoja('ASISTENCIA', header=fila_encabezado)
             
             # Procesar alumnos
             alumnos = []
@@ -170,12 +161,12 @@ class TransversalesProcessor:
             print(f"❌ Error procesando Excel transversales: {str(e)}")
             raise Exception(f"Error procesando Excel transversales: {str(e)}")
     
-    def _extraer_valor(self, df: pd.DataFrame, fila: int, clave: str) -> str:
+    def _extraer_valor(self, indice: IndiceHoja, fila: int, clave: str) -> str:
         """
         Extrae un valor de una fila que tiene formato 'clave: valor'
         
         Args:
-            df: DataFrame
+            indice: Índice de la hoja
             fila: Número de fila
             clave: Texto clave a buscar
         
@@ -183,15 +174,12 @@ class TransversalesProcessor:
             Valor extraído como string
         """
         try:
-            row = df.iloc[fila]
-            for val in row:
-                if pd.notna(val) and clave in str(val).lower():
-                    # El valor está en la siguiente columna
-                    idx = row.tolist().index(val)
-                    if idx + 1 < len(row):
-                        valor = row.iloc[idx + 1]
-                        if pd.notna(valor):
-                            return str(valor).strip()
+            posicion = indice.primera(clave, filas=range(fila, fila + 1))
+            if posicion:
+                # El valor está en la siguiente columna
+                valor = indice.derecha_de(posicion)
+                if valor is not None:
+                    return str(valor).strip()
             return ''
         except Exception as e:
             print(f"  ⚠ Error extrayendo {clave}: {e}")
@@ -324,13 +324,10 @@ def extraer_modulos_de_cronograma(archivo) -> List[Dict]:
     Acepta rutas, bytes o archivos subidos vía Streamlit.
     """
     import pandas as pd
-    import io
+    from utils.workbook_cache import obtener_libro
 
     try:
-        if hasattr(archivo, "read"):
-            df = pd.read_excel(io.BytesIO(archivo.read()), sheet_name='Calculos_UF', header=None)
-        else:
-            df = pd.read_excel(archivo, sheet_name='Calculos_UF', header=None)
+        df = obtener_libro(archivo).hoja('Calculos_UF', header=None)
 
         modulos = []
         
@@ -9,8 +9,11 @@ from utils import (
     procesar_documento,
     leer_datos_ctrl,
     leer_datos_excel,
-    extraer_datos_multiples_documentos
+    extraer_datos_multiples_documentos,
+    ResolutorAlumnos
 )
+from utils.layout_cache import obtener_cache_disposiciones
+from utils.workbook_cache import obtener_libro
 
 
 def extraer_datos_certificado_asistencia(texto):
@@ -114,81 +117,115 @@ def extraer_evaluacion_profesores(texto):
     return datos
 
 
-def extraer_evaluacion_excel(file, verbose=False):
-    """Lee el Excel de Evaluación buscando columnas NOTA FINAL y Superado dentro de cada módulo"""
-    import re
-    
-    datos = {
-        "alumnos": {}
-    }
+def _detectar_disposicion_evaluacion(indice, df_raw):
+    """
+    Busca en el Excel de Evaluación la fila de módulos, la columna de nombres,
+    la primera fila de alumnos y las columnas NOTA FINAL y Superado de cada módulo
 
-    try:
-        file.seek(0)
-        df_raw = pd.read_excel(file, sheet_name=0, header=None)
-
-        fila_modulos = None
-        for idx, row in df_raw.iterrows():
-            row_text = ' '.join([str(x) for x in row.values if pd.notna(x)])
-            if 'MF0969' in row_text or 'MF0970' in row_text:
-                fila_modulos = idx
-                break
+    Returns:
+        dict con 'fila_inicio', 'col_nombres' y 'modulos_info', o None
+    """
+    fila_modulos = indice.fila_con('MF0969', 'MF0970')
 
-        if not fila_modulos:
-            return datos
+    if not fila_modulos:
+        return None
 
-        col_nombres = None
-        for col_idx in range(min(10, df_raw.shape[1])):
-            for fila_idx in range(fila_modulos + 1, min(fila_modulos + 15, df_raw.shape[0])):
-                valor = df_raw.iloc[fila_idx, col_idx]
-                if pd.notna(valor) and ',' in str(valor) and len(str(valor)) > 10:
-                    col_nombres = col_idx
-                    break
-            if col_nombres is not None:
+    col_nombres = None
+    for col_idx in range(min(10, df_raw.shape[1])):
+        for fila_idx in range(fila_modulos + 1, min(fila_modulos + 15, df_raw.shape[0])):
+            valor = df_raw.iloc[fila_idx, col_idx]
+            if pd.notna(valor) and ',' in str(valor) and len(str(valor)) > 10:
+                col_nombres = col_idx
                 break
+        if col_nombres is not None:
+            break
 
-        if col_nombres is None:
-            return datos
-
-        fila_mod = df_raw.iloc[fila_modulos]
-        modulos_info = []
+    if col_nombres is None:
+        return None
 
-        for col_idx, valor in enumerate(fila_mod):
-            if pd.notna(valor) and 'MF' in str(valor).upper():
-                match = re.search(r'(MF\d{4}_\d)', str(valor).upper())
-                if match:
-                    modulo = match.group(1)
-                    modulos_info.append({"modulo": modulo, "col_inicio": col_idx})
+    # Códigos MF de la fila de módulos (el primero de cada celda)
+    modulos_por_columna = {}
+    for modulo, posiciones in indice.clase('mf').items():
+        for fila_idx, col_idx in posiciones:
+            texto = indice.texto(fila_idx, col_idx)
+            actual = modulos_por_columna.get(col_idx)
+            if fila_idx == fila_modulos and (actual is None or texto.index(modulo) < texto.index(actual)):
+                modulos_por_columna[col_idx] = modulo
+    modulos_info = [
+        {"modulo": modulo, "col_inicio": col_idx}
+        for col_idx, modulo in sorted(modulos_por_columna.items())
+    ]
+
+    for i, info in enumerate(modulos_info):
+        col_inicio = info["col_inicio"]
+        col_fin = modulos_info[i + 1]["col_inicio"] if i + 1 < len(modulos_info) else df_raw.shape[1]
+
+        # Última columna del módulo con 'NOTA ... FINAL' y con 'SUPERADO' en la cabecera
+        filas_enc = range(fila_modulos, fila_modulos + 5)
+        columnas = range(col_inicio, col_fin)
+        notas = set(indice.buscar('NOTA', filas_enc, columnas)) & set(indice.buscar('FINAL', filas_enc, columnas))
+        superados = indice.buscar('SUPERADO', filas_enc, columnas)
+        nota_col = max((c for _, c in notas), default=None)
+        calif_col = max((c for _, c in superados), default=None)
+
+        if nota_col and calif_col:
+            info["nota_col"] = nota_col
+            info["calif_col"] = calif_col
+
+    fila_inicio = None
+    for fila_idx in range(fila_modulos + 1, min(fila_modulos + 15, df_raw.shape[0])):
+        valor = df_raw.iloc[fila_idx, col_nombres]
+        if pd.notna(valor) and ',' in str(valor) and len(str(valor)) > 10:
+            fila_inicio = fila_idx
+            break
+
+    if not fila_inicio:
+        return None
 
-        for i, info in enumerate(modulos_info):
-            modulo = info["modulo"]
-            col_inicio = info["col_inicio"]
-            col_fin = modulos_info[i + 1]["col_inicio"] if i + 1 < len(modulos_info) else df_raw.shape[1]
+    return {"fila_inicio": fila_inicio, "col_nombres": col_nombres, "modulos_info": modulos_info}
 
-            nota_col = None
-            calif_col = None
 
-            for col_idx in range(col_inicio, col_fin):
-                for fila_enc in range(fila_modulos, min(fila_modulos + 5, df_raw.shape[0])):
-                    celda = str(df_raw.iloc[fila_enc, col_idx])
+def _disposicion_evaluacion_valida(disposicion, df_raw):
+    """Comprueba una disposición guardada: columnas dentro de la hoja y un alumno en la primera fila"""
+    try:
+        fila_inicio = disposicion["fila_inicio"]
+        col_nombres = disposicion["col_nombres"]
+        columnas = [col_nombres] + [
+            info[clave] for info in disposicion["modulos_info"] for clave in ("nota_col", "calif_col") if clave in info
+        ]
+    except (KeyError, TypeError):
+        return False
 
-                    if 'NOTA' in celda.upper() and 'FINAL' in celda.upper():
-                        nota_col = col_idx
-                    if 'SUPERADO' in celda.upper():
-                        calif_col = col_idx
+    if fila_inicio >= df_raw.shape[0] or max(columnas) >= df_raw.shape[1]:
+        return False
+    valor = df_raw.iloc[fila_inicio, col_nombres]
+    return pd.notna(valor) and ',' in str(valor) and len(str(valor)) > 10
 
-            if nota_col and calif_col:
-                info["nota_col"] = nota_col
-                info["calif_col"] = calif_col
 
-        fila_inicio = None
-        for fila_idx in range(fila_modulos + 1, min(fila_modulos + 15, df_raw.shape[0])):
-            valor = df_raw.iloc[fila_idx, col_nombres]
-            if pd.notna(valor) and ',' in str(valor) and len(str(valor)) > 10:
-                fila_inicio = fila_idx
-                break
+def extraer_evaluacion_excel(file, verbose=False):
+    """Lee el Excel de Evaluación buscando columnas NOTA FINAL y Superado dentro de cada módulo"""
+    datos = {
+        "alumnos": {}
+    }
 
-        if not fila_inicio:
-            return datos
+    try:
+        libro = obtener_libro(file)
+        hoja = libro.sheet_names[0]
+        df_raw = libro.hoja(hoja, header=None)
+
+        # Un Excel con la misma estructura que otro ya leído reutiliza su disposición
+        cache = obtener_cache_disposiciones()
+        disposicion = cache.obtener('evaluacion', libro, hoja) if cache else None
+        if not (disposicion and _disposicion_evaluacion_valida(disposicion, df_raw)):
+            disposicion = _detectar_disposicion_evaluacion(libro.indice(hoja), df_raw)
+            if disposicion is None:
+                return datos
+            if cache:
+                cache.guardar('evaluacion', libro, hoja, disposicion["fila_inicio"], disposicion)
+
+        fila_inicio = disposicion["fila_inicio"]
+        col_nombres = disposicion["col_nombres"]
+        modulos_info = disposicion["modulos_info"]
 
         for fila_idx in range(fila_inicio, df_raw.shape[0]):
             nombre_valor = df_raw.iloc[fila_idx, col_nombres]
@@ -260,18 +297,18 @@ def llenar_excel_resumen(excel_file, datos_excel, datos_documentos, datos_ctrl=N
     from datetime import datetime, date
     
     try:
-        excel_file.seek(0)
-        wb = openpyxl.load_workbook(excel_file)
+        # Comprobaciones y cabeceras en streaming; el libro completo solo se
+        # carga para escribir, una vez sabemos que hay algo que escribir
+        libro = obtener_libro(excel_file)
 
-        if "RESUMEN" not in wb.sheetnames:
+        if "RESUMEN" not in libro.sheet_names:
             st.error("No se encontró la pestaña 'RESUMEN'")
             return None
 
-        ws = wb["RESUMEN"]
+        filas_resumen = libro.filas("RESUMEN")
 
         encabezados = {}
-        for col in range(1, ws.max_column + 1):
-            valor = ws.cell(row=1, column=col).value
+        for col, valor in enumerate(filas_resumen[0] if filas_resumen else (), start=1):
             if valor:
                 encabezados[str(valor).strip().lower()] = col
 
@@ -281,8 +318,16 @@ def llenar_excel_resumen(excel_file, datos_excel, datos_documentos, datos_ctrl=N
             st.warning("No se encontraron alumnos en las pestañas del Excel")
             return None
 
+        excel_file.seek(0)
+        wb = openpyxl.load_workbook(excel_file)
+        ws = wb["RESUMEN"]
+
         alumnos_lista = list(alumnos_excel.items())
         celdas_escritas = 0
+        # Alumnos de la pestaña CTRL indexados una vez por DNI y nombre
+        ctrl_resolutor = ResolutorAlumnos()
+        for nombre_ctrl, datos_ctrl_alumno in (datos_ctrl or {}).items():
+            ctrl_resolutor.agregar(nombre_ctrl, datos_ctrl_alumno, dni=datos_ctrl_alumno.get("dni"))
 
         for i, (nombre, datos_alumno) in enumerate(alumnos_lista):
             fila = 2 + i
@@ -295,16 +340,9 @@ def llenar_excel_resumen(excel_file, datos_excel, datos_documentos, datos_ctrl=N
                 ws.cell(row=fila, column=encabezados["nombre completo"], value=nombre)
                 celdas_escritas += 1
 
-            dni = ""
-            if datos_ctrl:
-                nombre_upper = nombre.upper()
-                for nombre_ctrl, datos_ctrl_alumno in datos_ctrl.items():
-                    if nombre_upper in nombre_ctrl or nombre_ctrl in nombre_upper:
-                        dni_ctrl = datos_ctrl_alumno.get("dni", "")
-                        if dni_ctrl:
-                            dni = dni_ctrl
-                            break
+            datos_alumno_ctrl = ctrl_resolutor.buscar(nombre, dni=datos_alumno.get("dni"))
 
+            dni = datos_alumno_ctrl.get("dni", "") if datos_alumno_ctrl else ""
             if not dni:
                 dni = datos_alumno.get("dni", "")
 
@@ -313,14 +351,6 @@ def llenar_excel_resumen(excel_file, datos_excel, datos_documentos, datos_ctrl=N
                 celdas_escritas += 1
 
             if datos_ctrl:
-                nombre_upper = nombre.upper()
-                datos_alumno_ctrl = None
-
-                for nombre_ctrl, datos_ctrl_alumno in datos_ctrl.items():
-                    if nombre_upper in nombre_ctrl or nombre_ctrl in nombre_upper:
-                        datos_alumno_ctrl = datos_ctrl_alumno
-                        break
-
                 if datos_alumno_ctrl:
                     corporacion = datos_alumno_ctrl.get("corporacion_a_clase", "")
                     for enc_key, col in encabezados.items():
@@ -484,7 +514,7 @@ def render_fin():
         if excel_justificacion:
             st.success("Excel principal cargado")
             try:
-                xls = pd.ExcelFile(excel_justificacion)
+                xls = obtener_libro(excel_justificacion)
                 st.write(f"Pestañas: {', '.join(xls.sheet_names)}")
             except Exception as e:
                 st.warning(f"Error: {str(e)}")
@@ -501,7 +531,7 @@ def render_fin():
         if excel_ctrl:
             st.success("Excel CTRL cargado")
             try:
-                xls_ctrl = pd.ExcelFile(excel_ctrl)
+                xls_ctrl = obtener_libro(excel_ctrl)
                 st.write(f"Pestañas: {', '.join(xls_ctrl.sheet_names)}")
                 if "CTRL" in xls_ctrl.sheet_names:
                     st.info("Pestaña CTRL encontrada")
@@ -12,6 +12,8 @@ from docx.enum.text import WD_ALIGN_PARAGRAPH
 from docx.oxml.ns import qn
 from docx.oxml import OxmlElement
 
+from utils.workbook_cache import obtener_libro
+
 
 # PROMPT OPTIMIZADO para replicar estilo del documento original
 PROMPT_TEMPLATE = """Analiza los siguientes resultados de las encuestas de satisfacción del curso {numero_curso}.
@@ -70,7 +72,8 @@ def extraer_datos_excel_memorias(excel_path):
     """
     try:
         # Leer Excel sin asumir primera fila como header
-        df = pd.read_excel(excel_path, header=None)
+        libro = obtener_libro(excel_path)
+        df = libro.hoja(0, header=None)
         
         print("\nForma del Excel:", df.shape)
         
@@ -80,17 +83,12 @@ def extraer_datos_excel_memorias(excel_path):
         }
         
         # Buscar fila de encabezados
-        header_row = None
-        for idx, row in df.iterrows():
-            row_str = ' '.join([str(x) for x in row if pd.notna(x)]).upper()
-            if 'PREGUNTA' in row_str or 'MEDIA' in row_str:
-                header_row = idx
-                break
+        header_row = libro.indice(0).fila_con('PREGUNTA', 'MEDIA')
         
         if header_row is not None:
-            df = pd.read_excel(excel_path, header=header_row)
+            df = libro.hoja(0, header=header_row)
         else:
-            df = pd.read_excel(excel_path)
+            df = libro.hoja(0, header=0)
         
         # Buscar columnas
         col_pregunta = None
@@ -551,7 +549,7 @@ def render_memorias():
         if excel_file:
             st.success("Excel cargado")
             with st.expander("Vista previa"):
-                df = pd.read_excel(excel_file)
+                df = obtener_libro(excel_file).hoja(0, header=0)
                 st.dataframe(df.head(10))
         else:
             st.warning("Sube un archivo Excel")
@@ -0,0 +1,96 @@
+"""
+Pruebas de ocr.clasificacion y del descarte de páginas de OCRDocument
+"""
+import pytest
+from PIL import Image, ImageDraw
+
+from ocr import clasificacion
+from ocr.clasificacion import DESCONOCIDA, VACIA, clasificar_imagenes, tipo_por_texto
+from ocr.documento import OCRDocument
+
+# Cabeceras tal como las devuelve el OCR rápido de la franja superior
+CABECERA_FIRMAS_SIN_TITULO = (
+    "INTERPROS NEXT GENERATION S.L.U.\n"
+    "Nº de Curso: 2024/1339 Especialidad: ADGG0408 OPERACIONES AUXILIARES DE SERVICIOS\n"
+    "ADMINISTRATIVOS Y GENERALES (CERTIFICADO DE PROFESIONALIDAD) Alumnos con BECA: 3"
+)
+CABECERA_FIRMAS = (
+    "SEMANA DEL 03/03/2025 AL 07/03/2025\n"
+    "N° de Curso 2024/1339 ADGG0408 OPERACIONES AUXILIARES DE SERVICIOS ADMINISTRATIVOS"
+)
+CABECERA_OTORGAMIENTO = (
+    "RESOLUCIÓN DE OTORGAMIENTO DE BECAS Y AYUDAS A LOS ALUMNOS DESEMPLEADOS\n"
+    "Nº de Curso: 2024/1339"
+)
+CABECERA_JUSTIFICANTE = (
+    "SERVICIO DE SALUD DEL PRINCIPADO DE ASTURIAS\n"
+    "JUSTIFICANTE DE ASISTENCIA A CONSULTA"
+)
+CABECERA_CERTIFICA = (
+    "D.ª María Fernández Díaz, responsable de personal de Talleres del Norte S.L.\n"
+    "CERTIFICA que D. Juan Pérez Ruiz ha estado en este centro"
+)
+
+
+@pytest.mark.parametrize('texto, tipo', [
+    (CABECERA_FIRMAS, 'parte_firma'),
+    ("PARTE DE FIRMAS - CONTROL DE ASISTENCIA", 'parte_firma'),
+    (CABECERA_OTORGAMIENTO, 'otorgamiento'),
+    (CABECERA_JUSTIFICANTE, 'justificante'),
+    (CABECERA_CERTIFICA, 'justificante'),
+    ("Volante de CITA MÉDICA para el día 12/03/2025", 'justificante'),
+])
+def test_tipo_por_texto_cabeceras_reales(texto, tipo):
+    assert tipo_por_texto(texto) == tipo
+
+
+@pytest.mark.parametrize('texto', [
+    # Datos del curso, becas y 'certificado' salen en páginas de cualquier tipo
+    CABECERA_FIRMAS_SIN_TITULO,
+    "Nº de Curso 2024/1339 BECA",
+    # Frases de dos tipos a la vez
+    "CONTROL DE ASISTENCIA\nJUSTIFICANTE de las faltas adjunto",
+    "",
+])
+def test_tipo_por_texto_sin_tipo_claro(texto):
+    assert tipo_por_texto(texto) is None
+
+
+def _pagina(marcas):
+    """Página A4 en blanco a 100 dpi con `marcas` rectángulos negros pequeños"""
+    image = Image.new('L', (827, 1169), 255)
+    dibujo = ImageDraw.Draw(image)
+    for indice in range(marcas):
+        x, y = 100 + (indice % 5) * 120, 400 + (indice // 5) * 60
+        dibujo.rectangle((x, y, x + 80, y + 12), fill=0)
+    return image
+
+
+def test_clasificar_imagenes_no_descarta_paginas_con_poca_tinta(monkeypatch):
+    paginas = [_pagina(0), _pagina(3), _pagina(10), _pagina(10)]
+    cabeceras = ['', CABECERA_FIRMAS_SIN_TITULO, CABECERA_FIRMAS]
+    monkeypatch.setattr(clasificacion, 'textos_lote', lambda imagenes, **kwargs: cabeceras[:len(imagenes)])
+
+    tipos = clasificar_imagenes(paginas)
+
+    # Una firma suelta o un justificante corto sin cabecera reconocible se leen
+    assert tipos == [VACIA, DESCONOCIDA, DESCONOCIDA, 'parte_firma']
+
+
+def _documento(tipos_pedidos, tipos_pagina):
+    documento = OCRDocument.__new__(OCRDocument)
+    documento.tipos = tipos_pedidos
+    documento._tipos_pagina = dict(enumerate(tipos_pagina, 1))
+    return documento
+
+
+def test_pagina_relevante():
+    documento = _documento(('parte_firma',), ['parte_firma', 'otorgamiento', DESCONOCIDA, VACIA, 'reverso'])
+
+    assert [documento.pagina_relevante(n) for n in range(1, 6)] == [True, False, True, False, True]
+
+
+def test_sin_tipos_se_leen_todas():
+    documento = _documento(None, [VACIA, 'otorgamiento'])
+
+    assert documento.pagina_relevante(1) and documento.pagina_relevante(2)
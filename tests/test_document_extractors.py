@@ -0,0 +1,63 @@
+"""
+Pruebas de la lectura de PDFs sueltos de utils.document_extractors
+"""
+import io
+
+import pytest
+from PIL import Image
+
+import config.settings
+from utils import document_extractors
+
+
+def _pdf_con_texto(texto):
+    """PDF mínimo de una página con capa de texto"""
+    contenido = f"BT /F1 12 Tf 72 720 Td ({texto}) Tj ET".encode('latin-1')
+    objetos = [
+        b"<< /Type /Catalog /Pages 2 0 R >>",
+        b"<< /Type /Pages /Kids [3 0 R] /Count 1 >>",
+        b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] /Contents 4 0 R "
+        b"/Resources << /Font << /F1 5 0 R >> >> >>",
+        b"<< /Length %d >>\nstream\n" % len(contenido) + contenido + b"\nendstream",
+        b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>",
+    ]
+    pdf = b"%PDF-1.4\n"
+    posiciones = []
+    for numero, objeto in enumerate(objetos, 1):
+        posiciones.append(len(pdf))
+        pdf += b"%d 0 obj\n" % numero + objeto + b"\nendobj\n"
+    inicio_xref = len(pdf)
+    pdf += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objetos) + 1)
+    pdf += b"".join(b"%010d 00000 n \n" % posicion for posicion in posiciones)
+    pdf += b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objetos) + 1, inicio_xref)
+    return pdf
+
+
+def _pdf_escaneado():
+    datos = io.BytesIO()
+    Image.new('L', (200, 300), 255).save(datos, format='PDF')
+    return datos.getvalue()
+
+
+@pytest.fixture
+def sin_ocr(monkeypatch):
+    def no_llamar(*args, **kwargs):
+        raise AssertionError('no debe pasar por OCR')
+
+    monkeypatch.setattr(config.settings, 'OCR_PDF_SUBIDOS', False)
+    monkeypatch.setattr(document_extractors, 'extraer_texto_hibrido', no_llamar)
+
+
+def test_capa_de_texto(sin_ocr):
+    assert 'Curso 2024/1339' in document_extractors.extraer_texto_pdf(io.BytesIO(_pdf_con_texto('Curso 2024/1339')))
+
+
+def test_escaneado_sin_ocr_por_defecto(sin_ocr):
+    assert document_extractors.extraer_texto_pdf(io.BytesIO(_pdf_escaneado())).strip() == ''
+
+
+def test_escaneado_con_ocr_activado(monkeypatch):
+    monkeypatch.setattr(config.settings, 'OCR_PDF_SUBIDOS', True)
+    monkeypatch.setattr(document_extractors, 'extraer_texto_hibrido', lambda origen: ['página 1', 'página 2'])
+
+    assert document_extractors.extraer_texto_pdf(io.BytesIO(_pdf_escaneado())) == 'página 1\npágina 2\n'
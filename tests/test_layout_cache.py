@@ -0,0 +1,128 @@
+"""
+Pruebas de utils.layout_cache
+"""
+import io
+
+import openpyxl
+import pytest
+
+from utils.layout_cache import CacheDisposiciones, huella_disposicion
+from utils.workbook_cache import obtener_libro, vaciar_cache
+
+
+@pytest.fixture(autouse=True)
+def _cache_vacia():
+    vaciar_cache()
+    yield
+    vaciar_cache()
+
+
+def _libro(alumnos, cabecera='ALUMNO', combinar='B1:D1', hojas=('ASISTENCIA',)):
+    wb = openpyxl.Workbook()
+    ws = wb.active
+    ws.title = hojas[0]
+    for nombre in hojas[1:]:
+        wb.create_sheet(nombre)
+    ws['B1'] = 'MF0969_1: Técnicas administrativas'
+    ws.merge_cells(combinar)
+    ws['A2'] = cabecera
+    ws['B2'] = 'DNI'
+    for fila, (nombre, dni) in enumerate(alumnos, start=3):
+        ws.cell(row=fila, column=1, value=nombre)
+        ws.cell(row=fila, column=2, value=dni)
+    datos = io.BytesIO()
+    wb.save(datos)
+    return obtener_libro(datos.getvalue())
+
+
+ALUMNOS = [('GARCIA LOPEZ, ANA', '11111111A'), ('PEREZ RUIZ, JUAN', '22222222B')]
+
+
+def test_mismos_datos_de_cabecera_misma_huella():
+    otros = [('DIAZ DIAZ, EVA', '33333333C')]
+
+    assert huella_disposicion(_libro(ALUMNOS), 'ASISTENCIA', 2) == huella_disposicion(_libro(otros), 'ASISTENCIA', 2)
+
+
+def test_los_datos_dentro_de_la_cabecera_cambian_la_huella():
+    otros = [('DIAZ DIAZ, EVA', '33333333C')]
+
+    assert huella_disposicion(_libro(ALUMNOS), 'ASISTENCIA', 3) != huella_disposicion(_libro(otros), 'ASISTENCIA', 3)
+
+
+def test_cabecera_distinta_huella_distinta():
+    assert (huella_disposicion(_libro(ALUMNOS), 'ASISTENCIA', 2)
+            != huella_disposicion(_libro(ALUMNOS, cabecera='ALUMNA'), 'ASISTENCIA', 2))
+
+
+def test_combinadas_de_la_cabecera_en_la_huella():
+    assert (huella_disposicion(_libro(ALUMNOS), 'ASISTENCIA', 2)
+            != huella_disposicion(_libro(ALUMNOS, combinar='B1:C1'), 'ASISTENCIA', 2))
+    # Las combinadas que empiezan debajo de la cabecera no cuentan
+    assert (huella_disposicion(_libro(ALUMNOS, combinar='C3:D3'), 'ASISTENCIA', 2)
+            == huella_disposicion(_libro(ALUMNOS, combinar='C4:D4'), 'ASISTENCIA', 2))
+
+
+def test_nombres_de_hojas_y_filas_de_cabecera_en_la_huella():
+    libro = _libro(ALUMNOS)
+
+    assert huella_disposicion(libro, 'ASISTENCIA', 2) != huella_disposicion(libro, 'ASISTENCIA', 1)
+    assert (huella_disposicion(libro, 'ASISTENCIA', 2)
+            != huella_disposicion(_libro(ALUMNOS, hojas=('ASISTENCIA', 'RESUMEN')), 'ASISTENCIA', 2))
+
+
+def test_guardar_y_obtener(tmp_path):
+    cache = CacheDisposiciones(str(tmp_path))
+    cache.guardar('prueba', _libro(ALUMNOS), 'ASISTENCIA', 2, {'fila_inicio': 2, 'col_nombres': 0})
+
+    mismo_formato = _libro([('DIAZ DIAZ, EVA', '33333333C')])
+    assert cache.obtener('prueba', mismo_formato, 'ASISTENCIA') == {'fila_inicio': 2, 'col_nombres': 0}
+    assert cache.obtener('otro', mismo_formato, 'ASISTENCIA') is None
+    assert cache.obtener('prueba', _libro(ALUMNOS, cabecera='NOMBRE'), 'ASISTENCIA') is None
+
+
+def test_archivo_corrupto(tmp_path):
+    cache = CacheDisposiciones(str(tmp_path))
+    libro = _libro(ALUMNOS)
+    cache.guardar('prueba', libro, 'ASISTENCIA', 2, {'fila_inicio': 2})
+    for ruta in tmp_path.iterdir():
+        ruta.write_text('{no es json', encoding='utf-8')
+
+    assert cache.obtener('prueba', libro, 'ASISTENCIA') is None
+
+
+def _asistencias(localidad):
+    """Excel de asistencias con la localidad debajo de la cabecera (fuera de la huella)"""
+    wb = openpyxl.Workbook()
+    ws = wb.active
+    ws.title = 'ASISTENCIA'
+    ws['A1'] = 'Curso:'
+    ws['B1'] = '2024/33-123'
+    ws['D6'] = 'MF0969_1: Técnicas administrativas'
+    ws['E7'] = 'Total asistencia'
+    ws['B12'] = 'ALUMNO'
+    ws['C12'] = 'DNI/NIE'
+    for fila, (nombre, dni) in enumerate(ALUMNOS + [('DIAZ DIAZ, EVA', '33333333C')], start=13):
+        ws.cell(row=fila, column=2, value=nombre)
+        ws.cell(row=fila, column=3, value=dni)
+        ws.cell(row=fila, column=5, value=80.5)
+    ws['I14'] = 'Localidad'
+    ws['J14'] = localidad
+    datos = io.BytesIO()
+    wb.save(datos)
+    return datos.getvalue()
+
+
+def test_asistencias_leen_los_datos_administrativos_de_su_libro(tmp_path, monkeypatch):
+    from sections.evaluacion import excel_processor
+    cache = CacheDisposiciones(str(tmp_path))
+    monkeypatch.setattr(excel_processor, 'obtener_cache_disposiciones', lambda: cache)
+
+    primero = excel_processor.ExcelProcessorReal().cargar_asistencias(_asistencias('GIJÓN'))
+    segundo = excel_processor.ExcelProcessorReal().cargar_asistencias(_asistencias('OVIEDO'))
+
+    assert len(list(tmp_path.iterdir())) == 1
+    assert 'info' not in cache.obtener('asistencias', obtener_libro(_asistencias('OVIEDO')), 'ASISTENCIA')
+    assert (primero['localidad'], segundo['localidad']) == ('GIJÓN', 'OVIEDO')
+    assert segundo['curso_codigo'] == '2024/33-123'
+    assert len(segundo['alumnos']) == 3
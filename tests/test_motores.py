@@ -0,0 +1,29 @@
+"""
+Pruebas de la interfaz de ocr.motores
+"""
+import pytest
+from PIL import Image
+
+from ocr.motores import MotorOCR, MotorPrecalculado
+
+
+def test_motor_a_medias_falla_al_crearlo():
+    class SoloTextos(MotorOCR):
+        def textos(self, imagenes, lang='spa', config=''):
+            return ['' for _ in imagenes]
+
+    with pytest.raises(TypeError):
+        MotorOCR()
+    with pytest.raises(TypeError):
+        SoloTextos()
+
+
+def test_motor_precalculado():
+    motor = MotorPrecalculado(['HOLA MUNDO'])
+    image = Image.new('L', (200, 100), 255)
+
+    datos = motor.datos([image])[0]
+
+    assert datos['text'] == ['HOLA', 'MUNDO']
+    assert motor.textos([image]) == ['']
+    assert motor.osd(image) == 0 and motor.version() == 'precalculado'
@@ -0,0 +1,37 @@
+"""
+Pruebas del reparto de páginas de ocr.paralelo
+"""
+import config.settings
+from ocr import paralelo
+from ocr.paralelo import lotes_consecutivos, numero_workers
+
+
+def test_lotes_consecutivos():
+    assert lotes_consecutivos([1, 2, 3, 4, 5], 2) == [[1, 2], [3, 4], [5]]
+    assert lotes_consecutivos([1, 2, 4, 5, 6, 9], 4) == [[1, 2], [4, 5, 6], [9]]
+    assert lotes_consecutivos([], 4) == []
+    assert lotes_consecutivos([3, 7], 1) == [[3], [7]]
+
+
+def test_numero_workers_explicito(monkeypatch):
+    monkeypatch.setattr(config.settings, 'OCR_MAX_WORKERS', 6)
+
+    assert numero_workers(3) == 3
+
+
+def test_numero_workers_configurado(monkeypatch):
+    monkeypatch.setattr(config.settings, 'OCR_MAX_WORKERS', 6)
+    monkeypatch.setattr(paralelo, 'limite_cpus', lambda: 2)
+
+    assert numero_workers() == 6
+
+
+def test_numero_workers_por_cpus(monkeypatch):
+    monkeypatch.setattr(config.settings, 'OCR_MAX_WORKERS', 0)
+    monkeypatch.setattr(paralelo, 'limite_cpus', lambda: 2)
+
+    assert numero_workers() == 2
+
+
+def test_limite_cpus():
+    assert paralelo.limite_cpus() >= 1
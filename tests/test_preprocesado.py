@@ -0,0 +1,112 @@
+"""
+Pruebas del preprocesado de imágenes de ocr.preprocesado
+"""
+import numpy as np
+import pytest
+from PIL import Image, ImageDraw
+
+import config.settings
+from ocr.preprocesado import (
+    angulo_inclinacion,
+    binarizar_adaptativo,
+    caja_sin_margenes,
+    preparar_lectura,
+    preparar_pagina,
+    recortar_margenes,
+)
+
+
+def _pagina(ancho=800, alto=1000, margen=100):
+    """Página en blanco con renglones de 'texto' (bloques negros) dentro de los márgenes"""
+    image = Image.new('L', (ancho, alto), 255)
+    dibujo = ImageDraw.Draw(image)
+    for y in range(margen, alto - margen, 40):
+        x = margen
+        while x < ancho - margen - 30:
+            dibujo.rectangle([x, y, x + 24, y + 12], fill=0)
+            x += 36
+    return image
+
+
+@pytest.mark.parametrize('giro', [2.0, -2.0])
+def test_angulo_inclinacion_devuelve_el_giro(giro):
+    girada = _pagina().rotate(giro, resample=Image.BILINEAR, fillcolor=255)
+
+    # Se endereza girando en sentido contrario
+    assert angulo_inclinacion(girada) == pytest.approx(-giro, abs=0.3)
+
+
+def test_pagina_recta_sin_inclinacion():
+    assert angulo_inclinacion(_pagina()) == pytest.approx(0.0, abs=0.3)
+    assert angulo_inclinacion(Image.new('L', (400, 400), 255)) == 0.0
+
+
+def test_caja_sin_margenes():
+    x0, y0, x1, y1 = caja_sin_margenes(_pagina(), relleno=0)
+
+    assert (x0, y0) == (100, 100)
+    assert 660 <= x1 <= 700 and 860 <= y1 <= 900
+    assert recortar_margenes(_pagina(), relleno=0).size == (x1 - x0, y1 - y0)
+
+
+def test_caja_sin_margenes_ignora_motas_y_paginas_en_blanco():
+    image = Image.new('L', (300, 300), 255)
+    assert caja_sin_margenes(image) is None
+    assert recortar_margenes(image) is image
+
+    image.putpixel((10, 10), 0)
+    ImageDraw.Draw(image).rectangle([100, 120, 200, 180], fill=0)
+    assert caja_sin_margenes(image, relleno=0) == (100, 120, 201, 181)
+
+
+def test_binarizar_adaptativo_con_sombra():
+    # Gradiente de iluminación de izquierda a derecha con texto algo más oscuro que el fondo
+    fondo = np.tile(np.linspace(120, 250, 600), (400, 1)).astype(np.uint8)
+    image = Image.fromarray(fondo)
+    dibujo = ImageDraw.Draw(image)
+    # Trazos de 3 píxeles, como los de una letra
+    for x in (40, 280, 520):
+        dibujo.rectangle([x, 180, x + 2, 220], fill=int(fondo[0, x]) - 80)
+
+    binaria = np.asarray(binarizar_adaptativo(image))
+
+    assert set(np.unique(binaria)) <= {0, 255}
+    # Los tres trazos salen como tinta, también en la zona en sombra
+    for x in (40, 280, 520):
+        assert (binaria[182:219, x:x + 3] == 0).all()
+    # El fondo queda en blanco
+    assert (binaria[20:100] == 255).mean() > 0.99
+
+
+@pytest.fixture
+def pasos(monkeypatch):
+    activos = {'escala_grises': True, 'binarizar': True, 'enderezar': True, 'recortar_margenes': True}
+    monkeypatch.setattr(config.settings, 'OCR_PREPROCESADO', activos)
+    return activos
+
+
+def test_preparar_pagina_conserva_el_tamano(pasos):
+    girada = _pagina().convert('RGB').rotate(2.0, resample=Image.BILINEAR, fillcolor='white')
+
+    image, angulo = preparar_pagina(girada)
+
+    assert image.mode == 'L'
+    assert image.size == girada.size
+    assert angulo == pytest.approx(-2.0, abs=0.3)
+
+
+def test_preparar_pagina_sin_pasos(pasos):
+    pasos.update(escala_grises=False, enderezar=False)
+    original = _pagina().convert('RGB')
+
+    image, angulo = preparar_pagina(original)
+
+    assert image is original and angulo == 0.0
+
+
+def test_preparar_lectura_recorta_y_binariza(pasos):
+    image, origen = preparar_lectura(_pagina().convert('RGB'))
+
+    assert origen == (100 - 8, 100 - 10)
+    assert image.size[0] < 800 and image.size[1] < 1000
+    assert set(np.unique(np.asarray(image))) <= {0, 255}
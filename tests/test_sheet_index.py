@@ -0,0 +1,101 @@
+"""
+Pruebas de utils.sheet_index
+"""
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+from utils.sheet_index import IndiceHoja, normalizar_celda
+
+
+def _indice():
+    return IndiceHoja(pd.DataFrame([
+        ['CURSO:', '2024/1339', None, None],
+        ['Nombre:', 'Operaciones auxiliares (ADGG0408)', None, None],
+        [None, 'MF0969_1: Técnicas', 'MF0970_1: Comunicación', np.nan],
+        ['ALUMNO', 'DNI', 'Puntuación final del módulo', 'Fecha'],
+        ['GARCIA LOPEZ, ANA', '11111111A', '(8.5)', datetime(2025, 3, 20)],
+        ['PEREZ RUIZ, JUAN', '22222222B', 'NO APTO', None],
+    ]))
+
+
+def test_normalizar_celda():
+    assert normalizar_celda('  Puntuación\n final ') == 'PUNTUACION FINAL'
+    assert normalizar_celda(None) == ''
+    assert normalizar_celda(np.nan) == ''
+    assert normalizar_celda(7) == '7'
+
+
+def test_buscar_sin_tildes_ni_mayusculas():
+    indice = _indice()
+
+    assert indice.buscar('PUNTUACIÓN FINAL') == [(3, 2)]
+    assert indice.buscar('puntuacion final') == [(3, 2)]
+    assert indice.buscar('comunicacion') == [(2, 2)]
+
+
+def test_buscar_frase_y_no_tokens_sueltos():
+    indice = _indice()
+
+    # 'FINAL' y 'MODULO' están en la misma celda, pero no seguidos
+    assert indice.buscar('FINAL MODULO') == []
+    assert indice.buscar('FINAL DEL MODULO') == [(3, 2)]
+    # Tokens repartidos en celdas distintas no forman la etiqueta
+    assert indice.buscar('ALUMNO DNI') == []
+
+
+def test_buscar_parte_de_un_token():
+    indice = _indice()
+
+    assert indice.buscar('APTO') == [(5, 2)]
+    assert indice.buscar('MF0969') == [(2, 1)]
+
+
+def test_buscar_limitado_a_filas_y_columnas_ordenado():
+    indice = _indice()
+
+    assert indice.buscar('MF') == [(2, 1), (2, 2)]
+    assert indice.buscar('MF', columnas=range(2, 4)) == [(2, 2)]
+    assert indice.buscar('ALUMNO', filas=range(0, 3)) == []
+    assert indice.buscar('') == []
+
+
+def test_primera_y_fila_con():
+    indice = _indice()
+
+    assert indice.primera('NO APTO', 'ALUMNO') == (3, 0)
+    assert indice.fila_con('no existe') is None
+    assert indice.fila_con('DNI', 'ALUMNO') == 3
+
+
+def test_clases_y_celda_de_la_derecha():
+    indice = _indice()
+
+    assert indice.clase('dni', '11111111a') == [(4, 1)]
+    assert sorted(indice.clase('mf')) == ['MF0969_1', 'MF0970_1']
+    assert indice.clase('fecha', '20/03/2025') == [(4, 3)]
+    assert indice.derecha_de((0, 0)) == '2024/1339'
+    assert indice.derecha_de((0, 3)) is None
+    assert indice.derecha_de((2, 2)) is None
+
+
+def test_codigos_mf_pegados_a_otro_texto():
+    indice = IndiceHoja(pd.DataFrame([['MODULOMF0969_1', 'MF0970_1X: Comunicación', 'MF0971_12']]))
+
+    assert sorted(indice.clase('mf')) == ['MF0969_1', 'MF0970_1', 'MF0971_1']
+
+
+def test_disposicion_evaluacion_con_codigos_pegados():
+    from sections.fin import _detectar_disposicion_evaluacion
+
+    df = pd.DataFrame([
+        ['EVALUACIÓN', None, None, None, None],
+        [None, 'MODULOMF0969_1', None, 'MF0970_1X', None],
+        [None, 'NOTA FINAL', 'SUPERADO', 'NOTA FINAL', 'SUPERADO'],
+        ['GARCIA LOPEZ, ANA', 8.5, 'SI', 7, 'SI'],
+    ])
+
+    disposicion = _detectar_disposicion_evaluacion(IndiceHoja(df), df)
+
+    assert [(m['modulo'], m['col_inicio']) for m in disposicion['modulos_info']] == [('MF0969_1', 1), ('MF0970_1', 3)]
@@ -0,0 +1,73 @@
+"""
+Pruebas de utils.student_resolver
+"""
+from utils.student_resolver import ResolutorAlumnos, normalizar_dni, tokens_nombre
+
+
+def test_tokens_nombre_sin_tildes_ni_puntuacion():
+    assert tokens_nombre('Braña Manchado, Nuria') == ['BRANA', 'MANCHADO', 'NURIA']
+
+
+def test_normalizar_dni():
+    assert normalizar_dni('71.879.712-c') == '71879712C'
+    assert normalizar_dni('X1234567L') == 'X1234567L'
+    assert normalizar_dni('GARCIA') is None
+    assert normalizar_dni(None) is None
+
+
+def test_dni_tiene_prioridad_sobre_el_nombre():
+    resolutor = ResolutorAlumnos()
+    resolutor.agregar('GARCIA LOPEZ, ANA', 'ana', dni='11111111A')
+    resolutor.agregar('PEREZ RUIZ, JUAN', 'juan', dni='22222222B')
+
+    # El nombre es el de Ana pero el DNI es el de Juan
+    assert resolutor.buscar('GARCIA LOPEZ, ANA', dni='22222222B') == 'juan'
+
+
+def test_dni_sin_letra_de_control():
+    resolutor = ResolutorAlumnos()
+    resolutor.agregar('GARCIA LOPEZ, ANA', 'ana', dni='11111111A')
+
+    assert resolutor.buscar(dni='11111111') == 'ana'
+    assert resolutor.buscar('11111111A') == 'ana'
+
+
+def test_dni_desconocido_cae_al_nombre():
+    resolutor = ResolutorAlumnos()
+    resolutor.agregar('GARCIA LOPEZ, ANA', 'ana', dni='11111111A')
+
+    assert resolutor.buscar('Ana García López', dni='99999999Z') == 'ana'
+
+
+def test_nombre_sin_importar_el_orden():
+    resolutor = ResolutorAlumnos({'GARCIA LOPEZ, ANA MARIA': 1})
+
+    assert resolutor.buscar('Ana María García López') == 1
+
+
+def test_nombre_con_error_de_ocr():
+    resolutor = ResolutorAlumnos({'GARCIA LOPEZ, ANA MARIA': 1, 'PEREZ RUIZ, JUAN': 2})
+
+    assert resolutor.buscar('GARCIA L0PEZ, ANA MARIA') == 1
+
+
+def test_sin_falsos_positivos_entre_alumnos_con_los_mismos_apellidos():
+    resolutor = ResolutorAlumnos({'GARCIA LOPEZ, ANA': 'ana', 'GARCIA LOPEZ, MARIA': 'maria'})
+
+    assert resolutor.buscar('GARCIA LOPEZ, JUAN') is None
+    assert resolutor.buscar('GARCIA LOPEZ') is None
+    assert resolutor.buscar('GARCIA LOPEZ, MARIA') == 'maria'
+    assert resolutor.buscar('GARCIA LOPEZ, ANA') == 'ana'
+
+
+def test_solo_un_apellido_comun_no_coincide():
+    resolutor = ResolutorAlumnos({'GARCIA LOPEZ, ANA': 'ana'})
+
+    assert resolutor.buscar('GARCIA FERNANDEZ, PEDRO', defecto='nadie') == 'nadie'
+
+
+def test_empate_no_devuelve_ninguno():
+    # Dos alumnas con los mismos nombre y apellidos en distinto orden
+    resolutor = ResolutorAlumnos({'GARCIA LOPEZ, ANA': 'ana 1', 'LOPEZ GARCIA, ANA': 'ana 2'})
+
+    assert resolutor.buscar('GARCIA LOPEZ, ANNA') is None
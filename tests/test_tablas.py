@@ -0,0 +1,35 @@
+"""
+Pruebas de los límites de columnas de ocr.tablas
+"""
+from ocr.layouts import TABLAS
+from ocr.tablas import limites_columnas
+
+
+def _palabra(texto, x0, x1):
+    return {'texto': texto, 'caja': (x0, 0.10, x1, 0.12)}
+
+
+CABECERA = [_palabra('Nº', 0.02, 0.04), _palabra('APELLIDOS', 0.10, 0.30), _palabra('NIF', 0.40, 0.46),
+            _palabra('TRANSPORTE', 0.60, 0.70)]
+
+
+def _redondeados(limites):
+    return [(nombre, round(x0, 3), round(x1, 3)) for nombre, x0, x1 in limites]
+
+
+def test_limites_columnas():
+    assert _redondeados(limites_columnas(CABECERA, TABLAS['becas'])) == [
+        ('numero', 0.0, 0.115), ('nombre', 0.115, 0.315), ('nif', 0.315, 0.54), ('transporte', 0.54, 1.0),
+    ]
+
+
+def test_misma_cabecera_en_otra_posicion_u_otra_tabla():
+    movida = [dict(p, caja=(p['caja'][0] + 0.1, 0.10, p['caja'][2] + 0.1, 0.12)) for p in CABECERA]
+    otra = dict(TABLAS['becas'], columnas=[('nombre', r'APELLIDOS'), ('nif', r'^NIF')])
+
+    assert _redondeados(limites_columnas(movida, TABLAS['becas']))[1] == ('nombre', 0.215, 0.415)
+    assert _redondeados(limites_columnas(CABECERA, otra)) == [('nombre', 0.0, 0.315), ('nif', 0.315, 1.0)]
+
+
+def test_falta_columna_obligatoria():
+    assert limites_columnas(CABECERA[:2], TABLAS['becas']) is None
@@ -0,0 +1,85 @@
+"""
+Pruebas de utils.workbook_cache
+"""
+import io
+from datetime import datetime
+
+import openpyxl
+import pandas as pd
+import pytest
+from openpyxl.styles import Font
+
+from utils.workbook_cache import obtener_libro, vaciar_cache
+
+
+@pytest.fixture(autouse=True)
+def _cache_vacia():
+    vaciar_cache()
+    yield
+    vaciar_cache()
+
+
+def _xlsx():
+    wb = openpyxl.Workbook()
+    ws = wb.active
+    ws.title = 'RESUMEN'
+    ws.append(['ID', 'NOMBRE COMPLETO', 'DNI', None, '% ASISTENCIA', 'FECHA'])
+    ws.append([1, 'GARCIA LOPEZ, ANA', '11111111A', None, 0.85, datetime(2025, 3, 20)])
+    ws.append([])
+    ws.append([2.0, 'PEREZ RUIZ, JUAN', 22222222, '#N/A', 1, None])
+    ws.append([None, None, None, None, None, None, None, 'nota al margen'])
+    # Filas con formato pero vacías al final de la hoja
+    for fila in range(10, 200):
+        ws.cell(row=fila, column=3).font = Font(bold=True)
+    otra = wb.create_sheet('ASISTENCIA')
+    otra['C1'] = '2024/1339'
+    otra.merge_cells('A3:D3')
+    otra['A5'] = 'APELLIDOS, NOMBRE'
+    datos = io.BytesIO()
+    wb.save(datos)
+    return datos.getvalue()
+
+
+@pytest.mark.parametrize('hoja', ['RESUMEN', 'ASISTENCIA', 0])
+@pytest.mark.parametrize('header', [None, 0, 1])
+def test_hoja_igual_que_read_excel(hoja, header):
+    contenido = _xlsx()
+
+    esperado = pd.read_excel(io.BytesIO(contenido), sheet_name=hoja, header=header)
+    pd.testing.assert_frame_equal(obtener_libro(contenido).hoja(hoja, header=header), esperado)
+
+
+def test_hoja_devuelve_copias():
+    libro = obtener_libro(_xlsx())
+
+    df = libro.hoja('RESUMEN')
+    df.iloc[0, 0] = 'cambiado'
+    assert libro.hoja('RESUMEN').iloc[0, 0] == 'ID'
+
+
+def test_filas_recortadas_al_rango_usado():
+    filas = obtener_libro(_xlsx()).filas('RESUMEN')
+
+    assert len(filas) == 5
+    assert {len(fila) for fila in filas} == {8}
+    assert filas[2] == (None,) * 8
+    assert filas[1][:3] == (1, 'GARCIA LOPEZ, ANA', '11111111A')
+
+
+def test_filas_de_la_hoja_activa():
+    assert obtener_libro(_xlsx()).filas(None)[0][0] == 'ID'
+
+
+def test_combinadas():
+    assert obtener_libro(_xlsx()).combinadas('ASISTENCIA') == [(2, 0, 2, 3)]
+
+
+def test_mismo_contenido_mismo_libro():
+    contenido = _xlsx()
+
+    assert obtener_libro(contenido) is obtener_libro(io.BytesIO(contenido))
+
+
+def test_hoja_inexistente():
+    with pytest.raises(ValueError):
+        obtener_libro(_xlsx()).hoja('NO EXISTE')
@@ -17,6 +17,14 @@ from .file_handlers import (
     visualizar_documento_word
 )
 
+from .student_resolver import ResolutorAlumnos
+
+from .sheet_index import IndiceHoja
+
+from .workbook_cache import obtener_libro
+
+from .layout_cache import obtener_cache_disposiciones
+
 __all__ = [
     'extraer_texto_pdf',
     'extraer_texto_imagen',
@@ -27,5 +35,9 @@ __all__ = [
     'leer_datos_ctrl',
     'leer_datos_excel',
     'rellenar_acta_desde_plantilla',
-    'visualizar_documento_word'
+    'visualizar_documento_word',
+    'ResolutorAlumnos',
+    'IndiceHoja',
+    'obtener_libro',
+    'obtener_cache_disposiciones'
 ]
\ No newline at end of file
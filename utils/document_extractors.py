@@ -5,22 +5,34 @@ import re
 import pandas as pd
 import streamlit as st
 from PIL import Image
-import pytesseract
-import PyPDF2
 import docx
 
+from ocr import extraer_texto_hibrido
+from ocr.capa_texto import paginas_capa, ruta_pdf
+from ocr.lote import textos_lote
+from ocr.perfiles import config_perfil
+
+from .workbook_cache import obtener_libro
+
 
 def extraer_texto_pdf(file):
-    """Extrae texto de un archivo PDF"""
+    """
+    Extrae texto de un archivo PDF
+
+    Solo de la capa de texto; con OCR_PDF_SUBIDOS activo, las páginas
+    escaneadas pasan además por OCR
+    """
+    from config.settings import OCR_PDF_SUBIDOS
+
     try:
-        if PyPDF2 is None:
-            st.error("PyPDF2 no está instalado")
-            return ""
-        
-        pdf_reader = PyPDF2.PdfReader(file)
+        if OCR_PDF_SUBIDOS:
+            paginas = extraer_texto_hibrido(file)
+        else:
+            with ruta_pdf(file) as pdf_path:
+                paginas = [pagina.texto for pagina in paginas_capa(pdf_path)]
         texto = ""
-        for page in pdf_reader.pages:
-            texto += page.extract_text() + "\n"
+        for texto_pagina in paginas:
+            texto += texto_pagina + "\n"
         return texto
     except Exception as e:
         st.error(f"Error al leer PDF: {str(e)}")
@@ -31,7 +43,7 @@ def extraer_texto_imagen(file):
     """Extrae texto de una imagen usando OCR"""
     try:
         image = Image.open(file)
-        texto = pytesseract.image_to_string(image, lang='spa')
+        texto = textos_lote([image], lang='spa', config=config_perfil('documento'))[0]
         return texto
     except Exception as e:
         st.error(f"Error al procesar imagen: {str(e)}")
@@ -59,10 +71,10 @@ def extraer_texto_word(file):
 def extraer_texto_excel(file):
     """Extrae texto de un archivo Excel"""
     try:
-        xls = pd.ExcelFile(file)
+        libro = obtener_libro(file)
         texto = ""
-        for sheet_name in xls.sheet_names:
-            df = pd.read_excel(file, sheet_name=sheet_name)
+        for sheet_name in libro.sheet_names:
+            df = libro.hoja(sheet_name, header=0)
             texto += f"\n--- Hoja: {sheet_name} ---\n"
             texto += df.to_string(index=False) + "\n"
         return texto
@@ -102,9 +114,9 @@ def extraer_datos_multiples_documentos(archivos):
             
             if archivo.type in ["application/vnd.ms-excel", "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"]:
                 try:
-                    xls = pd.ExcelFile(archivo)
-                    for sheet_name in xls.sheet_names:
-                        df = pd.read_excel(archivo, sheet_name=sheet_name)
+                    libro = obtener_libro(archivo)
+                    for sheet_name in libro.sheet_names:
+                        df = libro.hoja(sheet_name, header=0)
                         
                         for col in df.columns:
                             col_lower = str(col).lower()
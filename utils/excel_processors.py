@@ -8,19 +8,21 @@ import streamlit as st
 import re
 from datetime import datetime, date
 
+from .workbook_cache import obtener_libro
+
 
 def leer_datos_ctrl(excel_file):
     """Lee la pestaña CTRL del Excel CTRL de Alumnos"""
     datos_ctrl = {}
 
     try:
-        excel_file.seek(0)
+        libro = obtener_libro(excel_file)
 
-        if "CTRL" not in pd.ExcelFile(excel_file).sheet_names:
+        if "CTRL" not in libro.sheet_names:
             st.warning("No se encontró la pestaña 'CTRL' en el Excel CTRL")
             return datos_ctrl
 
-        df_ctrl = pd.read_excel(excel_file, sheet_name="CTRL")
+        df_ctrl = libro.hoja("CTRL", header=0)
 
         col_nombre = None
         col_dni = None
@@ -0,0 +1,129 @@
+"""
+Caché persistente de disposiciones de libros Excel
+Los Excel de control de cada mes tienen la misma estructura: los procesadores
+guardan aquí lo que detectan (filas y columnas de módulos, cabeceras, notas...)
+junto con una huella de la disposición: nombres de las hojas, contenido de las
+filas de cabecera y celdas combinadas que empiezan en ellas. Si otro libro
+tiene la misma huella se reutiliza la disposición sin volver a detectarla; si
+la huella cambia o la disposición no valida, se detecta de nuevo.
+"""
+import hashlib
+import json
+import os
+
+# Incrementar cuando cambie el formato de las disposiciones guardadas
+VERSION_DISPOSICIONES = 1
+
+# Disposiciones distintas que se guardan por tipo de procesador y estructura de hojas
+MAXIMO_POR_CLAVE = 8
+
+_cache_global = None
+
+
+def huella_disposicion(libro, hoja, filas_cabecera):
+    """
+    Huella de la estructura de una hoja
+
+    Args:
+        libro: LibroExcel
+        hoja: Nombre de la hoja
+        filas_cabecera: Filas del principio de la hoja que forman la cabecera
+
+    Returns:
+        str: SHA-256 hexadecimal
+    """
+    sha = hashlib.sha256()
+    sha.update(repr((libro.sheet_names, hoja, filas_cabecera)).encode('utf-8'))
+    for fila in libro.filas(hoja)[:filas_cabecera]:
+        sha.update(repr(fila).encode('utf-8'))
+    combinadas = [rango for rango in libro.combinadas(hoja) if rango[0] < filas_cabecera]
+    sha.update(repr(combinadas).encode('utf-8'))
+    return sha.hexdigest()
+
+
+class CacheDisposiciones:
+    """Disposiciones detectadas guardadas en disco (JSON), por tipo y estructura de hojas"""
+
+    def __init__(self, directorio):
+        """
+        Args:
+            directorio: Carpeta donde se guardan las disposiciones
+        """
+        self.directorio = directorio
+
+    def obtener(self, tipo, libro, hoja):
+        """
+        Disposición guardada cuya huella coincide con la de la hoja
+
+        Args:
+            tipo: Procesador que la detectó (p.ej. 'asistencias')
+            libro: LibroExcel
+            hoja: Nombre de la hoja
+
+        Returns:
+            dict con la disposición o None si no hay ninguna válida
+        """
+        for entrada in self._leer(self._ruta(tipo, libro, hoja)):
+            try:
+                coincide = entrada['huella'] == huella_disposicion(libro, hoja, entrada['filas_cabecera'])
+            except (KeyError, TypeError):
+                continue
+            if coincide:
+                return entrada['disposicion']
+        return None
+
+    def guardar(self, tipo, libro, hoja, filas_cabecera, disposicion):
+        """
+        Guarda la disposición detectada en una hoja
+
+        Args:
+            tipo: Procesador que la detectó
+            libro: LibroExcel
+            hoja: Nombre de la hoja
+            filas_cabecera: Filas de la cabecera (lo que hay por encima de los datos)
+            disposicion: dict serializable en JSON
+        """
+        ruta = self._ruta(tipo, libro, hoja)
+        huella = huella_disposicion(libro, hoja, filas_cabecera)
+        entradas = [e for e in self._leer(ruta) if e.get('huella') != huella]
+        entradas.insert(0, {'huella': huella, 'filas_cabecera': filas_cabecera, 'disposicion': disposicion})
+        temporal = f"{ruta}.{os.getpid()}.tmp"
+        try:
+            os.makedirs(self.directorio, exist_ok=True)
+            with open(temporal, 'w', encoding='utf-8') as f:
+                json.dump(entradas[:MAXIMO_POR_CLAVE], f, ensure_ascii=False)
+            os.replace(temporal, ruta)
+        except (OSError, TypeError, ValueError) as e:
+            print(f"Advertencia: no se pudo guardar la disposición del Excel: {e}")
+            if os.path.exists(temporal):
+                os.unlink(temporal)
+
+    def _ruta(self, tipo, libro, hoja):
+        clave = '|'.join([f"v{VERSION_DISPOSICIONES}", tipo, hoja, *libro.sheet_names])
+        return os.path.join(self.directorio, f"{hashlib.sha256(clave.encode('utf-8')).hexdigest()}.json")
+
+    @staticmethod
+    def _leer(ruta):
+        try:
+            with open(ruta, 'r', encoding='utf-8') as f:
+                entradas = json.load(f)
+        except (OSError, ValueError):
+            return []
+        return [e for e in entradas if isinstance(e, dict)] if isinstance(entradas, list) else []
+
+
+def obtener_cache_disposiciones():
+    """
+    Caché compartida configurada en config.settings
+
+    Returns:
+        CacheDisposiciones o None si está desactivada
+    """
+    global _cache_global
+    from config.settings import EXCEL_DISPOSICIONES_ENABLED, EXCEL_DISPOSICIONES_DIR
+
+    if not EXCEL_DISPOSICIONES_ENABLED:
+        return None
+    if _cache_global is None:
+        _cache_global = CacheDisposiciones(EXCEL_DISPOSICIONES_DIR)
+    return _cache_global
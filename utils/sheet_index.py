@@ -0,0 +1,157 @@
+"""
+Índice de etiquetas de una hoja de cálculo
+La hoja se normaliza una sola vez (tildes, mayúsculas y espacios) y se
+construye un índice invertido de tokens y de clases de valores (códigos MF,
+DNI/NIE y fechas) a sus posiciones (fila, columna); después cada búsqueda de
+una etiqueta es una consulta al diccionario en lugar de recorrer la hoja.
+"""
+import re
+import unicodedata
+from collections import defaultdict
+from datetime import date, datetime
+
+import numpy as np
+import pandas as pd
+
+# Clases de valores que se indexan por su valor normalizado
+CLASES = {
+    'mf': re.compile(r'MF\d{4}_\d'),
+    'dni': re.compile(r'\b[XYZ]?\d{7,8}[A-Z]\b'),
+    'fecha': re.compile(r'\b\d{1,2}/\d{1,2}/\d{2,4}\b'),
+}
+
+
+def normalizar_celda(valor):
+    """
+    Texto de una celda en mayúsculas, sin tildes y con los espacios unificados
+
+    Args:
+        valor: Valor de la celda (cualquier tipo)
+
+    Returns:
+        str ('' si la celda está vacía)
+    """
+    if valor is None or (not isinstance(valor, str) and pd.isna(valor)):
+        return ''
+    texto = unicodedata.normalize('NFKD', str(valor).upper())
+    texto = ''.join(c for c in texto if not unicodedata.combining(c))
+    return ' '.join(texto.split())
+
+
+class IndiceHoja:
+    """Índice invertido de tokens y clases de valores de una hoja (DataFrame sin cabecera)"""
+
+    def __init__(self, df):
+        """
+        Args:
+            df: DataFrame de la hoja leído con header=None
+        """
+        self.df = df
+        self.valores = df.to_numpy(dtype=object)
+        self.forma = self.valores.shape
+        self._celdas = {}
+        self._tokens = defaultdict(set)
+        self._clases = defaultdict(lambda: defaultdict(list))
+        self._por_token_parcial = {}
+        self._textos_fila = {}
+
+        for fila, columna in np.argwhere(~pd.isna(self.valores)).tolist():
+            valor = self.valores[fila, columna]
+            texto = normalizar_celda(valor)
+            if not texto:
+                continue
+            posicion = (fila, columna)
+            self._celdas[posicion] = texto
+            for token in re.findall(r'[A-Z0-9]+', texto):
+                self._tokens[token].add(posicion)
+            if isinstance(valor, (datetime, date)):
+                self._clases['fecha'][valor.strftime('%d/%m/%Y')].append(posicion)
+                continue
+            for clase, patron in CLASES.items():
+                for encontrado in patron.findall(texto):
+                    self._clases[clase][encontrado].append(posicion)
+
+    def texto(self, fila, columna):
+        """Texto normalizado de una celda ('' si está vacía o fuera de la hoja)"""
+        return self._celdas.get((fila, columna), '')
+
+    def texto_fila(self, fila):
+        """Valores no vacíos de una fila unidos por espacios (sin normalizar)"""
+        if fila not in self._textos_fila:
+            self._textos_fila[fila] = ' '.join(
+                str(v) for v in self.valores[fila] if not (not isinstance(v, str) and pd.isna(v))
+            )
+        return self._textos_fila[fila]
+
+    def _con_token(self, token):
+        """Posiciones de las celdas con algún token que contiene `token`"""
+        if token not in self._por_token_parcial:
+            posiciones = set()
+            for candidato, celdas in self._tokens.items():
+                if token in candidato:
+                    posiciones |= celdas
+            self._por_token_parcial[token] = posiciones
+        return self._por_token_parcial[token]
+
+    def buscar(self, etiqueta, filas=None, columnas=None):
+        """
+        Celdas que contienen una etiqueta (sin distinguir tildes ni mayúsculas)
+
+        Args:
+            etiqueta: Texto a buscar, p.ej. 'PUNTUACIÓN FINAL'
+            filas: range de filas donde buscar (por defecto, toda la hoja)
+            columnas: range de columnas donde buscar (por defecto, todas)
+
+        Returns:
+            Lista de (fila, columna) ordenada por filas y columnas
+        """
+        buscada = normalizar_celda(etiqueta)
+        tokens = re.findall(r'[A-Z0-9]+', buscada)
+        if not tokens:
+            return []
+        candidatas = set.intersection(*(self._con_token(token) for token in tokens))
+        return sorted(
+            (fila, columna) for fila, columna in candidatas
+            if (filas is None or fila in filas)
+            and (columnas is None or columna in columnas)
+            and buscada in self._celdas[(fila, columna)]
+        )
+
+    def primera(self, *etiquetas, filas=None, columnas=None):
+        """
+        Primera celda (por filas y columnas) que contiene alguna de las etiquetas
+
+        Returns:
+            (fila, columna) o None
+        """
+        posiciones = [p for etiqueta in etiquetas for p in self.buscar(etiqueta, filas, columnas)]
+        return min(posiciones) if posiciones else None
+
+    def fila_con(self, *etiquetas, filas=None, columnas=None):
+        """Primera fila con alguna de las etiquetas o None"""
+        posicion = self.primera(*etiquetas, filas=filas, columnas=columnas)
+        return posicion[0] if posicion else None
+
+    def clase(self, nombre, valor=None):
+        """
+        Posiciones de los valores de una clase ('mf', 'dni' o 'fecha')
+
+        Args:
+            nombre: Clase de CLASES
+            valor: Valor concreto (p.ej. un DNI); si se omite, todos
+
+        Returns:
+            dict {valor: [(fila, columna)]} o, con `valor`, la lista de posiciones
+        """
+        valores = self._clases.get(nombre, {})
+        if valor is None:
+            return dict(valores)
+        return list(valores.get(normalizar_celda(valor), []))
+
+    def derecha_de(self, posicion):
+        """Valor original de la celda a la derecha de `posicion` o None si está vacía"""
+        fila, columna = posicion
+        if columna + 1 >= self.forma[1]:
+            return None
+        valor = self.valores[fila, columna + 1]
+        return None if not isinstance(valor, str) and pd.isna(valor) else valor
@@ -0,0 +1,168 @@
+"""
+Resolución de la identidad de los alumnos entre fuentes de datos
+Cada fuente (ayudas, justificantes, asistencias, CTRL, calificaciones...) se
+indexa una vez por DNI, por nombre normalizado y por bloques de tokens; después
+cada alumno se busca en tiempo constante en lugar de recorrer y normalizar
+todas las claves en cada consulta.
+"""
+import re
+import unicodedata
+from collections import defaultdict
+from difflib import SequenceMatcher
+
+# Similitud mínima (Dice ponderado por tokens) para aceptar una coincidencia aproximada
+UMBRAL_SIMILITUD = 0.8
+
+# Similitud mínima entre dos tokens para considerarlos el mismo con errores de OCR o tecleo
+UMBRAL_TOKEN = 0.75
+
+# Letras del prefijo de cada token que forman los bloques de candidatos
+LONGITUD_BLOQUE = 3
+
+# Partículas de los apellidos compuestos: no identifican por sí solas
+PARTICULAS = {'DE', 'DEL', 'LA', 'LAS', 'LOS', 'Y', 'I'}
+
+PATRON_DNI = re.compile(r'^[XYZ]?\d{7,8}[A-Z]?$')
+
+
+def tokens_nombre(nombre):
+    """
+    Tokens de un nombre en mayúsculas, sin tildes ni puntuación
+
+    Args:
+        nombre: 'APELLIDOS, NOMBRE' o 'Nombre Apellidos'
+
+    Returns:
+        Lista de tokens en el orden del texto
+    """
+    texto = unicodedata.normalize('NFKD', str(nombre).upper())
+    texto = ''.join(c for c in texto if not unicodedata.combining(c))
+    return re.findall(r'[A-Z0-9]+', texto)
+
+
+def normalizar_dni(dni):
+    """
+    DNI/NIE sin espacios, guiones ni puntos
+
+    Returns:
+        str en mayúsculas o None si no tiene forma de DNI/NIE
+    """
+    if dni is None:
+        return None
+    dni = re.sub(r'[^0-9A-Z]', '', str(dni).upper())
+    return dni if PATRON_DNI.match(dni) else None
+
+
+def _similitud_tokens(consulta, candidato):
+    """
+    Coeficiente de Dice entre dos listas de tokens, contando cada pareja de
+    tokens por su parecido (1 si son iguales)
+    """
+    libres = list(candidato)
+    total = 0.0
+    for token in consulta:
+        mejor, indice_mejor = 0.0, None
+        for indice, otro in enumerate(libres):
+            parecido = 1.0 if token == otro else SequenceMatcher(None, token, otro).ratio()
+            if parecido > mejor:
+                mejor, indice_mejor = parecido, indice
+        if indice_mejor is not None and mejor >= UMBRAL_TOKEN:
+            total += mejor
+            libres.pop(indice_mejor)
+    return 2 * total / (len(consulta) + len(candidato)) if consulta and candidato else 0.0
+
+
+class ResolutorAlumnos:
+    """Índice de una fuente de datos por DNI, nombre normalizado y bloques de tokens"""
+
+    def __init__(self, datos=None, umbral=UMBRAL_SIMILITUD):
+        """
+        Args:
+            datos: dict {nombre o DNI: valor} de la fuente (opcional, ver agregar)
+            umbral: Similitud mínima de las coincidencias aproximadas
+        """
+        self.umbral = umbral
+        self._por_dni = {}
+        self._por_nombre = {}
+        self._entradas = []
+        self._bloques = defaultdict(set)
+        for clave, valor in (datos or {}).items():
+            self.agregar(clave, valor)
+
+    def __len__(self):
+        return len(self._entradas)
+
+    def agregar(self, clave, valor, dni=None):
+        """
+        Añade una entrada de la fuente
+
+        Args:
+            clave: Nombre del alumno o su DNI
+            valor: Dato asociado
+            dni: DNI del alumno si la clave es el nombre
+        """
+        dni_clave = normalizar_dni(clave)
+        for documento in (dni_clave, normalizar_dni(dni)):
+            if documento:
+                self._por_dni.setdefault(documento, valor)
+                # El OCR pierde a menudo la letra de control
+                self._por_dni.setdefault(re.sub(r'[A-Z]$', '', documento), valor)
+        if dni_clave:
+            return
+
+        tokens = tokens_nombre(clave)
+        if not tokens:
+            return
+        self._por_nombre.setdefault(' '.join(sorted(tokens)), valor)
+        indice = len(self._entradas)
+        self._entradas.append((tokens, valor))
+        for token in tokens:
+            if token not in PARTICULAS and len(token) >= LONGITUD_BLOQUE:
+                self._bloques[token[:LONGITUD_BLOQUE]].add(indice)
+
+    def buscar(self, nombre=None, dni=None, defecto=None):
+        """
+        Valor de un alumno en la fuente
+
+        Primero por DNI, después por nombre normalizado (sin importar el orden
+        de nombre y apellidos) y por último por similitud con los nombres que
+        comparten algún bloque de tokens. Si dos candidatos empatan no se
+        devuelve ninguno.
+
+        Args:
+            nombre: Nombre del alumno
+            dni: DNI del alumno
+            defecto: Valor si no se encuentra
+
+        Returns:
+            El valor encontrado o `defecto`
+        """
+        for documento in (normalizar_dni(dni), normalizar_dni(nombre)):
+            if documento:
+                for variante in (documento, re.sub(r'[A-Z]$', '', documento)):
+                    if variante in self._por_dni:
+                        return self._por_dni[variante]
+
+        if not nombre:
+            return defecto
+        tokens = tokens_nombre(nombre)
+        clave = ' '.join(sorted(tokens))
+        if clave in self._por_nombre:
+            return self._por_nombre[clave]
+
+        candidatos = set()
+        for token in tokens:
+            if token not in PARTICULAS and len(token) >= LONGITUD_BLOQUE:
+                candidatos |= self._bloques.get(token[:LONGITUD_BLOQUE], set())
+
+        mejor, puntuacion_mejor, empate = None, 0.0, False
+        for indice in candidatos:
+            tokens_candidato, valor = self._entradas[indice]
+            puntuacion = _similitud_tokens(tokens, tokens_candidato)
+            if puntuacion > puntuacion_mejor:
+                mejor, puntuacion_mejor, empate = valor, puntuacion, False
+            elif puntuacion == puntuacion_mejor and valor != mejor:
+                empate = True
+        if puntuacion_mejor >= self.umbral and not empate:
+            return mejor
+        return defecto
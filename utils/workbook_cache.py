@@ -0,0 +1,271 @@
+"""
+Caché en memoria de libros Excel ya leídos
+Un mismo Excel subido lo leen varios procesadores, pestañas y reejecuciones de
+Streamlit. Cada libro se identifica por el SHA-256 de su contenido y cada hoja
+se descomprime y lee como mucho una vez por proceso, solo cuando alguien la
+pide; las distintas filas de cabecera se construyen a partir de esas celdas.
+Se guardan los EXCEL_CACHE_LIBROS libros usados más recientemente.
+
+Las hojas se leen en streaming (openpyxl en modo solo lectura y solo valores)
+y se recortan a su rango usado real: las filas y columnas vacías del final,
+aunque tengan formato, no se guardan, así que la memoria depende de los datos
+y no de max_row.
+"""
+import hashlib
+import io
+import os
+import re
+import threading
+import zipfile
+from collections import OrderedDict
+
+import pandas as pd
+from pandas.io.parsers import TextParser
+
+from config.settings import EXCEL_CACHE_LIBROS
+
+# Valores de error de Excel, que pandas lee como celdas vacías
+ERRORES_EXCEL = {'#NULL!', '#DIV/0!', '#VALUE!', '#REF!', '#NAME?', '#NUM!', '#N/A'}
+
+_libros = OrderedDict()
+_cerrojo = threading.Lock()
+
+
+def leer_contenido(origen):
+    """
+    Bytes de un Excel
+
+    Args:
+        origen: bytes, ruta o archivo abierto (p.ej. el UploadedFile de
+            Streamlit); los archivos se rebobinan antes y después de leerlos
+
+    Returns:
+        bytes
+    """
+    if isinstance(origen, (bytes, bytearray)):
+        return bytes(origen)
+    if isinstance(origen, (str, os.PathLike)):
+        with open(origen, 'rb') as archivo:
+            return archivo.read()
+    if hasattr(origen, 'getvalue'):
+        return origen.getvalue()
+    origen.seek(0)
+    contenido = origen.read()
+    origen.seek(0)
+    return contenido
+
+
+def _celda(valor):
+    """Valor de una celda convertido como lo hace pandas al leer con openpyxl"""
+    if valor is None:
+        return ''
+    if isinstance(valor, str) and valor in ERRORES_EXCEL:
+        return float('nan')
+    if isinstance(valor, float) and valor.is_integer():
+        return int(valor)
+    return valor
+
+
+class LibroExcel:
+    """Libro Excel con sus hojas leídas bajo demanda"""
+
+    def __init__(self, contenido, huella):
+        """
+        Args:
+            contenido: Bytes del archivo
+            huella: SHA-256 del contenido
+        """
+        self.huella = huella
+        self._contenido = contenido
+        self._es_xlsx = contenido[:2] == b'PK'
+        self._nombres = None
+        self._openpyxl = None
+        self._filas_hoja = {}
+        self._combinadas = {}
+        self._tablas = {}
+        self._indices = {}
+        self._cerrojo = threading.RLock()
+
+    @property
+    def sheet_names(self):
+        """Nombres de las hojas en el orden del libro"""
+        if self._nombres is None:
+            if self._es_xlsx:
+                self._nombres = list(self._libro_openpyxl().sheetnames)
+            else:
+                self._nombres = pd.ExcelFile(io.BytesIO(self._contenido)).sheet_names
+        return self._nombres
+
+    def _libro_openpyxl(self):
+        """Libro openpyxl en modo lectura (se abre una vez; las hojas se leen bajo demanda)"""
+        if self._openpyxl is None:
+            import openpyxl
+            self._openpyxl = openpyxl.load_workbook(io.BytesIO(self._contenido), read_only=True,
+                                                    data_only=True, keep_links=False)
+        return self._openpyxl
+
+    def _nombre(self, hoja):
+        if hoja is None:
+            return self._libro_openpyxl().active.title
+        return self.sheet_names[hoja] if isinstance(hoja, int) else hoja
+
+    def filas(self, hoja=0):
+        """
+        Valores de una hoja recortados a su rango usado
+
+        Las filas vacías se cuentan sin guardarlas y solo se añaden si después
+        aparece una fila con datos, así que las filas con formato pero vacías
+        del final de la hoja no llegan a ocupar memoria.
+
+        Args:
+            hoja: Nombre o posición de la hoja (None = la hoja activa; solo xlsx)
+
+        Returns:
+            Lista de tuplas de valores tal como los guarda Excel (None si la
+            celda está vacía), todas con el ancho del rango usado
+        """
+        nombre = self._nombre(hoja)
+        with self._cerrojo:
+            if nombre not in self._filas_hoja:
+                wb = self._libro_openpyxl()
+                if nombre not in wb.sheetnames:
+                    raise ValueError(f"Worksheet named '{nombre}' not found")
+                ws = wb[nombre]
+                # max_row/max_column de la hoja no son fiables: se recorre lo que haya
+                ws.reset_dimensions()
+                filas = []
+                vacias = 0
+                ancho = 0
+                for fila in ws.iter_rows(values_only=True):
+                    usado = len(fila)
+                    while usado and fila[usado - 1] in (None, ''):
+                        usado -= 1
+                    if not usado:
+                        vacias += 1
+                        continue
+                    filas.extend([()] * vacias)
+                    vacias = 0
+                    filas.append(fila[:usado])
+                    ancho = max(ancho, usado)
+                self._filas_hoja[nombre] = [
+                    fila if len(fila) == ancho else fila + (None,) * (ancho - len(fila))
+                    for fila in filas
+                ]
+            return self._filas_hoja[nombre]
+
+    def combinadas(self, hoja=0):
+        """
+        Rangos de celdas combinadas de una hoja
+
+        El modo de solo lectura de openpyxl no los carga, así que se buscan
+        directamente en el XML de la hoja.
+
+        Returns:
+            Lista ordenada de (fila_min, columna_min, fila_max, columna_max),
+            con índices desde 0 ([] si el libro no es xlsx)
+        """
+        from openpyxl.utils.cell import range_boundaries
+
+        nombre = self._nombre(hoja)
+        if not self._es_xlsx:
+            return []
+        with self._cerrojo:
+            if nombre not in self._combinadas:
+                ws = self._libro_openpyxl()[nombre]
+                with zipfile.ZipFile(io.BytesIO(self._contenido)) as archivo:
+                    xml = archivo.read(ws._worksheet_path)
+                rangos = []
+                for ref in re.findall(rb'<(?:\w+:)?mergeCell\s+ref="([^"]+)"', xml):
+                    col_min, fila_min, col_max, fila_max = range_boundaries(ref.decode('ascii'))
+                    rangos.append((fila_min - 1, col_min - 1, fila_max - 1, col_max - 1))
+                self._combinadas[nombre] = sorted(rangos)
+            return self._combinadas[nombre]
+
+    def _filas(self, nombre):
+        """Celdas de una hoja (lista de filas) tal como las pasa pandas a su parser"""
+        filas = []
+        for fila in self.filas(nombre):
+            fila = [_celda(valor) for valor in fila]
+            while fila and fila[-1] == '':
+                fila.pop()
+            filas.append(fila)
+        while filas and not filas[-1]:
+            filas.pop()
+        ancho = max((len(fila) for fila in filas), default=0)
+        return [fila + [''] * (ancho - len(fila)) for fila in filas]
+
+    def hoja(self, hoja=0, header=None):
+        """
+        DataFrame de una hoja, igual que pd.read_excel(sheet_name=hoja, header=header)
+
+        Args:
+            hoja: Nombre o posición de la hoja
+            header: Fila de cabecera (None = sin cabecera)
+
+        Returns:
+            Copia del DataFrame (se puede modificar sin afectar a la caché)
+        """
+        nombre = self._nombre(hoja)
+        clave = (nombre, header)
+        with self._cerrojo:
+            if clave not in self._tablas:
+                if self._es_xlsx:
+                    filas = self._filas(nombre)
+                    if filas:
+                        tabla = TextParser(filas, header=header, skip_blank_lines=False).read()
+                    else:
+                        tabla = pd.DataFrame()
+                else:
+                    tabla = pd.read_excel(io.BytesIO(self._contenido), sheet_name=nombre, header=header)
+                self._tablas[clave] = tabla
+            return self._tablas[clave].copy()
+
+    def indice(self, hoja=0):
+        """IndiceHoja de la hoja leída sin cabecera (se construye una sola vez)"""
+        from .sheet_index import IndiceHoja
+
+        nombre = self._nombre(hoja)
+        if nombre not in self._indices:
+            self._indices[nombre] = IndiceHoja(self.hoja(nombre))
+        return self._indices[nombre]
+
+
+def obtener_libro(origen):
+    """
+    Libro Excel de la caché (o recién abierto si no estaba)
+
+    Args:
+        origen: bytes, ruta o archivo abierto
+
+    Returns:
+        LibroExcel
+    """
+    contenido = leer_contenido(origen)
+    huella = hashlib.sha256(contenido).hexdigest()
+    with _cerrojo:
+        libro = _libros.get(huella)
+        if libro is not None:
+            _libros.move_to_end(huella)
+            return libro
+        libro = LibroExcel(contenido, huella)
+        if EXCEL_CACHE_LIBROS > 0:
+            _libros[huella] = libro
+            while len(_libros) > EXCEL_CACHE_LIBROS:
+                _libros.popitem(last=False)
+    return libro
+
+
+def leer_hoja(origen, hoja=0, header=None):
+    """Atajo de obtener_libro(origen).hoja(hoja, header)"""
+    return obtener_libro(origen).hoja(hoja, header)
+
+
+def leer_filas(origen, hoja=0):
+    """Atajo de obtener_libro(origen).filas(hoja)"""
+    return obtener_libro(origen).filas(hoja)
+
+
+def vaciar_cache():
+    """Descarta todos los libros guardados"""
+    with _cerrojo:
+        _libros.clear()